@@ -1,5 +1,6 @@
 import streamlit as st
 import os
+from typing import Any, Dict, List
 from dotenv import load_dotenv
 from src.course_recommender import CourseRecommender
 from src.data_manager import DataManager
@@ -15,6 +16,36 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+
+@st.cache_resource
+def get_data_manager() -> DataManager:
+    """Build the DataManager once per process and reuse it across reruns."""
+    return DataManager()
+
+
+@st.cache_resource
+def get_course_recommender() -> CourseRecommender:
+    """Build the CourseRecommender (OpenAI client + RAG system) once per process."""
+    return CourseRecommender()
+
+
+def get_planning_insights(recommendations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate credits, difficulty and category coverage in a single pass over the recommendations."""
+    total_credits = 0
+    difficulty_sum = 0
+    categories = set()
+    for course in recommendations:
+        total_credits += course['credits']
+        difficulty_sum += course['difficulty']
+        categories.add(course['category'])
+    
+    return {
+        "total_credits": total_credits,
+        "avg_difficulty": difficulty_sum / len(recommendations) if recommendations else 0.0,
+        "categories_covered": len(categories)
+    }
+
+
 def main():
     st.title("🎓 AI-Powered Course Recommendation System")
     st.markdown("Get personalized course recommendations based on your graduation requirements and interests!")
@@ -27,8 +58,8 @@ def main():
     
     # Initialize components
     try:
-        data_manager = DataManager()
-        course_recommender = CourseRecommender()
+        data_manager = get_data_manager()
+        course_recommender = get_course_recommender()
         
         # Sidebar for user inputs
         with st.sidebar:
@@ -84,11 +115,22 @@ def main():
                         "difficulty_preference": difficulty_preference
                     }
                     
-                    # Get recommendations
-                    recommendations = course_recommender.get_recommendations(user_profile)
+                    # Stream the AI response so the first tokens show up immediately
+                    candidate_courses = course_recommender.get_candidate_courses(user_profile)
                     
-                    # Display results
                     st.header("📚 Your Personalized Course Recommendations")
+                    with st.expander("🤖 AI Advisor Response", expanded=True):
+                        response_text = st.write_stream(
+                            course_recommender.get_recommendations_stream(user_profile, candidate_courses)
+                        )
+                    
+                    recommendations = course_recommender.parse_streamed_recommendations(
+                        response_text if isinstance(response_text, str) else "",
+                        user_profile,
+                        candidate_courses
+                    )
+                    
+                    # Display results
                     
                     for i, course in enumerate(recommendations, 1):
                         with st.expander(f"{i}. {course['title']} ({course['code']})"):
@@ -108,19 +150,17 @@ def main():
                     
                     # Additional insights
                     st.header("📊 Planning Insights")
+                    insights = get_planning_insights(recommendations)
                     col1, col2, col3 = st.columns(3)
                     
                     with col1:
-                        total_recommended_credits = sum(course['credits'] for course in recommendations)
-                        st.metric("Recommended Credits", total_recommended_credits)
+                        st.metric("Recommended Credits", insights["total_credits"])
                     
                     with col2:
-                        avg_difficulty = sum(course['difficulty'] for course in recommendations) / len(recommendations)
-                        st.metric("Average Difficulty", f"{avg_difficulty:.1f}/5")
+                        st.metric("Average Difficulty", f"{insights['avg_difficulty']:.1f}/5")
                     
                     with col3:
-                        categories_covered = len(set(course['category'] for course in recommendations))
-                        st.metric("Categories Covered", categories_covered)
+                        st.metric("Categories Covered", insights["categories_covered"])
                     
                 except Exception as e:
                     st.error(f"Error generating recommendations: {str(e)}")
@@ -4,34 +4,38 @@ GitHub Repository Creation Script for Course Recommendation System
 """
 
 import os
+import shutil
 import subprocess
 import sys
 from pathlib import Path
 
 
 def run_command(command, check=True):
-    """Run a shell command and return the result."""
+    """Run a command given as an argument list (no shell) and return its output."""
     try:
         result = subprocess.run(
-            command, shell=True, capture_output=True, text=True, check=check
+            command, capture_output=True, text=True, check=check
         )
         return result.stdout.strip()
     except subprocess.CalledProcessError as e:
-        print(f"Error running command: {command}")
+        print(f"Error running command: {' '.join(command)}")
         print(f"Error output: {e.stderr}")
         return None
+    except FileNotFoundError:
+        print(f"Command not found: {command[0]}")
+        return None
 
 
 def check_git_installed():
     """Check if git is installed."""
-    return run_command("git --version", check=False) is not None
+    return shutil.which("git") is not None
 
 
 def initialize_git_repo():
     """Initialize git repository if not already initialized."""
     if not Path(".git").exists():
         print("📦 Initializing Git repository...")
-        run_command("git init")
+        run_command(["git", "init"])
         print("✅ Git repository initialized")
     else:
         print("📦 Git repository already exists")
@@ -40,10 +44,10 @@ def initialize_git_repo():
 def create_initial_commit():
     """Create initial commit with all files."""
     print("📝 Adding files to git...")
-    run_command("git add .")
+    run_command(["git", "add", "."])
     
     print("💾 Creating initial commit...")
-    run_command('git commit -m "Initial commit: Course Recommendation System"')
+    run_command(["git", "commit", "-m", "Initial commit: Course Recommendation System"])
     print("✅ Initial commit created")
 
 
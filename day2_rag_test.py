@@ -13,7 +13,12 @@ import os
 import sys
 import json
 import logging
-from typing import List, Dict, Any
+import functools
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
 
 # Add src to path for imports
@@ -31,6 +36,98 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Extra course documents used to bring the catalog up to 10+ entries
+_ADDITIONAL_COURSES: Tuple[Dict[str, Any], ...] = (
+    {
+        "code": "CS304",
+        "title": "Artificial Intelligence",
+        "description": "Introduction to AI concepts, search algorithms, knowledge representation, machine learning basics, and expert systems.",
+        "credits": 3,
+        "difficulty": 4,
+        "category": "Major Electives",
+        "semester": "Fall",
+        "prerequisites": "CS201",
+        "instructor": "Dr. AI",
+        "schedule": "TTh 9:00-10:30 AM"
+    },
+    {
+        "code": "CS305",
+        "title": "Computer Networks",
+        "description": "Network protocols, TCP/IP, routing algorithms, network security, and distributed systems fundamentals.",
+        "credits": 3,
+        "difficulty": 3,
+        "category": "Major Electives",
+        "semester": "Spring",
+        "prerequisites": "CS201",
+        "instructor": "Prof. Network",
+        "schedule": "MWF 2:00-3:00 PM"
+    },
+    {
+        "code": "CS306",
+        "title": "Software Engineering",
+        "description": "Software development lifecycle, design patterns, testing strategies, version control, and project management.",
+        "credits": 4,
+        "difficulty": 3,
+        "category": "Core Requirements",
+        "semester": "Fall/Spring",
+        "prerequisites": "CS201",
+        "instructor": "Dr. Engineer",
+        "schedule": "TTh 11:00-12:30 PM"
+    },
+    {
+        "code": "MATH301",
+        "title": "Linear Algebra",
+        "description": "Vector spaces, matrices, eigenvalues, linear transformations, and applications to computer science.",
+        "credits": 3,
+        "difficulty": 4,
+        "category": "Math/Science",
+        "semester": "Fall/Spring",
+        "prerequisites": "MATH201",
+        "instructor": "Prof. Matrix",
+        "schedule": "MWF 10:00-11:00 AM"
+    },
+    {
+        "code": "PHYS101",
+        "title": "Physics for Computer Scientists",
+        "description": "Mechanics, electricity, magnetism, and waves with applications to computing and digital systems.",
+        "credits": 4,
+        "difficulty": 3,
+        "category": "Math/Science",
+        "semester": "Fall/Spring",
+        "prerequisites": "MATH201",
+        "instructor": "Dr. Physics",
+        "schedule": "MWF 1:00-2:00 PM, Lab: T 2:00-4:00 PM"
+    },
+    {
+        "code": "CS401",
+        "title": "Advanced Algorithms",
+        "description": "Advanced algorithmic techniques, complexity analysis, graph algorithms, and optimization methods.",
+        "credits": 3,
+        "difficulty": 5,
+        "category": "Core Requirements",
+        "semester": "Spring",
+        "prerequisites": "CS201, MATH301",
+        "instructor": "Dr. Algorithm",
+        "schedule": "TTh 1:00-2:30 PM"
+    }
+)
+
+
+# Maximum number of memoized retrieve_and_respond answers
+_RESPONSE_CACHE_SIZE = 256
+
+
+@functools.lru_cache(maxsize=1)
+def _load_courses_cached(path: str, mtime: float) -> Tuple[Dict[str, Any], ...]:
+    """
+    Parse the courses file once per modification time.
+    
+    The mtime is part of the cache key, so saving the file invalidates the entry.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return tuple(json.load(f))
+
+
 class Day2RAGTester:
     """
     Test and demonstrate Day 2 RAG system requirements.
@@ -41,13 +138,22 @@ class Day2RAGTester:
         self.data_manager = DataManager()
         self.rag_system = RAGSystem()
         
+        # Responses are memoized per (normalized query, corpus hash) in LRU
+        # order; the hash changes whenever a different corpus is embedded
+        self._corpus_hash = ""
+        self._response_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        
         # Check if we have OpenAI API key
         if not os.getenv("OPENAI_API_KEY"):
             logger.warning("No OPENAI_API_KEY found. Using fallback mode.")
             self.has_openai = False
         else:
             self.has_openai = True
-            self.course_recommender = CourseRecommender()
+    
+    @functools.cached_property
+    def course_recommender(self) -> CourseRecommender:
+        """Course recommender, created on first use so retrieval-only runs skip its setup."""
+        return CourseRecommender()
     
     def load_documents(self) -> List[Dict[str, Any]]:
         """
@@ -57,7 +163,11 @@ class Day2RAGTester:
             List of course documents (our "FAQ" documents)
         """
         logger.info("Loading course documents...")
-        courses = self.data_manager.load_courses()
+        courses_file = self.data_manager.courses_file
+        try:
+            courses = list(_load_courses_cached(courses_file, os.path.getmtime(courses_file)))
+        except (OSError, json.JSONDecodeError):
+            courses = self.data_manager.load_courses()
         
         # Add more sample courses if we have fewer than 10
         if len(courses) < 10:
@@ -66,7 +176,7 @@ class Day2RAGTester:
             # Save the expanded dataset
             self.data_manager.save_courses(courses)
         
-        logger.info(f"✅ Loaded {len(courses)} documents (courses)")
+        logger.info("✅ Loaded %d documents (courses)", len(courses))
         return courses
     
     def embed_and_store_documents(self, documents: List[Dict[str, Any]]) -> None:
@@ -76,15 +186,27 @@ class Day2RAGTester:
         Args:
             documents: List of documents to embed and store
         """
+        content_hash = hashlib.sha1(json.dumps(documents, sort_keys=True).encode('utf-8')).hexdigest()
+        self._corpus_hash = content_hash
+        
+        # ChromaDB persists to disk, so skip re-embedding when it already holds this corpus
+        if (self.rag_system.get_course_count() == len(documents)
+                and self.rag_system.get_content_hash() == content_hash):
+            logger.info("✅ Vector database already holds these %d documents; skipping re-embedding", len(documents))
+            return
+        
         logger.info("Embedding and storing documents...")
         
         # ChromaDB automatically handles embeddings using sentence transformers by default
         # or can be configured to use OpenAI embeddings
-        self.rag_system.add_courses(documents)
+        # Upsert the corpus and drop courses no longer in it; the hash is only
+        # recorded once the collection actually holds this corpus
+        if self.rag_system.add_courses(documents, replace=True):
+            self.rag_system.set_content_hash(content_hash)
         
         # Verify storage
         count = self.rag_system.get_course_count()
-        logger.info(f"✅ Embedded and stored {count} documents in vector database")
+        logger.info("✅ Embedded and stored %d documents in vector database", count)
     
     def retrieve_top_documents(self, query: str, top_k: int = 3) -> List[Dict[str, Any]]:
         """
@@ -97,11 +219,11 @@ class Day2RAGTester:
         Returns:
             List of top retrieved documents
         """
-        logger.info(f"Retrieving top-{top_k} documents for query: '{query}'")
+        logger.debug("Retrieving top-%d documents for query: %r", top_k, query)
         
         results = self.rag_system.search_courses(query=query, max_results=top_k)
         
-        logger.info(f"✅ Retrieved {len(results)} documents using vector search")
+        logger.debug("✅ Retrieved %d documents using vector search", len(results))
         return results
     
     def generate_contextual_answer(self, query: str, context_docs: List[Dict[str, Any]]) -> str:
@@ -116,36 +238,65 @@ class Day2RAGTester:
             Generated contextual answer
         """
         if not self.has_openai:
-            # Fallback response when no OpenAI key
-            course_titles = [doc.get('title', 'Unknown') for doc in context_docs]
-            return f"Based on the retrieved courses ({', '.join(course_titles)}), here's a recommendation for '{query}'. (Note: This is a fallback response - configure OPENAI_API_KEY for full AI generation)"
+            return self._fallback_answer(query, context_docs)
         
-        logger.info("Generating contextual answer with GPT-3.5-turbo...")
-        
-        # Create a simple user profile for the query
-        user_profile = {
-            "interests": query,
-            "required_categories": ["Core Requirements", "Major Electives"],
-            "difficulty_preference": 3,
-            "major": "Computer Science"
-        }
+        logger.debug("Generating contextual answer with GPT-3.5-turbo...")
         
         # Use the course recommender to generate AI response
         recommendations = self.course_recommender._generate_ai_recommendations(
-            user_profile=user_profile,
+            user_profile=self._query_profile(query),
             candidate_courses=context_docs,
             num_recommendations=min(3, len(context_docs))
         )
         
-        # Format the response
-        response = f"Based on your interest in '{query}', here are my recommendations:\n\n"
-        for i, rec in enumerate(recommendations, 1):
-            response += f"{i}. **{rec.get('title', 'Unknown Course')}** ({rec.get('code', 'N/A')})\n"
-            response += f"   {rec.get('reason', 'Recommended based on your interests')}\n\n"
-        
-        logger.info("✅ Generated contextual answer using GPT-3.5-turbo")
+        response = self._format_answer(query, recommendations)
+        logger.debug("✅ Generated contextual answer using GPT-3.5-turbo")
         return response
     
+    async def agenerate_contextual_answer(self, query: str, context_docs: List[Dict[str, Any]]) -> str:
+        """
+        Async variant of generate_contextual_answer built on AsyncOpenAI.
+        
+        Args:
+            query: User query
+            context_docs: Retrieved context documents
+            
+        Returns:
+            Generated contextual answer
+        """
+        if not self.has_openai:
+            return self._fallback_answer(query, context_docs)
+        
+        recommendations = await self.course_recommender._agenerate_ai_recommendations(
+            user_profile=self._query_profile(query),
+            candidate_courses=context_docs,
+            num_recommendations=min(3, len(context_docs))
+        )
+        
+        return self._format_answer(query, recommendations)
+    
+    def _query_profile(self, query: str) -> Dict[str, Any]:
+        """Create a simple user profile for a free-text query."""
+        return {
+            "interests": query,
+            "required_categories": ["Core Requirements", "Major Electives"],
+            "difficulty_preference": 3,
+            "major": "Computer Science"
+        }
+    
+    def _fallback_answer(self, query: str, context_docs: List[Dict[str, Any]]) -> str:
+        """Fallback response when no OpenAI key is configured."""
+        course_titles = [doc.get('title', 'Unknown') for doc in context_docs]
+        return f"Based on the retrieved courses ({', '.join(course_titles)}), here's a recommendation for '{query}'. (Note: This is a fallback response - configure OPENAI_API_KEY for full AI generation)"
+    
+    def _format_answer(self, query: str, recommendations: List[Dict[str, Any]]) -> str:
+        """Format recommendations into the contextual answer text."""
+        parts = [f"Based on your interest in '{query}', here are my recommendations:\n\n"]
+        for i, rec in enumerate(recommendations, 1):
+            parts.append(f"{i}. **{rec.get('title', 'Unknown Course')}** ({rec.get('code', 'N/A')})\n")
+            parts.append(f"   {rec.get('reason', 'Recommended based on your interests')}\n\n")
+        return "".join(parts)
+    
     def retrieve_and_respond(self, query: str) -> str:
         """
         ✅ Target: Write a retrieve_and_respond(query) function using RAG pipeline
@@ -158,96 +309,79 @@ class Day2RAGTester:
         Returns:
             Contextual response based on retrieved documents
         """
-        logger.info(f"=== RAG Pipeline: retrieve_and_respond('{query}') ===")
+        # Only the cache key is normalized; retrieval and the answer use the query as typed
+        key = (query.strip().lower(), self._corpus_hash)
+        response = self._response_cache.get(key)
+        if response is not None:
+            self._response_cache.move_to_end(key)
+            return response
+        
+        response = self._respond(query)
+        if response is None:
+            return f"I couldn't find any relevant courses for '{query}'. Please try a different search term."
+        
+        self._response_cache[key] = response
+        if len(self._response_cache) > _RESPONSE_CACHE_SIZE:
+            self._response_cache.popitem(last=False)
+        return response
+    
+    def _respond(self, query: str) -> Optional[str]:
+        """
+        Run the uncached RAG pipeline for a query.
+        
+        Args:
+            query: User query about courses
+            
+        Returns:
+            Contextual response based on retrieved documents, or None if
+            no documents were retrieved
+        """
+        logger.debug("=== RAG Pipeline: retrieve_and_respond(%r) ===", query)
+        start_time = time.perf_counter()
         
         # Step 1: Retrieve relevant documents
         context_docs = self.retrieve_top_documents(query, top_k=3)
         
         if not context_docs:
-            return f"I couldn't find any relevant courses for '{query}'. Please try a different search term."
+            return None
         
         # Step 2: Generate contextual response
         response = self.generate_contextual_answer(query, context_docs)
         
-        logger.info("✅ RAG pipeline completed successfully")
+        logger.info("✅ RAG pipeline completed in %.1fms", (time.perf_counter() - start_time) * 1e3)
+        return response
+    
+    async def aretrieve_and_respond(self, query: str) -> str:
+        """
+        Async variant of retrieve_and_respond for running many queries concurrently.
+        
+        Args:
+            query: User query about courses
+            
+        Returns:
+            Contextual response based on retrieved documents
+        """
+        start_time = time.perf_counter()
+        
+        # Run the blocking vector search on a worker thread so concurrent
+        # queries overlap their retrieval as well as their LLM calls
+        context_docs = await asyncio.to_thread(self.retrieve_top_documents, query, 3)
+        
+        if not context_docs:
+            return f"I couldn't find any relevant courses for '{query}'. Please try a different search term."
+        
+        response = await self.agenerate_contextual_answer(query, context_docs)
+        
+        logger.info("✅ RAG pipeline completed in %.1fms", (time.perf_counter() - start_time) * 1e3)
         return response
     
     def _generate_additional_courses(self) -> List[Dict[str, Any]]:
         """Generate additional course documents to reach 10+ total."""
-        return [
-            {
-                "code": "CS304",
-                "title": "Artificial Intelligence",
-                "description": "Introduction to AI concepts, search algorithms, knowledge representation, machine learning basics, and expert systems.",
-                "credits": 3,
-                "difficulty": 4,
-                "category": "Major Electives",
-                "semester": "Fall",
-                "prerequisites": "CS201",
-                "instructor": "Dr. AI",
-                "schedule": "TTh 9:00-10:30 AM"
-            },
-            {
-                "code": "CS305",
-                "title": "Computer Networks",
-                "description": "Network protocols, TCP/IP, routing algorithms, network security, and distributed systems fundamentals.",
-                "credits": 3,
-                "difficulty": 3,
-                "category": "Major Electives",
-                "semester": "Spring",
-                "prerequisites": "CS201",
-                "instructor": "Prof. Network",
-                "schedule": "MWF 2:00-3:00 PM"
-            },
-            {
-                "code": "CS306",
-                "title": "Software Engineering",
-                "description": "Software development lifecycle, design patterns, testing strategies, version control, and project management.",
-                "credits": 4,
-                "difficulty": 3,
-                "category": "Core Requirements",
-                "semester": "Fall/Spring",
-                "prerequisites": "CS201",
-                "instructor": "Dr. Engineer",
-                "schedule": "TTh 11:00-12:30 PM"
-            },
-            {
-                "code": "MATH301",
-                "title": "Linear Algebra",
-                "description": "Vector spaces, matrices, eigenvalues, linear transformations, and applications to computer science.",
-                "credits": 3,
-                "difficulty": 4,
-                "category": "Math/Science",
-                "semester": "Fall/Spring",
-                "prerequisites": "MATH201",
-                "instructor": "Prof. Matrix",
-                "schedule": "MWF 10:00-11:00 AM"
-            },
-            {
-                "code": "PHYS101",
-                "title": "Physics for Computer Scientists",
-                "description": "Mechanics, electricity, magnetism, and waves with applications to computing and digital systems.",
-                "credits": 4,
-                "difficulty": 3,
-                "category": "Math/Science",
-                "semester": "Fall/Spring",
-                "prerequisites": "MATH201",
-                "instructor": "Dr. Physics",
-                "schedule": "MWF 1:00-2:00 PM, Lab: T 2:00-4:00 PM"
-            },
-            {
-                "code": "CS401",
-                "title": "Advanced Algorithms",
-                "description": "Advanced algorithmic techniques, complexity analysis, graph algorithms, and optimization methods.",
-                "credits": 3,
-                "difficulty": 5,
-                "category": "Core Requirements",
-                "semester": "Spring",
-                "prerequisites": "CS201, MATH301",
-                "instructor": "Dr. Algorithm",
-                "schedule": "TTh 1:00-2:30 PM"
-            }
-        ]
+        return list(_ADDITIONAL_COURSES)
+    
+    async def _run_queries_concurrently(self, queries: List[str]) -> List[str]:
+        """Run aretrieve_and_respond for all queries with asyncio.gather."""
+        return await asyncio.gather(*(self.aretrieve_and_respond(query) for query in queries))
     
     def run_day2_tests(self) -> None:
         """Run all Day 2 requirement tests."""
@@ -275,10 +409,11 @@ class Day2RAGTester:
             # Test retrieval
             docs = self.retrieve_top_documents(query, top_k=3)
             print(f"   Retrieved {len(docs)} documents")
-            
-            # Test full RAG pipeline
-            response = self.retrieve_and_respond(query)
-            print(f"   Response length: {len(response)} characters")
+        
+        # Test full RAG pipeline, overlapping the LLM calls for all queries
+        responses = asyncio.run(self._run_queries_concurrently(test_queries))
+        for query, response in zip(test_queries, responses):
+            print(f"\n🤖 '{query}' response length: {len(response)} characters")
         
         print("\n✅ All Day 2 targets verified!")
         print("\nKey accomplishments:")
@@ -12,14 +12,27 @@ Date: Day 3 Implementation
 """
 
 import os
+import re
 import json
+import hashlib
+import random
+import threading
+import time
 import numpy as np
 import faiss
 import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
 from typing import List, Dict, Any, Tuple, Optional
 from openai import OpenAI
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:  # orjson is an optional speedup; fall back to the stdlib
+    orjson = None
+
 # Load environment variables
 load_dotenv()
 
@@ -27,6 +40,19 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Maximum number of texts sent to the embeddings endpoint per request
+EMBEDDING_BATCH_SIZE = 96
+
+# Maximum number of embedding requests in flight at once
+EMBEDDING_MAX_WORKERS = 5
+
+# Splits a student query into separate interests ("psychology and AI")
+_INTEREST_SEPARATORS = re.compile(r",|;|\band\b|\bor\b", re.IGNORECASE)
+
+# Retries per embedding request; the OpenAI client backs off exponentially
+# and honors Retry-After on rate limits
+EMBEDDING_MAX_RETRIES = 5
+
 
 class EmbeddingBasedCourseSearch:
     """
@@ -38,26 +64,58 @@ class EmbeddingBasedCourseSearch:
     - Provides methods to embed courses, embed queries, and find similar courses
     """
     
-    def __init__(self, api_key: Optional[str] = None, embedding_model: str = "text-embedding-3-small"):
+    # Catalogs at least this large use a trained IVF-PQ index instead of a flat
+    # one; PQ32 needs 256 training points per centroid (9,984) to train well
+    ivf_pq_threshold = 10000
+    
+    # Number of IVF lists probed per query (recall/latency tradeoff)
+    nprobe = 8
+    
+    # IVF-PQ shortlists this many times top_k, then re-ranks it with exact
+    # inner products so reported similarities are true cosine values
+    refine_k_factor = 4
+    
+    # Maximum number of normalized query embeddings kept in memory
+    query_cache_size = 1024
+    
+    def __init__(self, api_key: Optional[str] = None, embedding_model: str = "text-embedding-3-small",
+                 dimensions: int = 512, cache_dir: Optional[str] = ".emb_cache"):
         """
         Initialize the embedding-based course search system.
         
         Args:
             api_key: OpenAI API key (if None, uses environment variable)
             embedding_model: OpenAI embedding model to use
+            dimensions: Embedding size requested from the API (text-embedding-3 models
+                return natively truncated, re-normalized vectors)
+            cache_dir: Directory for cached course embeddings (None disables caching)
         """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OpenAI API key must be provided or set in OPENAI_API_KEY environment variable")
         
-        self.client = OpenAI(api_key=self.api_key)
+        self.client = OpenAI(api_key=self.api_key, max_retries=EMBEDDING_MAX_RETRIES)
         self.embedding_model = embedding_model
-        self.embedding_dimension = 1536  # text-embedding-3-small dimension
+        self.embedding_dimension = dimensions
         
         # FAISS index and course storage
         self.faiss_index = None
         self.courses = []  # Store original course data
-        self.course_embeddings = []  # Store embeddings
+        self.courses_arr = np.empty(0, dtype=object)  # Same courses as an object array for batched lookups
+        self.course_embeddings = np.empty((0, self.embedding_dimension), dtype=np.float32)  # Store embeddings
+        self._normalized = False  # Whether course_embeddings are already L2-normalized
+        
+        # On-disk course embedding cache, keyed by model, dimensions and course text
+        self._cache_dir = Path(cache_dir) if cache_dir else None
+        
+        # Wrapper applied to student queries before embedding
+        self._query_prefix = "Student interests: "
+        self._query_suffix = ". Looking for relevant courses."
+        
+        # In-memory LRU cache of normalized query embeddings, keyed by model,
+        # dimensions and query text; shared with the background prefetcher
+        self._query_cache: "OrderedDict[Tuple[str, int, str], bytes]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
         
         logger.info(f"Initialized EmbeddingBasedCourseSearch with model: {embedding_model}")
     
@@ -70,103 +128,242 @@ class EmbeddingBasedCourseSearch:
             
         Returns:
             Numpy array of embeddings
-        """
-        try:
-            response = self.client.embeddings.create(
-                model=self.embedding_model,
-                input=text,
-                encoding_format="float"
-            )
             
-            embedding = np.array(response.data[0].embedding, dtype=np.float32)
-            return embedding
+        Raises:
+            openai.OpenAIError: If the embeddings request fails
+        """
+        return self._embed_batch([text])[0]
+    
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed several texts with a single embeddings API request.
+        
+        Args:
+            texts: Texts to embed
             
-        except Exception as e:
-            logger.error(f"Error creating embedding: {e}")
-            # Return zero vector as fallback
-            return np.zeros(self.embedding_dimension, dtype=np.float32)
+        Returns:
+            Float32 array of shape (len(texts), embedding_dimension)
+        """
+        response = self.client.embeddings.create(
+            model=self.embedding_model,
+            input=texts,
+            dimensions=self.embedding_dimension,
+            encoding_format="float"
+        )
+        
+        # The API returns embeddings in input order
+        return np.array([item.embedding for item in response.data], dtype=np.float32)
     
     def embed_courses(self, courses: List[Dict[str, Any]]) -> None:
         """
         ✅ Day 3 Requirement: Embed course descriptions using text-embedding-3-small.
         
+        Embeddings found in the on-disk cache are reused. The remaining courses
+        are sent to the API in batches of EMBEDDING_BATCH_SIZE, with up to
+        EMBEDDING_MAX_WORKERS requests in flight at once. Courses whose batch
+        still fails after retries are left out of the index.
+        
         Args:
             courses: List of course dictionaries with descriptions
+            
+        Raises:
+            RuntimeError: If no course could be embedded
         """
         logger.info(f"Embedding {len(courses)} courses using {self.embedding_model}...")
         
         self.courses = courses
-        self.course_embeddings = []
+        self.courses_arr = _to_object_array(courses)
+        
+        # Create comprehensive text for embedding
+        texts = list(map(self._create_course_text, courses))
+        self.course_embeddings = np.empty((len(texts), self.embedding_dimension), dtype=np.float32)
+        
+        keys = list(map(self._cache_key, texts))
+        
+        # Only courses without a cached embedding go to the API
+        missing = [row for row, key in enumerate(keys) if not self._load_cached_embedding(row, key)]
+        if len(missing) < len(texts):
+            logger.info(f"Loaded {len(texts) - len(missing)} course embeddings from cache")
         
-        for i, course in enumerate(courses):
-            # Create comprehensive text for embedding
-            course_text = self._create_course_text(course)
+        batches = [missing[i:i + EMBEDDING_BATCH_SIZE] for i in range(0, len(missing), EMBEDDING_BATCH_SIZE)]
+        max_workers = max(1, min(EMBEDDING_MAX_WORKERS, len(batches)))
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    self._embed_rows, rows, [texts[row] for row in rows], [keys[row] for row in rows]
+                ): rows
+                for rows in batches
+            }
+            
+            embedded = len(texts) - len(missing)
+            failed_rows = []
+            for future in as_completed(futures):
+                batch_failed = future.result()
+                failed_rows.extend(batch_failed)
+                embedded += len(futures[future]) - len(batch_failed)
+                logger.info(f"Embedded {embedded}/{len(courses)} courses")
+        
+        if failed_rows:
+            failed_codes = [courses[row].get('code', row) for row in sorted(failed_rows)]
+            logger.error(f"Leaving {len(failed_rows)} courses out of the index: {failed_codes}")
             
-            # Get embedding from OpenAI
-            embedding = self.embed_text(course_text)
-            self.course_embeddings.append(embedding)
+            keep = np.ones(len(courses), dtype=bool)
+            keep[failed_rows] = False
+            self.course_embeddings = self.course_embeddings[keep]
+            self.courses = [course for course, kept in zip(courses, keep) if kept]
+            self.courses_arr = _to_object_array(self.courses)
             
-            if (i + 1) % 5 == 0:
-                logger.info(f"Embedded {i + 1}/{len(courses)} courses")
+            if not self.courses:
+                self.faiss_index = None
+                raise RuntimeError(f"Failed to embed any of the {len(courses)} courses")
         
-        # Convert to numpy array
-        self.course_embeddings = np.vstack(self.course_embeddings)
+        # Normalize once for cosine similarity; saved embeddings stay normalized
+        faiss.normalize_L2(self.course_embeddings)
+        self._normalized = True
         
         # Build FAISS index
         self._build_faiss_index()
         
-        logger.info(f"✅ Successfully embedded {len(courses)} courses")
+        logger.info(f"✅ Successfully embedded {len(self.courses)} courses")
     
-    def _create_course_text(self, course: Dict[str, Any]) -> str:
+    def _embed_rows(self, rows: List[int], batch: List[str], keys: List[str]) -> List[int]:
         """
-        Create comprehensive text representation of a course for embedding.
+        Embed one batch of course texts into their rows of course_embeddings.
+        
+        Runs on a worker thread. Rate-limit (429) retries honoring Retry-After
+        are handled by the OpenAI client itself. Successful embeddings are
+        written to the on-disk cache.
         
         Args:
-            course: Course dictionary
+            rows: Row indices of the batch in course_embeddings
+            batch: Course texts to embed
+            keys: Cache keys of the course texts
             
         Returns:
-            Combined text representation
+            Rows that could not be embedded (empty on success)
         """
-        text_parts = []
+        # Small jitter so concurrent batches don't hit the API in lockstep
+        time.sleep(random.uniform(0, 0.05))
+        
+        try:
+            self.course_embeddings[rows] = self._embed_batch(batch)
+        except Exception as e:
+            logger.error(f"Error creating embeddings for {len(batch)} courses: {e}")
+            return rows
+        
+        if self._cache_dir is not None:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            for row, key in zip(rows, keys):
+                np.save(self._cache_dir / f"{key}.npy", self.course_embeddings[row])
         
-        # Add title
-        if course.get('title'):
-            text_parts.append(f"Course: {course['title']}")
+        return []
+    
+    def _cache_key(self, text: str) -> str:
+        """
+        Build the embedding cache key for a course text.
         
-        # Add description (most important)
-        if course.get('description'):
-            text_parts.append(f"Description: {course['description']}")
+        Args:
+            text: Course text to embed
+            
+        Returns:
+            SHA-256 hex digest of the model name, dimensions and text
+        """
+        return hashlib.sha256(
+            f"{self.embedding_model}\x00{self.embedding_dimension}\x00{text}".encode()
+        ).hexdigest()
+    
+    def _load_cached_embedding(self, row: int, key: str) -> bool:
+        """
+        Copy a cached embedding into course_embeddings if one exists.
         
-        # Add category
-        if course.get('category'):
-            text_parts.append(f"Category: {course['category']}")
+        Args:
+            row: Row index in course_embeddings
+            key: Cache key of the course text
+            
+        Returns:
+            True if the embedding was loaded from cache
+        """
+        if self._cache_dir is None:
+            return False
         
-        # Add prerequisites for context
-        if course.get('prerequisites') and course['prerequisites'] != 'None':
-            text_parts.append(f"Prerequisites: {course['prerequisites']}")
+        try:
+            self.course_embeddings[row] = np.load(self._cache_dir / f"{key}.npy")
+            return True
+        except (OSError, ValueError):
+            return False
+    
+    def _create_course_text(self, course: Dict[str, Any]) -> str:
+        """
+        Create comprehensive text representation of a course for embedding.
         
-        return " ".join(text_parts)
+        Args:
+            course: Course dictionary
+            
+        Returns:
+            Combined text representation
+        """
+        title = course.get('title')
+        description = course.get('description')  # Most important part
+        category = course.get('category')
+        prerequisites = course.get('prerequisites')
+        
+        return " ".join(filter(None, (
+            f"Course: {title}" if title else None,
+            f"Description: {description}" if description else None,
+            f"Category: {category}" if category else None,
+            # Prerequisites add context unless explicitly 'None'
+            f"Prerequisites: {prerequisites}" if prerequisites and prerequisites != 'None' else None,
+        )))
     
     def _build_faiss_index(self) -> None:
         """
         ✅ Day 3 Requirement: Use FAISS to index course embeddings.
+        
+        Small catalogs use a flat index storing fp16 vectors; catalogs of
+        ivf_pq_threshold courses or more use a trained IVF-PQ index searched
+        with nprobe lists, whose shortlist is re-ranked against the full vectors.
         """
         if len(self.course_embeddings) == 0:
             logger.warning("No course embeddings to index")
             return
         
-        # Create FAISS index (using cosine similarity via inner product)
-        # Normalize embeddings for cosine similarity
-        normalized_embeddings = self.course_embeddings / np.linalg.norm(
-            self.course_embeddings, axis=1, keepdims=True
-        )
+        # Normalize embeddings in place for cosine similarity unless that was
+        # already done. Memory-mapped arrays are read-only, so np.require
+        # copies them first.
+        if not self._normalized:
+            self.course_embeddings = np.require(
+                self.course_embeddings, dtype=np.float32, requirements=['C', 'W']
+            )
+            faiss.normalize_L2(self.course_embeddings)
+            self._normalized = True
+        
+        # Create index (inner product for cosine similarity)
+        if len(self.course_embeddings) < self.ivf_pq_threshold:
+            # fp16 scalar quantization halves memory with negligible recall loss
+            self.faiss_index = faiss.index_factory(
+                self.embedding_dimension, "SQfp16", faiss.METRIC_INNER_PRODUCT
+            )
+        else:
+            self.faiss_index = faiss.index_factory(
+                self.embedding_dimension, "IVF64,PQ32,RFlat", faiss.METRIC_INNER_PRODUCT
+            )
+            self.faiss_index.train(self.course_embeddings)
+            self._set_search_params()
         
-        # Create index
-        self.faiss_index = faiss.IndexFlatIP(self.embedding_dimension)  # Inner Product for cosine similarity
-        self.faiss_index.add(normalized_embeddings)
+        self.faiss_index.add(self.course_embeddings)
         
         logger.info(f"✅ Built FAISS index with {self.faiss_index.ntotal} course embeddings")
     
+    def _set_search_params(self) -> None:
+        """Apply nprobe and the re-rank depth to an IVF index; flat indexes need neither."""
+        index = self.faiss_index
+        if isinstance(index, faiss.IndexRefine):
+            index.k_factor = self.refine_k_factor
+            index = faiss.downcast_index(index.base_index)
+        if isinstance(index, faiss.IndexIVF):
+            index.nprobe = self.nprobe
+    
     def embed_student_query(self, query: str) -> np.ndarray:
         """
         ✅ Day 3 Requirement: Embed a student query (e.g., "I like psychology and AI").
@@ -175,19 +372,109 @@ class EmbeddingBasedCourseSearch:
             query: Student query string
             
         Returns:
-            Query embedding as numpy array
+            Normalized query embedding as numpy array
+            
+        Raises:
+            openai.OpenAIError: If the embeddings request fails
         """
         logger.info(f"Embedding student query: '{query}'")
         
+        return self._embed_queries([query])[0]
+    
+    def embed_student_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        Embed several student queries with at most one API request.
+        
+        Args:
+            queries: Student query strings
+            
+        Returns:
+            Normalized query embeddings, one row per query
+            
+        Raises:
+            openai.OpenAIError: If the embeddings request fails
+        """
+        logger.info(f"Embedding {len(queries)} student queries")
+        
+        return self._embed_queries(queries)
+    
+    def _embed_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        Embed and normalize student queries, reusing cached embeddings.
+        
+        Queries missing from the cache are embedded together in one API
+        request and added to it. The model and dimensions are part of the
+        cache key so switching either never returns stale vectors.
+        
+        Args:
+            queries: Student query strings
+            
+        Returns:
+            Float32 array of shape (len(queries), embedding_dimension)
+        """
         # Create more descriptive query text
-        enhanced_query = f"Student interests: {query}. Looking for relevant courses."
+        keys = [
+            (self.embedding_model, self.embedding_dimension, self._query_prefix + query + self._query_suffix)
+            for query in queries
+        ]
+        
+        with self._query_cache_lock:
+            cached = [self._query_cache.get(key) for key in keys]
+            for key, embedding_bytes in zip(keys, cached):
+                if embedding_bytes is not None:
+                    self._query_cache.move_to_end(key)
+        
+        embeddings = np.empty((len(queries), self.embedding_dimension), dtype=np.float32)
+        missing = []
+        for i, embedding_bytes in enumerate(cached):
+            if embedding_bytes is None:
+                missing.append(i)
+            else:
+                embeddings[i] = np.frombuffer(embedding_bytes, dtype=np.float32)
+        
+        if missing:
+            fresh = self._embed_batch([keys[i][2] for i in missing])
+            
+            # Normalize for cosine similarity
+            faiss.normalize_L2(fresh)
+            embeddings[missing] = fresh
+            
+            with self._query_cache_lock:
+                for i, embedding in zip(missing, fresh):
+                    self._query_cache[keys[i]] = embedding.tobytes()
+                while len(self._query_cache) > self.query_cache_size:
+                    self._query_cache.popitem(last=False)
+        
+        return embeddings
+    
+    def prefetch_queries(self, queries: List[str]) -> threading.Thread:
+        """
+        Embed likely upcoming queries in the background.
         
-        embedding = self.embed_text(enhanced_query)
+        The queries are embedded in one batched request on a daemon thread,
+        so a later search for any of them only costs the local FAISS lookup.
         
-        # Normalize for cosine similarity
-        normalized_embedding = embedding / np.linalg.norm(embedding)
+        Args:
+            queries: Student queries to warm the cache with
+            
+        Returns:
+            The started background thread
+        """
+        thread = threading.Thread(target=self._warm_cache, args=(list(queries),), daemon=True)
+        thread.start()
+        return thread
+    
+    def _warm_cache(self, queries: List[str]) -> None:
+        """
+        Populate the query embedding cache; failures are only logged.
         
-        return normalized_embedding
+        Args:
+            queries: Student queries to embed
+        """
+        try:
+            self._embed_queries(queries)
+        except Exception as e:
+            logger.warning(f"Query prefetch failed: {e}")
     
     def find_similar_courses(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """
@@ -205,23 +492,122 @@ class EmbeddingBasedCourseSearch:
             return []
         
         # Embed the query
-        query_embedding = self.embed_student_query(query)
+        try:
+            query_embedding = self.embed_student_query(query)
+        except Exception as e:
+            logger.error(f"Error creating query embedding: {e}")
+            return []
+        
+        results = self.find_similar_courses_by_embedding(query_embedding, top_k)
+        
+        logger.info(f"✅ Found {len(results)} similar courses for query: '{query}'")
+        
+        return results
+    
+    def find_similar_courses_by_embedding(self, query_embedding: np.ndarray, top_k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Return the top-k most similar courses for an already embedded query.
+        
+        Args:
+            query_embedding: Normalized query embedding (e.g. from embed_student_queries)
+            top_k: Number of similar courses to return
+            
+        Returns:
+            List of top-k most similar courses with similarity scores
+        """
+        indices, scores = self.search_indices(query_embedding, top_k)
+        
+        return [
+            {**self.courses[i], 'similarity_score': score, 'rank': rank}
+            for rank, (i, score) in enumerate(zip(indices.tolist(), scores.tolist()), start=1)
+        ]
+    
+    def search_indices(self, query_embedding: np.ndarray, top_k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the top-k course positions and scores for an already embedded query.
+        
+        Builds no result dicts; callers index self.courses with the positions.
+        
+        Args:
+            query_embedding: Normalized query embedding (e.g. from embed_student_queries)
+            top_k: Number of similar courses to return
+            
+        Returns:
+            Tuple of (course indices, similarity scores), most similar first
+        """
+        if self.faiss_index is None:
+            logger.error("FAISS index not built. Please embed courses first.")
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
         
         # Search FAISS index
         similarities, indices = self.faiss_index.search(
-            query_embedding.reshape(1, -1), top_k
+            np.ascontiguousarray(query_embedding, dtype=np.float32).reshape(1, -1), top_k
         )
         
-        # Prepare results
-        results = []
-        for i, (similarity, course_idx) in enumerate(zip(similarities[0], indices[0])):
-            if course_idx < len(self.courses):
-                course = self.courses[course_idx].copy()
-                course['similarity_score'] = float(similarity)
-                course['rank'] = i + 1
-                results.append(course)
+        # FAISS pads with -1 when fewer than k courses are indexed
+        valid = indices[0] >= 0
+        return indices[0][valid], similarities[0][valid]
+    
+    def find_similar_courses_batch(self, queries: List[str], top_k: int = 5) -> List[List[Dict[str, Any]]]:
+        """
+        Find the top-k most similar courses for several queries at once.
         
-        logger.info(f"✅ Found {len(results)} similar courses for query: '{query}'")
+        Queries not already cached are embedded in one API request, and all of
+        them are searched with a single FAISS call.
+        
+        Args:
+            queries: Student queries
+            top_k: Number of similar courses to return per query
+            
+        Returns:
+            One list of top-k courses with similarity scores per query
+        """
+        if self.faiss_index is None:
+            logger.error("FAISS index not built. Please embed courses first.")
+            return [[] for _ in queries]
+        
+        if not queries:
+            return []
+        
+        try:
+            query_embeddings = self._embed_queries(queries)
+        except Exception as e:
+            logger.error(f"Error creating query embeddings: {e}")
+            return [[] for _ in queries]
+        
+        similarities, indices = self.faiss_index.search(query_embeddings, top_k)
+        results = self._assemble_results(similarities, indices)
+        
+        logger.info(f"✅ Found similar courses for {len(queries)} queries")
+        
+        return results
+    
+    def _assemble_results(self, similarities: np.ndarray, indices: np.ndarray) -> List[List[Dict[str, Any]]]:
+        """
+        Turn FAISS search output into ranked course results.
+        
+        Matched courses are gathered with one np.take over courses_arr; each
+        result is a new dict, so stored courses are never mutated.
+        
+        Args:
+            similarities: (B, k) similarity scores from FAISS
+            indices: (B, k) course indices from FAISS
+            
+        Returns:
+            One list of ranked courses with similarity scores per query row
+        """
+        # FAISS pads with -1 when fewer than k courses are indexed
+        valid = indices >= 0
+        matched_courses = np.take(self.courses_arr, np.where(valid, indices, 0), axis=0)
+        
+        results = []
+        for row_courses, row_scores, row_valid in zip(matched_courses, similarities, valid):
+            results.append([
+                {**course, 'similarity_score': score, 'rank': rank}
+                for rank, (course, score) in enumerate(
+                    zip(row_courses[row_valid], row_scores[row_valid].tolist()), start=1
+                )
+            ])
         
         return results
     
@@ -242,6 +628,10 @@ class EmbeddingBasedCourseSearch:
         """
         Save course embeddings to disk for reuse.
         
+        The embedding matrix is written as a binary ``.npy`` file and the FAISS
+        index as a ``.faiss`` file next to ``filepath``; ``filepath`` itself holds
+        a small JSON sidecar with the course data and model name.
+        
         Args:
             filepath: Path to save embeddings
         """
@@ -249,14 +639,22 @@ class EmbeddingBasedCourseSearch:
             logger.warning("No embeddings to save")
             return
         
+        np.save(filepath + ".npy", self.course_embeddings)
+        if self.faiss_index is not None:
+            faiss.write_index(self.faiss_index, filepath + ".faiss")
+        
         data = {
-            'embeddings': self.course_embeddings.tolist(),
             'courses': self.courses,
-            'embedding_model': self.embedding_model
+            'embedding_model': self.embedding_model,
+            'normalized': self._normalized
         }
         
-        with open(filepath, 'w') as f:
-            json.dump(data, f)
+        if orjson is not None:
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(data))
+        else:
+            with open(filepath, 'w') as f:
+                json.dump(data, f)
         
         logger.info(f"Saved embeddings to {filepath}")
     
@@ -264,18 +662,46 @@ class EmbeddingBasedCourseSearch:
         """
         Load pre-computed embeddings from disk.
         
+        Reads the binary layout written by save_embeddings, memory-mapping both
+        the embedding matrix and the stored FAISS index so processes on the
+        same host share their pages. Older files with embeddings inlined as
+        JSON lists are still supported.
+        
+        A memory-mapped index is read-only; embed_courses builds a fresh
+        in-memory index before any new vectors are added.
+        
         Args:
             filepath: Path to load embeddings from
         """
         try:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
+            if orjson is not None:
+                with open(filepath, 'rb') as f:
+                    data = orjson.loads(f.read())
+            else:
+                with open(filepath, 'r') as f:
+                    data = json.load(f)
             
-            self.course_embeddings = np.array(data['embeddings'], dtype=np.float32)
             self.courses = data['courses']
+            self.courses_arr = _to_object_array(self.courses)
             self.embedding_model = data.get('embedding_model', 'text-embedding-3-small')
             
-            self._build_faiss_index()
+            if 'embeddings' in data:
+                # Legacy format: embeddings stored inline as JSON lists
+                self.course_embeddings = np.array(data['embeddings'], dtype=np.float32)
+            else:
+                self.course_embeddings = np.load(filepath + ".npy", mmap_mode='r')
+            
+            # Embeddings saved after normalization don't need it again
+            self._normalized = data.get('normalized', False)
+            
+            # Queries must be embedded at the same size as the stored courses
+            self.embedding_dimension = self.course_embeddings.shape[1]
+            
+            if 'embeddings' not in data and os.path.exists(filepath + ".faiss"):
+                self.faiss_index = faiss.read_index(filepath + ".faiss", faiss.IO_FLAG_MMAP)
+                self._set_search_params()
+            else:
+                self._build_faiss_index()
             
             logger.info(f"Loaded embeddings from {filepath}")
             
@@ -292,15 +718,51 @@ class EmbeddingBasedCourseSearch:
         if len(self.course_embeddings) == 0:
             return {"status": "No embeddings available"}
         
+        C = self.course_embeddings
+        norms = np.sqrt(np.einsum('ij,ij->i', C, C))
+        
         return {
             "num_courses": len(self.courses),
             "embedding_dimension": self.embedding_dimension,
             "embedding_model": self.embedding_model,
             "faiss_index_size": self.faiss_index.ntotal if self.faiss_index else 0,
-            "average_embedding_norm": float(np.mean(np.linalg.norm(self.course_embeddings, axis=1)))
+            "average_embedding_norm": float(np.mean(norms))
         }
 
 
+def _to_object_array(items: List[Any]) -> np.ndarray:
+    """
+    Wrap a list in a 1-D object array without NumPy inspecting its elements.
+    
+    Args:
+        items: Items to wrap
+        
+    Returns:
+        Object ndarray holding the same item references
+    """
+    arr = np.empty(len(items), dtype=object)
+    arr[:] = items
+    return arr
+
+
+def _follow_up_queries(query: str, limit: int = 3) -> List[str]:
+    """
+    Suggest likely follow-up queries by splitting a query into its interests.
+    
+    Students who ask about several interests ("psychology and AI") often
+    narrow down to one of them next.
+    
+    Args:
+        query: Student query
+        limit: Maximum number of suggestions
+        
+    Returns:
+        Individual interests from the query (empty if there is only one)
+    """
+    parts = [part.strip() for part in _INTEREST_SEPARATORS.split(query) if part.strip()]
+    return parts[:limit] if len(parts) > 1 else []
+
+
 def demo_day3_requirements():
     """
     Demonstrate all Day 3 requirements in action.
@@ -343,12 +805,13 @@ def demo_day3_requirements():
         print("\n🔍 Testing student query embeddings and similarity search:")
         print("-" * 50)
         
-        for query in test_queries:
+        # ✅ Day 3 Requirement 3: Return top 5 most similar courses
+        # (all test queries are embedded in one batched API call)
+        batch_results = search_system.find_similar_courses_batch(test_queries, top_k=5)
+        
+        for query, similar_courses in zip(test_queries, batch_results):
             print(f"\n📝 Query: '{query}'")
             
-            # ✅ Day 3 Requirement 3: Return top 5 most similar courses
-            similar_courses = search_system.search_courses_by_interests(query, top_k=5)
-            
             print(f"🎯 Top {len(similar_courses)} most similar courses:")
             
             for course in similar_courses:
@@ -410,6 +873,9 @@ def main():
                 print(f"\n🎯 Top {len(results)} recommendations:")
                 for course in results:
                     print(f"   {course['rank']}. {course['title']} - Similarity: {course['similarity_score']:.3f}")
+                
+                # Embed likely follow-ups while the student reads the results
+                search_system.prefetch_queries(_follow_up_queries(user_query))
             else:
                 print("Please enter valid student interests.")
         
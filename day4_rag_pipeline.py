@@ -13,17 +13,38 @@ Date: Day 4 Implementation
 
 import os
 import json
+import atexit
+import asyncio
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator, Union
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
+import httpx
 import numpy as np
-from openai import OpenAI
+import faiss
+from openai import OpenAI, AsyncOpenAI, DefaultAsyncHttpxClient
 from dotenv import load_dotenv
 
+try:
+    import simsimd
+except ImportError:  # SimSIMD is an optional speedup; fall back to the NumPy matmul
+    simsimd = None
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken is optional; estimate tokens from text length instead
+    tiktoken = None
+
 # Import our existing components
 from day3_embedding_search import EmbeddingBasedCourseSearch
 from src.data_manager import load_courses
+from src import fast_sim
 
 # Load environment variables
 load_dotenv()
@@ -32,6 +53,17 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Default chat model and generation settings for recommendations
+LLM_MODEL = "gpt-4o-mini"
+LLM_MAX_TOKENS = 500
+LLM_TEMPERATURE = 0.7
+
+# Directory for the embedded course catalog, keyed by model and catalog hash
+COURSE_EMBEDDING_CACHE_DIR = ".cache"
+
+# Start of the response returned when the LLM request fails
+LLM_ERROR_PREFIX = "I apologize, but I encountered an error generating a response."
+
 
 class ConfidenceLevel(Enum):
     """Confidence levels for RAG responses"""
@@ -41,6 +73,150 @@ class ConfidenceLevel(Enum):
     FALLBACK = "fallback"
 
 
+class RateLimiter:
+    """
+    Sliding-window limiter capping requests per minute.
+    
+    Only used from a single event loop, so checking and recording a slot
+    needs no lock: nothing awaits between the two.
+    """
+    
+    def __init__(self, max_per_minute: int):
+        """
+        Initialize the rate limiter.
+        
+        Args:
+            max_per_minute: Maximum number of requests started in any 60s window
+        """
+        self.max_per_minute = max_per_minute
+        self._timestamps: deque = deque()
+    
+    async def acquire(self) -> None:
+        """Wait until a request slot is free in the current minute window."""
+        while True:
+            now = time.monotonic()
+            while self._timestamps and now - self._timestamps[0] >= 60.0:
+                self._timestamps.popleft()
+            
+            if len(self._timestamps) < self.max_per_minute:
+                self._timestamps.append(now)
+                return
+            
+            await asyncio.sleep(60.0 - (now - self._timestamps[0]))
+
+
+def _normalize_query(qvec: np.ndarray) -> np.ndarray:
+    """Return the query embedding as a unit-length float32 vector."""
+    q = np.asarray(qvec, dtype=np.float32).ravel()
+    return q / max(float(np.sqrt(np.vdot(q, q))), 1e-12)
+
+
+def _similarity_stats(similarities: List[float]) -> Tuple[float, float, float]:
+    """Return (min, max, mean) of similarity scores, all NaN when there are none."""
+    if not similarities:
+        return float('nan'), float('nan'), float('nan')
+    sims = np.asarray(similarities, dtype=np.float32)
+    return float(sims.min()), float(sims.max()), float(sims.mean())
+
+
+class VectorIndex(ABC):
+    """Top-k cosine search over the rows of an L2-normalized matrix."""
+    
+    @abstractmethod
+    def query(self, qvec: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the rows most similar to a query embedding.
+        
+        Args:
+            qvec: Query embedding
+            top_k: Number of rows to return
+            
+        Returns:
+            Tuple of (row indices, similarity scores), most similar first
+        """
+
+
+class BruteForceIndex(VectorIndex):
+    """
+    Exact scan over int8-quantized rows.
+    
+    Rows are stored as int8 with a per-row scale, a quarter of the float32
+    footprint and memory bandwidth. Scoring uses SimSIMD's int8 cosine when it
+    is installed, otherwise the fast_sim kernel (Numba-compiled when
+    available). With rerank, float32 rows are kept and a shortlist from the
+    int8 scan is rescored exactly.
+    """
+    
+    def __init__(self, C: np.ndarray, rerank: bool = False, rerank_factor: int = 4):
+        """
+        Initialize the index.
+        
+        Args:
+            C: L2-normalized float32 corpus matrix
+            rerank: Rescore the int8 shortlist with the float32 rows
+            rerank_factor: Shortlist size as a multiple of top_k when reranking
+        """
+        self.C_q, self.inv_scales = fast_sim.quantize_int8(C)
+        self.C = C if rerank else None
+        self.rerank_factor = rerank_factor
+        
+        # Compile the Numba kernels now rather than on the first query
+        if simsimd is None:
+            fast_sim.warmup(C.shape[1])
+    
+    def query(self, qvec: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        q = _normalize_query(qvec)
+        q_q, q_inv_scale = fast_sim.quantize_int8(q)
+        
+        if simsimd is not None:
+            scores = 1.0 - np.asarray(simsimd.cdist(q_q[None], self.C_q, metric='cosine'))[0]
+        else:
+            scores = fast_sim.cosine_scores_int8(self.C_q, self.inv_scales, q_q, float(q_inv_scale))
+        
+        k = min(top_k, scores.shape[0])
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        
+        n = k if self.C is None else min(k * self.rerank_factor, scores.shape[0])
+        
+        # O(N) selection of the top n, then sort only those n
+        part = np.argpartition(-scores, n - 1)[:n]
+        if self.C is not None:
+            scores = np.zeros_like(scores)
+            scores[part] = self.C[part] @ q
+        top = part[np.argsort(-scores[part])][:k]
+        return top, scores[top]
+
+
+class HNSWIndex(VectorIndex):
+    """Approximate search over a FAISS HNSW graph for large catalogs."""
+    
+    def __init__(self, C: np.ndarray, M: int = 32, ef_construction: int = 200,
+                 ef_search: int = 50):
+        """
+        Initialize the index.
+        
+        Args:
+            C: L2-normalized float32 corpus matrix
+            M: Graph neighbors per node
+            ef_construction: Candidate list size while building the graph
+            ef_search: Candidate list size per query; higher trades speed for recall
+        """
+        self.index = faiss.IndexHNSWFlat(C.shape[1], M, faiss.METRIC_INNER_PRODUCT)
+        self.index.hnsw.efConstruction = ef_construction
+        self.index.hnsw.efSearch = ef_search
+        self.index.add(np.ascontiguousarray(C, dtype=np.float32))
+    
+    def query(self, qvec: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        k = min(top_k, self.index.ntotal)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        
+        scores, indices = self.index.search(_normalize_query(qvec).reshape(1, -1), k)
+        found = indices[0] >= 0
+        return indices[0][found], scores[0][found]
+
+
 @dataclass
 class RAGResponse:
     """Structured response from the RAG pipeline"""
@@ -67,46 +243,227 @@ class Day4RAGPipeline:
     7. Fallback handling for low similarity
     """
     
-    def __init__(self, api_key: Optional[str] = None, similarity_threshold: float = 0.3):
+    # Corpus size at which retrieval switches from exact search to HNSW
+    hnsw_threshold = 5000
+    
+    # Rescore the int8 brute-force shortlist with float32 embeddings
+    exact_rerank = False
+    
+    # RAG prompt; only the query, context and confidence slots vary per call
+    _PROMPT_TMPL = """You are an expert course advisor for a computer science program. Your task is to provide personalized course recommendations based on student interests and retrieved course information.
+
+STUDENT QUERY: "{query}"
+
+RETRIEVED COURSE CONTEXT:
+{context}
+
+CONFIDENCE LEVEL: {confidence}
+
+INSTRUCTIONS:
+1. Analyze the student's query to understand their interests, goals, and preferences
+2. Use the retrieved course information to make informed recommendations
+3. Explain WHY each course is relevant to their interests
+4. Consider prerequisites, difficulty levels, and course categories
+5. Provide specific, actionable advice
+6. If confidence is low, acknowledge limitations and suggest broader exploration
+
+RESPONSE FORMAT:
+- Start with a brief analysis of the student's interests
+- Provide 3-5 specific course recommendations with detailed explanations
+- Include practical advice about prerequisites and planning
+- End with additional suggestions or next steps
+
+RESPONSE:"""
+    
+    # Appended to the prompt when retrieval fell back to low-similarity results
+    _FALLBACK_TAIL = """
+            
+NOTE: The similarity search returned limited relevant results. Please provide general guidance and suggest the student:
+1. Refine their query with more specific interests
+2. Explore course categories that might align with their goals
+3. Consider speaking with an academic advisor for personalized guidance"""
+    
+    def __init__(self, api_key: Optional[str] = None, similarity_threshold: float = 0.3,
+                 max_concurrent: int = 10, max_rpm: int = 500,
+                 response_cache_size: int = 256, response_cache_ttl: float = 3600.0,
+                 max_context_tokens: int = 1500, model: str = LLM_MODEL,
+                 max_tokens: int = LLM_MAX_TOKENS, temperature: float = LLM_TEMPERATURE,
+                 client: Optional[OpenAI] = None):
         """
         Initialize the RAG pipeline.
         
         Args:
             api_key: OpenAI API key
             similarity_threshold: Minimum similarity score for confidence
+            max_concurrent: Maximum number of async LLM requests in flight
+            max_rpm: Maximum number of async LLM requests started per minute
+            response_cache_size: Maximum number of cached RAG responses
+            response_cache_ttl: Seconds a cached RAG response stays valid
+            max_context_tokens: Token budget for the retrieved course context
+            model: Chat model used to generate responses
+            max_tokens: Maximum number of tokens generated per response
+            temperature: Sampling temperature for generation
+            client: OpenAI client to share, e.g. with a wrapping pipeline
         """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OpenAI API key must be provided or set in OPENAI_API_KEY environment variable")
         
-        self.client = OpenAI(api_key=self.api_key)
+        self.client = client or OpenAI(api_key=self.api_key)
+        
+        # One keep-alive connection pool for all async LLM calls, sized above
+        # max_concurrent so in-flight requests never wait for a connection.
+        # The client retries 429s and 5xx errors with exponential backoff and jitter
+        self._http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+        )
+        self.aclient = AsyncOpenAI(api_key=self.api_key, max_retries=5, http_client=self._http_client)
         self.similarity_threshold = similarity_threshold
         
+        # Default generation settings; process_query accepts per-call overrides
+        self.model = model
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        
+        # Context token budget, measured with the chat model's tokenizer if available
+        self.max_context_tokens = max_context_tokens
+        self._encoding = self._load_encoding()
+        
+        # Async request limits; the semaphore is created per event loop
+        self.max_concurrent = max_concurrent
+        self._rate_limiter = RateLimiter(max_rpm)
+        self._llm_semaphore: Optional[asyncio.Semaphore] = None
+        self._llm_semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # LRU cache of RAG responses: key -> (stored_at, response). Query
+        # embeddings are cached separately by the embedding search.
+        self.response_cache_size = response_cache_size
+        self.response_cache_ttl = response_cache_ttl
+        self._response_cache: "OrderedDict[str, Tuple[float, RAGResponse]]" = OrderedDict()
+        self._response_cache_lock = threading.Lock()
+        
         # Initialize embedding search system
         self.embedding_search = EmbeddingBasedCourseSearch(api_key=self.api_key)
         
-        # Load and embed courses
+        # Load courses and their embeddings, embedding only on a cache miss
         self.courses = load_courses("data/courses.json")
-        self.embedding_search.embed_courses(self.courses)
+        self._load_or_embed_courses()
+        
+        # Index over the normalized (N, d) corpus matrix
+        C, self._C_courses = self._build_corpus_matrix()
+        self._index = self._build_index(C)
         
         logger.info(f"Initialized Day4RAGPipeline with {len(self.courses)} courses")
     
-    def _determine_confidence(self, similarities: List[float]) -> ConfidenceLevel:
+    def close(self) -> None:
+        """
+        Close the async HTTP connection pool.
+        
+        The pool's connections belong to the event loop that last used it. If
+        that loop is still running, e.g. a background loop in another thread,
+        the pool is closed on it; otherwise on a new loop. Must not be called
+        from a coroutine, e.g. call it at shutdown.
+        """
+        if self._http_client.is_closed:
+            return
+        
+        loop = self._llm_semaphore_loop
+        try:
+            if loop is not None and loop.is_running():
+                asyncio.run_coroutine_threadsafe(self._http_client.aclose(), loop).result(timeout=10)
+            else:
+                asyncio.run(self._http_client.aclose())
+        except Exception as e:
+            logger.warning(f"Error closing HTTP client: {e}")
+    
+    def _load_or_embed_courses(self) -> None:
+        """
+        Load the course embeddings from disk, embedding the catalog on a miss.
+        
+        The cache file name combines the embedding model with a SHA-256 of the
+        catalog and embedding size, so any change to either re-embeds. Cached
+        embeddings are memory-mapped rather than read into memory.
+        """
+        search = self.embedding_search
+        payload = json.dumps([search.embedding_dimension, self.courses], sort_keys=True)
+        digest = hashlib.sha256(payload.encode()).hexdigest()
+        path = os.path.join(COURSE_EMBEDDING_CACHE_DIR, f"course_emb_{search.embedding_model}_{digest}")
+        
+        if os.path.exists(path + ".npy"):
+            search.load_embeddings(path)
+            if len(search.courses) == len(self.courses):
+                logger.info(f"Loaded cached course embeddings from {path}.npy")
+                return
+        
+        search.embed_courses(self.courses)
+        
+        # Don't cache a partial catalog; failed courses are retried next start
+        if len(search.courses) == len(self.courses):
+            os.makedirs(COURSE_EMBEDDING_CACHE_DIR, exist_ok=True)
+            search.save_embeddings(path)
+    
+    def _build_corpus_matrix(self) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+        """
+        Build the L2-normalized course matrix the retrieval index is built from.
+        
+        Returns:
+            Tuple of (float32 matrix with one row per course, matching courses)
+        """
+        C = np.ascontiguousarray(self.embedding_search.course_embeddings, dtype=np.float32)
+        norms = np.sqrt(np.einsum('ij,ij->i', C, C))[:, None]
+        
+        # Embedding search already stores unit vectors; only rescale if needed
+        if not np.allclose(norms, 1.0, atol=1e-3):
+            C = C / np.maximum(norms, 1e-12)
+        
+        return C, self.embedding_search.courses
+    
+    def _build_index(self, C: np.ndarray) -> "VectorIndex":
+        """
+        Pick the vector index for the corpus size.
+        
+        A brute-force scan is fast enough for small catalogs; an HNSW graph only pays
+        off once the corpus reaches hnsw_threshold courses.
+        
+        Args:
+            C: L2-normalized corpus matrix
+            
+        Returns:
+            Index over the rows of C
+        """
+        if C.shape[0] >= self.hnsw_threshold:
+            logger.info(f"Using HNSW index for {C.shape[0]} courses")
+            return HNSWIndex(C)
+        return BruteForceIndex(C, rerank=self.exact_rerank)
+    
+    def _retrieve_vec(self, qvec: np.ndarray, top_k: int) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Retrieve the top-k courses for a query embedding by cosine similarity.
+        
+        Args:
+            qvec: Query embedding
+            top_k: Number of courses to retrieve
+            
+        Returns:
+            (course, similarity) tuples, most similar first
+        """
+        indices, scores = self._index.query(qvec, top_k)
+        return list(zip([self._C_courses[i] for i in indices.tolist()], scores.tolist()))
+    
+    def _determine_confidence(self, max_similarity: float, avg_similarity: float) -> ConfidenceLevel:
         """
         Determine confidence level based on similarity scores.
         
         Args:
-            similarities: List of similarity scores
+            max_similarity: Highest similarity score (NaN if nothing was retrieved)
+            avg_similarity: Mean similarity score (NaN if nothing was retrieved)
             
         Returns:
             Confidence level
         """
-        if not similarities:
+        if np.isnan(max_similarity):
             return ConfidenceLevel.FALLBACK
         
-        max_similarity = max(similarities)
-        avg_similarity = sum(similarities) / len(similarities)
-        
         if max_similarity >= 0.6 and avg_similarity >= 0.4:
             return ConfidenceLevel.HIGH
         elif max_similarity >= 0.4 and avg_similarity >= 0.3:
@@ -132,19 +489,93 @@ class Day4RAGPipeline:
         if not retrieved_courses:
             return "No relevant courses found."
         
-        context_parts = ["RELEVANT COURSES FOUND:"]
+        header = "RELEVANT COURSES FOUND:"
+        context_parts = [header]
+        budget = self.max_context_tokens - self._count_tokens(header)
         
+        # Take each course at full detail while it fits the token budget, then
+        # fall back to its title, code and score only
         for i, (course, similarity) in enumerate(retrieved_courses[:max_courses], 1):
-            context_parts.append(f"""
-{i}. {course['title']} ({course['code']})
-   - Description: {course['description']}
-   - Credits: {course['credits']} | Difficulty: {course['difficulty']}/5
-   - Category: {course['category']} | Semester: {course['semester']}
-   - Prerequisites: {course.get('prerequisites', 'None')}
-   - Relevance Score: {similarity:.3f}
-""")
+            block = self._summarize_course(course, similarity, i)
+            cost = self._count_tokens(block) + 1
+            if cost > budget:
+                block = self._summarize_course(course, similarity, i, max_desc_chars=0)
+                cost = self._count_tokens(block) + 1
+                if cost > budget:
+                    break
+            
+            context_parts.append(block)
+            budget -= cost
+        
+        return "\n".join(context_parts)
+    
+    def _summarize_course(self, course: Dict[str, Any], similarity: float, rank: int,
+                          max_desc_chars: int = 240) -> str:
+        """
+        Format one retrieved course as a compact context block.
+        
+        The description is cut at a word boundary after max_desc_chars, and the
+        semester is left out as it rarely affects a recommendation. With
+        max_desc_chars=0 only the title, code and relevance score remain.
+        
+        Args:
+            course: Course data
+            similarity: Similarity score for the course
+            rank: Position of the course in the retrieved list
+            max_desc_chars: Maximum description length in characters
+            
+        Returns:
+            Context block for the course
+        """
+        title_line = f"{rank}. {course['title']} ({course['code']})"
+        if max_desc_chars <= 0:
+            return f"{title_line} | Relevance Score: {similarity:.3f}"
+        
+        description = course['description']
+        if len(description) > max_desc_chars:
+            description = description[:max_desc_chars].rsplit(' ', 1)[0].rstrip(',.;') + "..."
+        
+        prerequisites = course.get('prerequisites') or 'None'
+        if isinstance(prerequisites, list):
+            prerequisites = ", ".join(prerequisites)
+        
+        return (
+            f"{title_line}\n"
+            f"   - Description: {description}\n"
+            f"   - Credits: {course['credits']} | Difficulty: {course['difficulty']}/5 | Category: {course['category']}\n"
+            f"   - Prerequisites: {prerequisites}\n"
+            f"   - Relevance Score: {similarity:.3f}"
+        )
+    
+    def _load_encoding(self):
+        """
+        Load the chat model's tokenizer.
+        
+        Returns:
+            tiktoken encoding, or None if tiktoken or its BPE files are unavailable
+        """
+        if tiktoken is None:
+            return None
+        
+        try:
+            return tiktoken.encoding_for_model(self.model)
+        except Exception as e:
+            logger.warning(f"Could not load tokenizer for {self.model}, estimating tokens: {e}")
+            return None
+    
+    def _count_tokens(self, text: str) -> int:
+        """
+        Count the tokens text will use in the prompt.
         
-        return "\\n".join(context_parts)
+        Args:
+            text: Text to measure
+            
+        Returns:
+            Token count, estimated at four characters per token without tiktoken
+        """
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return len(text) // 4 + 1
     
     def _create_rag_prompt(self, query: str, context: str, confidence: ConfidenceLevel) -> str:
         """
@@ -160,94 +591,160 @@ class Day4RAGPipeline:
         Returns:
             Formatted prompt for LLM
         """
-        base_prompt = f"""You are an expert course advisor for a computer science program. Your task is to provide personalized course recommendations based on student interests and retrieved course information.
-
-STUDENT QUERY: "{query}"
-
-RETRIEVED COURSE CONTEXT:
-{context}
-
-CONFIDENCE LEVEL: {confidence.value}
-
-INSTRUCTIONS:
-1. Analyze the student's query to understand their interests, goals, and preferences
-2. Use the retrieved course information to make informed recommendations
-3. Explain WHY each course is relevant to their interests
-4. Consider prerequisites, difficulty levels, and course categories
-5. Provide specific, actionable advice
-6. If confidence is low, acknowledge limitations and suggest broader exploration
-
-RESPONSE FORMAT:
-- Start with a brief analysis of the student's interests
-- Provide 3-5 specific course recommendations with detailed explanations
-- Include practical advice about prerequisites and planning
-- End with additional suggestions or next steps
-
-RESPONSE:"""
-
+        prompt = self._PROMPT_TMPL.format_map({
+            "query": query,
+            "context": context,
+            "confidence": confidence.value
+        })
+        
         if confidence == ConfidenceLevel.FALLBACK:
-            base_prompt += """
+            prompt += self._FALLBACK_TAIL
+        
+        return prompt
+    
+    def _build_llm_messages(self, prompt: str, json_output: bool = False) -> List[Dict[str, str]]:
+        """
+        Build the chat messages sent to the LLM.
+        
+        Args:
+            prompt: Formatted prompt
+            json_output: Ask for a JSON object, as JSON mode requires
             
-NOTE: The similarity search returned limited relevant results. Please provide general guidance and suggest the student:
-1. Refine their query with more specific interests
-2. Explore course categories that might align with their goals
-3. Consider speaking with an academic advisor for personalized guidance"""
+        Returns:
+            System and user messages
+        """
+        system_content = "You are an expert academic advisor specializing in computer science course recommendations. Provide helpful, specific, and encouraging advice to students."
+        if json_output:
+            system_content += " Respond with a JSON object."
+        
+        return [
+            {
+                "role": "system",
+                "content": system_content
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    
+    def _llm_request_params(self, llm_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Resolve the chat completion settings for one request.
+        
+        Args:
+            llm_options: Per-call overrides for model, max_tokens, temperature
+                or response_format
+            
+        Returns:
+            Keyword arguments for chat.completions.create, without messages
+        """
+        params = {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature
+        }
+        if llm_options:
+            params.update(llm_options)
+        return params
+    
+    def _llm_request(self, prompt: str, llm_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Build the full chat completion request for a prompt.
         
-        return base_prompt
+        Args:
+            prompt: Formatted prompt
+            llm_options: Per-call overrides, see _llm_request_params
+            
+        Returns:
+            Keyword arguments for chat.completions.create
+        """
+        params = self._llm_request_params(llm_options)
+        json_output = params.get("response_format", {}).get("type") == "json_object"
+        params["messages"] = self._build_llm_messages(prompt, json_output=json_output)
+        return params
     
-    def _generate_llm_response(self, prompt: str) -> str:
+    def _generate_llm_response(self, prompt: str, llm_options: Optional[Dict[str, Any]] = None) -> str:
         """
         Generate response using OpenAI LLM.
         
         Args:
             prompt: Formatted prompt
+            llm_options: Per-call overrides, see _llm_request_params
             
         Returns:
             LLM response
         """
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert academic advisor specializing in computer science course recommendations. Provide helpful, specific, and encouraging advice to students."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=1000,
-                temperature=0.7
-            )
+            response = self.client.chat.completions.create(**self._llm_request(prompt, llm_options))
             
             return response.choices[0].message.content.strip()
             
         except Exception as e:
             logger.error(f"Error generating LLM response: {e}")
-            return f"I apologize, but I encountered an error generating a response. Please try again or contact support. Error: {str(e)}"
+            return f"{LLM_ERROR_PREFIX} Please try again or contact support. Error: {str(e)}"
     
-    def _generate_reasoning(self, query: str, confidence: ConfidenceLevel, similarities: List[float]) -> str:
+    async def _agenerate_llm_response(self, prompt: str, llm_options: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Async variant of _generate_llm_response using the shared AsyncOpenAI client.
+        
+        Args:
+            prompt: Formatted prompt
+            llm_options: Per-call overrides, see _llm_request_params
+            
+        Returns:
+            LLM response
+        """
+        try:
+            async with self._get_llm_semaphore():
+                await self._rate_limiter.acquire()
+                response = await self.aclient.chat.completions.create(**self._llm_request(prompt, llm_options))
+            
+            return response.choices[0].message.content.strip()
+            
+        except Exception as e:
+            logger.error(f"Error generating LLM response: {e}")
+            return f"{LLM_ERROR_PREFIX} Please try again or contact support. Error: {str(e)}"
+    
+    def _get_llm_semaphore(self) -> asyncio.Semaphore:
+        """
+        Get the semaphore bounding in-flight async LLM requests.
+        
+        asyncio primitives belong to one event loop, and each asyncio.run()
+        starts a new one, so the semaphore is recreated when the loop changes.
+        
+        Returns:
+            Semaphore for the running event loop
+        """
+        loop = asyncio.get_running_loop()
+        if self._llm_semaphore is None or self._llm_semaphore_loop is not loop:
+            self._llm_semaphore = asyncio.Semaphore(self.max_concurrent)
+            self._llm_semaphore_loop = loop
+        return self._llm_semaphore
+    
+    def _generate_reasoning(self, query: str, confidence: ConfidenceLevel,
+                            stats: Tuple[float, float, float], count: int) -> str:
         """
         Generate reasoning explanation for the response.
         
         Args:
             query: Original query
             confidence: Confidence level
-            similarities: Similarity scores
+            stats: (min, max, mean) similarity from _similarity_stats
+            count: Number of retrieved courses
             
         Returns:
             Reasoning explanation
         """
+        min_similarity, max_similarity, avg_similarity = stats
         reasoning_parts = [
             f"Query Analysis: Processed student interest in '{query}'",
-            f"Vector Search: Found {len(similarities)} relevant courses",
+            f"Vector Search: Found {count} relevant courses",
         ]
         
-        if similarities:
-            reasoning_parts.append(f"Similarity Range: {min(similarities):.3f} - {max(similarities):.3f}")
-            reasoning_parts.append(f"Average Similarity: {sum(similarities)/len(similarities):.3f}")
+        if count:
+            reasoning_parts.append(f"Similarity Range: {min_similarity:.3f} - {max_similarity:.3f}")
+            reasoning_parts.append(f"Average Similarity: {avg_similarity:.3f}")
         
         reasoning_parts.append(f"Confidence Level: {confidence.value} ({self._get_confidence_explanation(confidence)})")
         
@@ -263,7 +760,9 @@ NOTE: The similarity search returned limited relevant results. Please provide ge
         }
         return explanations.get(confidence, "Unknown confidence level")
     
-    def process_query(self, query: str, top_k: int = 5) -> RAGResponse:
+    def process_query(self, query: str, top_k: int = 5,
+                      llm_options: Optional[Dict[str, Any]] = None,
+                      force_llm: bool = False) -> RAGResponse:
         """
         ✅ Day 4 Requirement: Complete RAG pipeline
         
@@ -273,42 +772,110 @@ NOTE: The similarity search returned limited relevant results. Please provide ge
         Args:
             query: Student query about course interests
             top_k: Number of courses to retrieve
+            llm_options: Per-call overrides for model, max_tokens, temperature
+                or response_format (e.g. {"type": "json_object"})
+            force_llm: Call the LLM even when confidence is FALLBACK, instead
+                of returning the canned fallback guidance
+            
+        Returns:
+            Structured RAG response
+        """
+        return self.process_query_with_vec(query, None, top_k=top_k, llm_options=llm_options, force_llm=force_llm)
+    
+    def process_query_with_vec(self, query: str, query_vec: Optional[np.ndarray], top_k: int = 5,
+                               llm_options: Optional[Dict[str, Any]] = None,
+                               force_llm: bool = False) -> RAGResponse:
+        """
+        Process a query whose embedding was already computed.
+        
+        Same as process_query, but retrieval searches with query_vec instead of
+        embedding the query again (see embed_queries_batch).
+        
+        Args:
+            query: Student query about course interests
+            query_vec: Normalized query embedding (embedded on demand if None)
+            top_k: Number of courses to retrieve
+            llm_options: Per-call overrides, see process_query
+            force_llm: Call the LLM even on the FALLBACK path, see process_query
             
         Returns:
             Structured RAG response
         """
         logger.info(f"Processing RAG query: '{query}'")
         
+        cache_key = self._response_cache_key(query, top_k, llm_options)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            # Step 1: Embed the query
-            logger.info("Step 1: Embedding query...")
+            retrieved_courses, similarities, stats, confidence, context = self._retrieve_context(query, top_k, query_vec)
             
-            # Step 2: Retrieve similar courses
-            logger.info("Step 2: Retrieving similar courses...")
-            retrieved_results = self.embedding_search.search_courses_by_interests(query, top_k=top_k)
+            if confidence == ConfidenceLevel.FALLBACK and not force_llm:
+                return self._build_skipped_llm_response(query, retrieved_courses, similarities, stats, context)
             
-            # Extract courses and similarities from the results
-            retrieved_courses = []
-            similarities = []
+            # Step 5: Create RAG prompt with context injection
+            logger.info("Step 5: Creating RAG prompt with context injection...")
+            prompt = self._create_rag_prompt(query, context, confidence)
             
-            for result in retrieved_results:
-                course_copy = result.copy()
-                similarity = course_copy.pop('similarity_score', 0.0)
-                course_copy.pop('rank', None)  # Remove rank if present
-                
-                retrieved_courses.append((course_copy, similarity))
-                similarities.append(similarity)
+            # Step 6: Generate LLM response
+            logger.info("Step 6: Generating LLM response...")
+            llm_response = self._generate_llm_response(prompt, llm_options)
             
-            # Extract courses and similarities for further processing
-            courses = [course for course, similarity in retrieved_courses]
+            response = self._build_rag_response(query, llm_response, retrieved_courses, similarities, stats, confidence, context)
+            self._store_cached_response(cache_key, response)
+            return response
+            
+        except Exception as e:
+            return self._build_error_response(query, e)
+    
+    def embed_queries_batch(self, queries: List[str]) -> np.ndarray:
+        """
+        Embed several queries with a single embeddings request.
+        
+        Args:
+            queries: Student queries
             
-            # Step 3: Determine confidence level
-            confidence = self._determine_confidence(similarities)
-            logger.info(f"Step 3: Confidence level determined: {confidence.value}")
+        Returns:
+            Normalized query embeddings, one row per query
+        """
+        return self.embedding_search.embed_student_queries(queries)
+    
+    async def aprocess_query(self, query: str, top_k: int = 5,
+                             query_vec: Optional[np.ndarray] = None,
+                             llm_options: Optional[Dict[str, Any]] = None,
+                             force_llm: bool = False) -> RAGResponse:
+        """
+        Async variant of process_query.
+        
+        Retrieval runs in a worker thread and the LLM call is awaited on the
+        shared AsyncOpenAI client, so several queries can overlap their
+        network round-trips.
+        
+        Args:
+            query: Student query about course interests
+            top_k: Number of courses to retrieve
+            query_vec: Precomputed query embedding (embedded on demand if None)
+            llm_options: Per-call overrides, see process_query
+            force_llm: Call the LLM even on the FALLBACK path, see process_query
+            
+        Returns:
+            Structured RAG response
+        """
+        logger.info(f"Processing RAG query: '{query}'")
+        
+        cache_key = self._response_cache_key(query, top_k, llm_options)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            retrieved_courses, similarities, stats, confidence, context = await asyncio.to_thread(
+                self._retrieve_context, query, top_k, query_vec
+            )
             
-            # Step 4: Build context from retrieved documents
-            logger.info("Step 4: Building context from retrieved documents...")
-            context = self._build_context(retrieved_courses, max_courses=top_k)
+            if confidence == ConfidenceLevel.FALLBACK and not force_llm:
+                return self._build_skipped_llm_response(query, retrieved_courses, similarities, stats, context)
             
             # Step 5: Create RAG prompt with context injection
             logger.info("Step 5: Creating RAG prompt with context injection...")
@@ -316,39 +883,305 @@ NOTE: The similarity search returned limited relevant results. Please provide ge
             
             # Step 6: Generate LLM response
             logger.info("Step 6: Generating LLM response...")
-            llm_response = self._generate_llm_response(prompt)
-            
-            # Step 7: Generate reasoning
-            reasoning = self._generate_reasoning(query, confidence, similarities)
-            
-            # Step 8: Create structured response
-            response = RAGResponse(
-                response=llm_response,
-                confidence=confidence,
-                retrieved_courses=courses,
-                similarity_scores=similarities,
-                context_used=context,
-                reasoning=reasoning,
-                fallback_triggered=(confidence == ConfidenceLevel.FALLBACK)
-            )
+            llm_response = await self._agenerate_llm_response(prompt, llm_options)
             
-            logger.info(f"✅ RAG pipeline completed successfully with {confidence.value} confidence")
+            response = self._build_rag_response(query, llm_response, retrieved_courses, similarities, stats, confidence, context)
+            self._store_cached_response(cache_key, response)
             return response
             
         except Exception as e:
-            logger.error(f"Error in RAG pipeline: {e}")
-            
-            # Fallback response
-            fallback_response = self._generate_fallback_response(query, str(e))
-            return RAGResponse(
-                response=fallback_response,
-                confidence=ConfidenceLevel.FALLBACK,
-                retrieved_courses=[],
-                similarity_scores=[],
-                context_used="Error occurred during retrieval",
-                reasoning=f"Error in pipeline: {str(e)}",
-                fallback_triggered=True
+            return self._build_error_response(query, e)
+    
+    async def astream_query(self, query: str, top_k: int = 5,
+                            query_vec: Optional[np.ndarray] = None,
+                            llm_options: Optional[Dict[str, Any]] = None,
+                            force_llm: bool = False) -> AsyncIterator[Union[str, RAGResponse]]:
+        """
+        Stream the LLM response for a query as it is generated.
+        
+        Retrieval, confidence and the prompt are settled before the first
+        token, so callers can start rendering as soon as decoding begins.
+        
+        Args:
+            query: Student query about course interests
+            top_k: Number of courses to retrieve
+            query_vec: Precomputed query embedding (embedded on demand if None)
+            llm_options: Per-call overrides, see process_query
+            force_llm: Call the LLM even on the FALLBACK path, see process_query
+            
+        Yields:
+            Response text chunks, then the complete RAGResponse as the last item
+        """
+        logger.info(f"Streaming RAG query: '{query}'")
+        
+        cache_key = self._response_cache_key(query, top_k, llm_options)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            yield cached.response
+            yield cached
+            return
+        
+        try:
+            retrieved_courses, similarities, stats, confidence, context = await asyncio.to_thread(
+                self._retrieve_context, query, top_k, query_vec
             )
+        except Exception as e:
+            response = self._build_error_response(query, e)
+            yield response.response
+            yield response
+            return
+        
+        if confidence == ConfidenceLevel.FALLBACK and not force_llm:
+            response = self._build_skipped_llm_response(query, retrieved_courses, similarities, stats, context)
+            yield response.response
+            yield response
+            return
+        
+        prompt = self._create_rag_prompt(query, context, confidence)
+        
+        chunks = []
+        try:
+            async with self._get_llm_semaphore():
+                await self._rate_limiter.acquire()
+                stream = await self.aclient.chat.completions.create(
+                    **self._llm_request(prompt, llm_options), stream=True
+                )
+                async for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        chunks.append(delta)
+                        yield delta
+            
+            llm_response = "".join(chunks).strip()
+            
+        except Exception as e:
+            logger.error(f"Error streaming LLM response: {e}")
+            llm_response = f"{LLM_ERROR_PREFIX} Please try again or contact support. Error: {str(e)}"
+            yield llm_response
+        
+        response = self._build_rag_response(query, llm_response, retrieved_courses, similarities, stats, confidence, context)
+        self._store_cached_response(cache_key, response)
+        yield response
+    
+    async def aprocess_queries(self, queries: List[str], top_k: int = 5) -> List[RAGResponse]:
+        """
+        Process several queries concurrently.
+        
+        All queries are embedded up front in one request, then retrieval and
+        LLM calls run concurrently.
+        
+        Args:
+            queries: Student queries
+            top_k: Number of courses to retrieve per query
+            
+        Returns:
+            RAG responses in the same order as queries
+        """
+        try:
+            query_vecs = await asyncio.to_thread(self.embed_queries_batch, queries)
+        except Exception as e:
+            # Fall back to embedding each query inside its own pipeline run
+            logger.error(f"Error batch-embedding queries: {e}")
+            query_vecs = [None] * len(queries)
+        
+        return await asyncio.gather(*[
+            self.aprocess_query(query, top_k=top_k, query_vec=query_vec)
+            for query, query_vec in zip(queries, query_vecs)
+        ])
+    
+    def warmup(self, queries: List[str], top_k: int = 5) -> None:
+        """
+        Preload the response cache (and query embeddings) for common queries.
+        
+        Must be called outside a running event loop, e.g. at startup.
+        
+        Args:
+            queries: Queries to precompute
+            top_k: Number of courses to retrieve per query
+        """
+        asyncio.run(self.aprocess_queries(queries, top_k=top_k))
+        logger.info(f"Warmed response cache with {len(queries)} queries")
+    
+    def _response_cache_key(self, query: str, top_k: int,
+                            llm_options: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Build the response cache key for a query.
+        
+        Args:
+            query: Student query
+            top_k: Number of courses retrieved
+            llm_options: Per-call overrides, see process_query
+            
+        Returns:
+            SHA-256 hex digest of the query, top_k and generation settings
+        """
+        params = json.dumps(self._llm_request_params(llm_options), sort_keys=True)
+        return hashlib.sha256(f"{query}|{top_k}|{params}".encode()).hexdigest()
+    
+    def _get_cached_response(self, key: str) -> Optional[RAGResponse]:
+        """
+        Look up a cached response, dropping it if it has expired.
+        
+        Args:
+            key: Response cache key
+            
+        Returns:
+            Cached response, or None on a miss
+        """
+        with self._response_cache_lock:
+            entry = self._response_cache.get(key)
+            if entry is None:
+                return None
+            
+            stored_at, response = entry
+            if time.monotonic() - stored_at > self.response_cache_ttl:
+                del self._response_cache[key]
+                return None
+            
+            self._response_cache.move_to_end(key)
+        
+        logger.info("✅ Returning cached RAG response")
+        return response
+    
+    def _store_cached_response(self, key: str, response: RAGResponse) -> None:
+        """
+        Cache a response, evicting the least recently used entries when full.
+        
+        Responses carrying an LLM error message are not cached.
+        
+        Args:
+            key: Response cache key
+            response: Response to cache
+        """
+        if response.response.startswith(LLM_ERROR_PREFIX):
+            return
+        
+        with self._response_cache_lock:
+            self._response_cache[key] = (time.monotonic(), response)
+            self._response_cache.move_to_end(key)
+            while len(self._response_cache) > self.response_cache_size:
+                self._response_cache.popitem(last=False)
+    
+    def _retrieve_context(self, query: str, top_k: int,
+                          query_vec: Optional[np.ndarray] = None
+                          ) -> Tuple[List[Tuple[Dict[str, Any], float]], List[float], Tuple[float, float, float], ConfidenceLevel, str]:
+        """
+        Run the retrieval half of the pipeline (steps 1-4).
+        
+        Args:
+            query: Student query about course interests
+            top_k: Number of courses to retrieve
+            query_vec: Precomputed query embedding (embedded on demand if None)
+            
+        Returns:
+            Tuple of (course, similarity) pairs, similarity scores, their
+            (min, max, mean), confidence level and context
+        """
+        # Step 1: Embed the query
+        logger.info("Step 1: Embedding query...")
+        if query_vec is None:
+            query_vec = self.embedding_search.embed_student_query(query)
+        
+        # Step 2: Retrieve similar courses
+        logger.info("Step 2: Retrieving similar courses...")
+        retrieved_courses = self._retrieve_vec(query_vec, top_k)
+        similarities = [similarity for course, similarity in retrieved_courses]
+        
+        # Step 3: Determine confidence level
+        stats = _similarity_stats(similarities)
+        confidence = self._determine_confidence(stats[1], stats[2])
+        logger.info(f"Step 3: Confidence level determined: {confidence.value}")
+        
+        # Step 4: Build context from retrieved documents
+        logger.info("Step 4: Building context from retrieved documents...")
+        context = self._build_context(retrieved_courses, max_courses=top_k)
+        
+        return retrieved_courses, similarities, stats, confidence, context
+    
+    def _build_rag_response(self, query: str, llm_response: str,
+                            retrieved_courses: List[Tuple[Dict[str, Any], float]],
+                            similarities: List[float], stats: Tuple[float, float, float],
+                            confidence: ConfidenceLevel, context: str) -> RAGResponse:
+        """
+        Assemble the structured response (steps 7-8).
+        
+        Args:
+            query: Original query
+            llm_response: Generated LLM response
+            retrieved_courses: List of (course, similarity) tuples
+            similarities: Similarity scores
+            stats: (min, max, mean) similarity from _similarity_stats
+            confidence: Confidence level
+            context: Context injected into the prompt
+            
+        Returns:
+            Structured RAG response
+        """
+        # Step 7: Generate reasoning
+        reasoning = self._generate_reasoning(query, confidence, stats, len(similarities))
+        
+        # Step 8: Create structured response
+        response = RAGResponse(
+            response=llm_response,
+            confidence=confidence,
+            retrieved_courses=[course for course, similarity in retrieved_courses],
+            similarity_scores=similarities,
+            context_used=context,
+            reasoning=reasoning,
+            fallback_triggered=(confidence == ConfidenceLevel.FALLBACK)
+        )
+        
+        logger.info(f"✅ RAG pipeline completed successfully with {confidence.value} confidence")
+        return response
+    
+    def _build_skipped_llm_response(self, query: str,
+                                    retrieved_courses: List[Tuple[Dict[str, Any], float]],
+                                    similarities: List[float], stats: Tuple[float, float, float],
+                                    context: str) -> RAGResponse:
+        """
+        Build a FALLBACK response from the canned guidance without calling the LLM.
+        
+        The response is not cached: rebuilding it costs no LLM call, and a
+        later force_llm request for the same query should not be served it.
+        
+        Args:
+            query: Original query
+            retrieved_courses: List of (course, similarity) tuples
+            similarities: Similarity scores
+            stats: (min, max, mean) similarity from _similarity_stats
+            context: Retrieved context
+            
+        Returns:
+            Structured RAG response with fallback_triggered set
+        """
+        logger.info("Steps 5-6: Low similarity, returning fallback guidance without an LLM call")
+        return self._build_rag_response(query, self._generate_fallback_response(query, ""), retrieved_courses,
+                                        similarities, stats, ConfidenceLevel.FALLBACK, context)
+    
+    def _build_error_response(self, query: str, error: Exception) -> RAGResponse:
+        """
+        Build the fallback response returned when the pipeline fails.
+        
+        Args:
+            query: Original query
+            error: Exception raised by the pipeline
+            
+        Returns:
+            Fallback RAG response
+        """
+        logger.error(f"Error in RAG pipeline: {error}")
+        
+        # Fallback response
+        fallback_response = self._generate_fallback_response(query, str(error))
+        return RAGResponse(
+            response=fallback_response,
+            confidence=ConfidenceLevel.FALLBACK,
+            retrieved_courses=[],
+            similarity_scores=[],
+            context_used="Error occurred during retrieval",
+            reasoning=f"Error in pipeline: {str(error)}",
+            fallback_triggered=True
+        )
     
     def _generate_fallback_response(self, query: str, error: str) -> str:
         """
@@ -384,16 +1217,36 @@ NOTE: The similarity search returned limited relevant results. Please provide ge
 Would you like to try a more specific query or ask about particular course categories?"""
 
 
-def demonstrate_rag_pipeline():
+@lru_cache(maxsize=1)
+def get_pipeline() -> Day4RAGPipeline:
+    """
+    Get the process-wide RAG pipeline, creating it on first use.
+    
+    Reusing one pipeline keeps the embedded catalog, caches and HTTP
+    connection pool warm across requests. Its connection pool is closed when
+    the interpreter exits.
+    
+    Returns:
+        Shared Day4RAGPipeline configured from the environment
+    """
+    pipeline = Day4RAGPipeline()
+    atexit.register(pipeline.close)
+    return pipeline
+
+
+async def demonstrate_rag_pipeline():
     """
     Demonstrate the Day 4 RAG pipeline with various queries
+    
+    Runs on one event loop so the batch and the streamed query share the
+    async client, its connection pool and the concurrency limits.
     """
     print("🎯 Day 4: RAG Pipeline Demonstration")
     print("="*60)
     
     # Initialize pipeline
     print("1️⃣ Initializing RAG Pipeline...")
-    pipeline = Day4RAGPipeline()
+    pipeline = get_pipeline()
     print("   ✅ Pipeline initialized")
     
     # Test queries with different expected confidence levels
@@ -405,22 +1258,41 @@ def demonstrate_rag_pipeline():
         "I want to study quantum computing and blockchain"  # This should trigger fallback
     ]
     
-    for i, query in enumerate(test_queries, 2):
-        print(f"\\n{i}️⃣ Testing Query: '{query}'")
+    # Process all queries concurrently (bounded by the pipeline's semaphore),
+    # then report them in order
+    responses = await pipeline.aprocess_queries(test_queries)
+    
+    for i, (query, response) in enumerate(zip(test_queries, responses), 2):
+        print(f"\n{i}️⃣ Testing Query: '{query}'")
         print("-" * 50)
         
-        response = pipeline.process_query(query)
-        
         print(f"   📊 Confidence: {response.confidence.value}")
         print(f"   📈 Similarity Scores: {[f'{s:.3f}' for s in response.similarity_scores[:3]]}")
         print(f"   📚 Retrieved Courses: {len(response.retrieved_courses)}")
         print(f"   🔄 Fallback Triggered: {response.fallback_triggered}")
         print(f"   🧠 Reasoning: {response.reasoning}")
-        print(f"\\n   💬 Response Preview:")
+        print(f"\n   💬 Response Preview:")
         print(f"   {response.response[:200]}...")
     
-    print(f"\\n✅ Day 4 RAG Pipeline demonstration complete!")
+    # Stream one more response token by token
+    stream_query = "I want to build mobile apps and user interfaces"
+    print(f"\n{len(test_queries) + 2}️⃣ Streaming Query: '{stream_query}'")
+    print("-" * 50)
+    response = await _print_streamed_response(pipeline, stream_query)
+    print(f"   📊 Confidence: {response.confidence.value}")
+    
+    print(f"\n✅ Day 4 RAG Pipeline demonstration complete!")
+
+
+async def _print_streamed_response(pipeline: Day4RAGPipeline, query: str) -> RAGResponse:
+    """Print a streamed response as it arrives and return the final RAGResponse."""
+    print("   💬 ", end="", flush=True)
+    async for item in pipeline.astream_query(query):
+        if isinstance(item, RAGResponse):
+            print()
+            return item
+        print(item, end="", flush=True)
 
 
 if __name__ == "__main__":
-    demonstrate_rag_pipeline()
+    asyncio.run(demonstrate_rag_pipeline())
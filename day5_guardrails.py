@@ -13,21 +13,35 @@ Date: Day 5 Implementation
 """
 
 import os
+import atexit
 import json
+import asyncio
+import hashlib
 import logging
 import re
-from typing import List, Dict, Any, Optional, Set, Union
+import threading
+from collections import OrderedDict
+from operator import itemgetter
+from typing import TYPE_CHECKING, AsyncIterator, List, Literal, Dict, Any, Optional, Set, FrozenSet, Tuple, Union
 from dataclasses import dataclass
-from enum import Enum
-import numpy as np
-from pydantic import BaseModel, Field, validator, ValidationError
-from openai import OpenAI
+from pydantic import BaseModel, ConfigDict, Field, validator
+from typing_extensions import TypedDict, NotRequired
 from dotenv import load_dotenv
 
-# Import our existing components
-from day4_rag_pipeline import Day4RAGPipeline, RAGResponse, ConfidenceLevel
+try:
+    import orjson
+except ImportError:  # orjson is an optional speedup; fall back to the stdlib
+    orjson = None
+
+# Import our existing components. The OpenAI client and the Day 4 pipeline
+# (FAISS, embeddings) are only needed by Day5GuardedRAGPipeline, so they are
+# imported there; the validators import without them
 from src.data_manager import load_courses
 
+if TYPE_CHECKING:
+    from openai import OpenAI
+    from day4_rag_pipeline import ConfidenceLevel, Day4RAGPipeline
+
 # Load environment variables
 load_dotenv()
 
@@ -36,40 +50,234 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-class ValidationLevel(Enum):
-    """Validation confidence levels"""
-    STRICT = "strict"
-    MODERATE = "moderate"
-    LENIENT = "lenient"
+# Validation confidence levels
+ValidationLevel = Literal["strict", "moderate", "lenient"]
 
 
-class CourseRecommendation(BaseModel):
+class CourseRecommendation(TypedDict):
     """
-    ✅ Day 5 Requirement: Pydantic validation for structured output
+    ✅ Day 5 Requirement: Structured output for one recommended course
     
-    Validates individual course recommendations with required fields.
+    A plain dict checked once by validate_recommendation rather than a
+    Pydantic model, so building one costs no per-field validator dispatch.
     """
-    course_id: str = Field(..., description="Course code (e.g., CS101)")
-    title: str = Field(..., description="Course title")
-    justification: str = Field(..., min_length=50, description="Why this course is recommended (min 50 chars)")
-    match_score: float = Field(..., ge=0.0, le=1.0, description="Confidence score between 0.0 and 1.0")
-    prerequisites_met: bool = Field(default=True, description="Whether prerequisites are satisfied")
-    difficulty_appropriate: bool = Field(default=True, description="Whether difficulty level is appropriate")
-    
-    @validator('course_id')
-    def validate_course_id_format(cls, v):
-        """Validate course ID follows expected format"""
-        if not re.match(r'^[A-Z]{2,4}\d{3}$', v):
-            raise ValueError(f"Course ID '{v}' must follow format like 'CS101' or 'MATH301'")
-        return v
+    course_id: str  # Course code (e.g., CS101)
+    title: str  # Course title
+    justification: str  # Why this course is recommended (min 50 chars)
+    match_score: float  # Confidence score between 0.0 and 1.0
+    prerequisites_met: NotRequired[bool]  # Whether prerequisites are satisfied
+    difficulty_appropriate: NotRequired[bool]  # Whether difficulty level is appropriate
+
+
+GENERIC_JUSTIFICATION_PHRASES = ('good course', 'recommended', 'useful', 'important')
+
+# Lowercase plain phrases, matched as substrings of the lowercased text
+UNREALISTIC_PATTERNS = (
+    '100% guaranteed',
+    'perfect course',
+    'never fails',
+    'instant expertise',
+    'no prerequisites needed'  # when we know there are prereqs
+)
+
+# Padding for justifications shorter than the required minimum
+_JUSTIFICATION_PREFIX = "Recommended course for your interests: "
+_JUSTIFICATION_SUFFIX = ". This course provides valuable knowledge and skills."
+_OVERALL_JUSTIFICATION_SUFFIX = (". Based on the analysis of your query and available courses, these recommendations "
+                                 "aim to provide relevant learning opportunities that align with your stated "
+                                 "interests and academic goals.")
+
+# Compiled once at import
+_COURSE_ID_RE = re.compile(r'^[A-Z]{2,4}\d{3}$')
+_COURSE_ID_SCAN_RE = re.compile(r'\b[A-Z]{2,4}\d{3}\b')
+_COURSE_ID_PREFIX_RE = re.compile(r'^[A-Z]+')
+_ASCII_DIGITS = '0123456789'
+_JSON_BLOCK_RE = re.compile(r'\{.*\}', re.DOTALL)
+_GENERIC_RE = re.compile('|'.join(map(re.escape, GENERIC_JUSTIFICATION_PHRASES)), re.IGNORECASE)
+
+# Model used for structured recommendations; it must support JSON schema
+# structured outputs
+GUARDED_LLM_MODEL = "gpt-4o-mini"
+
+# Strict JSON schema for the LLM output requested in _create_structured_prompt
+LLM_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "course_recommendations",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "recommendations": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "course_id": {"type": "string"},
+                            "title": {"type": "string"},
+                            "justification": {"type": "string"},
+                            "match_score": {"type": "number"},
+                            "prerequisites_met": {"type": "boolean"},
+                            "difficulty_appropriate": {"type": "boolean"}
+                        },
+                        "required": ["course_id", "title", "justification", "match_score",
+                                     "prerequisites_met", "difficulty_appropriate"],
+                        "additionalProperties": False
+                    }
+                },
+                "overall_confidence": {"type": "number"},
+                "justification": {"type": "string"},
+                "match_score": {"type": "number"}
+            },
+            "required": ["recommendations", "overall_confidence", "justification", "match_score"],
+            "additionalProperties": False
+        }
+    }
+}
+
+
+_get_match_score = itemgetter('match_score')
+
+
+def mean_match_score(recommendations: List["CourseRecommendation"]) -> float:
+    """
+    Average match score of a non-empty list of recommendations.
     
-    @validator('justification')
-    def validate_justification_quality(cls, v):
-        """Ensure justification is meaningful and not generic"""
-        generic_phrases = ['good course', 'recommended', 'useful', 'important']
-        if any(phrase in v.lower() for phrase in generic_phrases) and len(v) < 100:
-            raise ValueError("Justification appears too generic - please provide specific reasoning")
-        return v
+    Uses sum over map(itemgetter) so the loop runs in C; at most five
+    recommendations are scored, too few for NumPy to pay off.
+    """
+    return sum(map(_get_match_score, recommendations)) / len(recommendations)
+
+
+def _loads(text: str) -> Any:
+    """Decode JSON text, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+class RecommendationStreamParser:
+    """
+    Incrementally extract recommendation objects from streamed JSON.
+    
+    Tracks string and nesting state across chunks so each object in the
+    top-level "recommendations" array is decoded as soon as its closing
+    brace arrives, before the rest of the response is generated.
+    """
+    
+    def __init__(self):
+        self._text = ''
+        self._pos = 0
+        self._in_array = False
+        self._done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._obj_start = -1
+    
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Add a chunk of the response.
+        
+        Args:
+            chunk: Next piece of streamed response text
+            
+        Returns:
+            Recommendation objects completed by this chunk
+        """
+        self._text += chunk
+        completed = []
+        if self._done:
+            return completed
+        
+        if not self._in_array:
+            key = self._text.find('"recommendations"')
+            bracket = self._text.find('[', key) if key != -1 else -1
+            if bracket == -1:
+                return completed
+            self._in_array = True
+            self._pos = bracket + 1
+        
+        text = self._text
+        for i in range(self._pos, len(text)):
+            char = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                if self._depth == 0:
+                    self._obj_start = i
+                self._depth += 1
+            elif char in '}]':
+                if self._depth == 0:  # end of the recommendations array
+                    self._done = True
+                    break
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        completed.append(_loads(text[self._obj_start:i + 1]))
+                    except json.JSONDecodeError:
+                        logger.warning("Skipping malformed streamed recommendation")
+        
+        self._pos = len(text)
+        return completed
+    
+    @property
+    def text(self) -> str:
+        """The full response text received so far."""
+        return self._text
+
+
+def validate_recommendation(data: Dict[str, Any]) -> CourseRecommendation:
+    """
+    Validate a single course recommendation.
+    
+    Args:
+        data: Recommendation fields, e.g. from the LLM's JSON output
+        
+    Returns:
+        Validated recommendation
+        
+    Raises:
+        ValueError: If a required field is missing, the course ID is
+            malformed, the justification is too short or generic, or
+            match_score is not a number between 0.0 and 1.0
+    """
+    missing = [field for field in ('course_id', 'title', 'justification', 'match_score') if field not in data]
+    if missing:
+        raise ValueError(f"Recommendation is missing required fields: {', '.join(missing)}")
+    
+    course_id = data['course_id']
+    if not isinstance(course_id, str) or not _COURSE_ID_RE.match(course_id):
+        raise ValueError(f"Course ID '{course_id}' must follow format like 'CS101' or 'MATH301'")
+    
+    justification = str(data['justification'])
+    if len(justification) < 50:
+        raise ValueError("Justification must be at least 50 characters")
+    if len(justification) < 100 and _GENERIC_RE.search(justification):
+        raise ValueError("Justification appears too generic - please provide specific reasoning")
+    
+    try:
+        match_score = float(data['match_score'])
+    except (TypeError, ValueError):
+        raise ValueError(f"Match score '{data['match_score']}' is not a number")
+    if not 0.0 <= match_score <= 1.0:
+        raise ValueError(f"Match score {match_score} must be between 0.0 and 1.0")
+    
+    return CourseRecommendation(
+        course_id=course_id,
+        title=str(data['title']),
+        justification=justification,
+        match_score=match_score,
+        prerequisites_met=bool(data.get('prerequisites_met', True)),
+        difficulty_appropriate=bool(data.get('difficulty_appropriate', True))
+    )
 
 
 class ValidatedRecommendationResponse(BaseModel):
@@ -77,7 +285,11 @@ class ValidatedRecommendationResponse(BaseModel):
     ✅ Day 5 Requirement: Complete validated response structure
     
     Comprehensive response model with all required validation fields.
+    
+    Responses are frozen since they are cached and shared between callers.
     """
+    model_config = ConfigDict(revalidate_instances='never', frozen=True, extra='forbid', defer_build=True)
+    
     query: str = Field(..., description="Original student query")
     recommendations: List[CourseRecommendation] = Field(..., max_items=5, description="List of course recommendations")
     overall_confidence: float = Field(..., ge=0.0, le=1.0, description="Overall confidence in recommendations")
@@ -101,12 +313,52 @@ class ValidatedRecommendationResponse(BaseModel):
     def validate_confidence_consistency(cls, v, values):
         """Ensure overall confidence is consistent with individual scores"""
         if 'recommendations' in values and values['recommendations']:
-            avg_score = sum(rec.match_score for rec in values['recommendations']) / len(values['recommendations'])
+            avg_score = mean_match_score(values['recommendations'])
             if abs(v - avg_score) > 0.3:
                 raise ValueError("Overall confidence should be consistent with individual match scores")
         return v
 
 
+def check_response_scores(recommendations: List[CourseRecommendation], overall_confidence: Any,
+                          match_score: Any) -> Tuple[float, float]:
+    """
+    Check the response-level constraints of ValidatedRecommendationResponse.
+    
+    Mirrors the model's field constraints and validators so a response built
+    from already validated recommendations can skip model validation.
+    
+    Args:
+        recommendations: Validated recommendations
+        overall_confidence: Overall confidence from the LLM output
+        match_score: Overall match score from the LLM output
+        
+    Returns:
+        Tuple of (overall_confidence, match_score) as floats
+        
+    Raises:
+        ValueError: If a constraint is violated
+    """
+    if len(recommendations) < 1:
+        raise ValueError("Must provide at least 1 recommendation")
+    if len(recommendations) > 5:
+        raise ValueError("Cannot provide more than 5 recommendations")
+    
+    try:
+        overall_confidence = float(overall_confidence)
+        match_score = float(match_score)
+    except (TypeError, ValueError):
+        raise ValueError("Overall confidence and match score must be numbers")
+    
+    if not 0.0 <= overall_confidence <= 1.0 or not 0.0 <= match_score <= 1.0:
+        raise ValueError("Overall confidence and match score must be between 0.0 and 1.0")
+    
+    avg_score = mean_match_score(recommendations)
+    if abs(overall_confidence - avg_score) > 0.3:
+        raise ValueError("Overall confidence should be consistent with individual match scores")
+    
+    return overall_confidence, match_score
+
+
 class CourseValidator:
     """
     ✅ Day 5 Requirement: Validator for course IDs and content filtering
@@ -121,13 +373,29 @@ class CourseValidator:
         Args:
             valid_courses: List of valid course dictionaries
         """
-        self.valid_courses = valid_courses
-        self.valid_course_ids: Set[str] = {course['code'] for course in valid_courses}
-        self.course_lookup = {course['code']: course for course in valid_courses}
+        # Column per field that validation reads; full records are only
+        # dereferenced when get_course_details is called
+        self._codes: Tuple[str, ...] = tuple(course['code'] for course in valid_courses)
+        self._titles: Tuple[str, ...] = tuple(course['title'] for course in valid_courses)
+        self._details: List[Dict[str, Any]] = list(valid_courses)
+        self.valid_course_ids: FrozenSet[str] = frozenset(self._codes)
+        # Stable sample of IDs quoted in prompts, so it is not rebuilt per query
+        self.valid_course_ids_sample: List[str] = sorted(self.valid_course_ids)[:10]
+        self.course_lookup: Dict[str, int] = {code: i for i, code in enumerate(self._codes)}
+        
+        # Course IDs restricted to the catalog's prefixes, longest first so
+        # e.g. MATH wins over MA
+        prefixes = {_COURSE_ID_PREFIX_RE.match(code).group() for code in self._codes
+                    if _COURSE_ID_PREFIX_RE.match(code)}
+        if prefixes:
+            alternation = '|'.join(sorted(prefixes, key=len, reverse=True))
+            self._id_scan_re = re.compile(rf'\b(?:{alternation})\d{{3}}\b')
+        else:
+            self._id_scan_re = _COURSE_ID_SCAN_RE
         
         logger.info(f"Initialized CourseValidator with {len(self.valid_course_ids)} valid courses")
     
-    def validate_course_id(self, course_id: str) -> tuple[bool, Optional[str]]:
+    def validate_course_id(self, course_id: str) -> Tuple[bool, Optional[str]]:
         """
         ✅ Day 5 Requirement: Accept only certain course IDs
         
@@ -157,32 +425,46 @@ class CourseValidator:
         """
         issues = []
         
-        # Find potential course IDs in text
-        course_id_pattern = r'\b[A-Z]{2,4}\d{3}\b'
-        found_ids = re.findall(course_id_pattern, text)
-        
-        for course_id in found_ids:
-            if course_id not in self.valid_course_ids:
-                issues.append(f"Potential hallucinated course ID: {course_id}")
+        # Find potential course IDs in text; any prefix is scanned here, since
+        # an ID with an unknown prefix is exactly what should be reported.
+        # Each unknown ID is reported once, in order of first appearance.
+        # Every ID contains digits, so ASCII text without any skips the scan
+        if not text.isascii() or any(digit in text for digit in _ASCII_DIGITS):
+            found = dict.fromkeys(_COURSE_ID_SCAN_RE.findall(text))
+            invalid = found.keys() - self.valid_course_ids
+            if invalid:
+                issues.extend(f"Potential hallucinated course ID: {course_id}"
+                              for course_id in found if course_id in invalid)
         
-        # Check for unrealistic claims
-        unrealistic_patterns = [
-            r'100% guaranteed',
-            r'perfect course',
-            r'never fails',
-            r'instant expertise',
-            r'no prerequisites needed' # when we know there are prereqs
-        ]
-        
-        for pattern in unrealistic_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                issues.append(f"Potentially unrealistic claim detected: {pattern}")
+        # Check for unrealistic claims; plain substring search on one
+        # lowercased copy is much cheaper than a case-insensitive regex
+        lower = text.lower()
+        issues.extend(f"Potentially unrealistic claim detected: {pattern}"
+                      for pattern in UNREALISTIC_PATTERNS if pattern in lower)
         
         return issues
     
+    def find_course_ids(self, text: str) -> List[str]:
+        """
+        Find course IDs in text that use one of the catalog's prefixes.
+        
+        Args:
+            text: Text to scan
+            
+        Returns:
+            Candidate course IDs in order of appearance
+        """
+        return self._id_scan_re.findall(text)
+    
     def get_course_details(self, course_id: str) -> Optional[Dict[str, Any]]:
         """Get course details for a valid course ID"""
-        return self.course_lookup.get(course_id)
+        index = self.course_lookup.get(course_id)
+        return None if index is None else self._details[index]
+    
+    def get_course_title(self, course_id: str) -> Optional[str]:
+        """Get the title for a valid course ID without touching the full record"""
+        index = self.course_lookup.get(course_id)
+        return None if index is None else self._titles[index]
 
 
 class OutputValidator:
@@ -215,10 +497,10 @@ class OutputValidator:
             Parsed response dictionary
         """
         # Try to extract JSON if present
-        json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+        json_match = _JSON_BLOCK_RE.search(response_text)
         if json_match:
             try:
-                return json.loads(json_match.group())
+                return _loads(json_match.group())
             except json.JSONDecodeError:
                 pass
         
@@ -230,22 +512,66 @@ class OutputValidator:
         }
         
         # Extract course mentions
-        course_pattern = r'([A-Z]{2,4}\d{3})'
-        courses = re.findall(course_pattern, response_text)
-        
-        for course_id in courses[:5]:  # Limit to 5 courses
-            if self.course_validator.validate_course_id(course_id)[0]:
-                course_details = self.course_validator.get_course_details(course_id)
-                extracted['recommendations'].append({
-                    'course_id': course_id,
-                    'title': course_details['title'] if course_details else course_id,
-                    'justification': f"Recommended based on content analysis",
-                    'match_score': 0.7
-                })
+        courses = self.course_validator.find_course_ids(response_text)
+        valid_ids = self.course_validator.valid_course_ids
+        valid_found = [course_id for course_id in dict.fromkeys(courses) if course_id in valid_ids]
+        
+        for course_id in valid_found[:5]:  # Limit to 5 courses
+            extracted['recommendations'].append({
+                'course_id': course_id,
+                'title': self.course_validator.get_course_title(course_id) or course_id,
+                'justification': f"Recommended based on content analysis",
+                'match_score': 0.7
+            })
         
         return extracted
     
-    def validate_response(self, response: Union[Dict[str, Any], str], query: str) -> ValidatedRecommendationResponse:
+    def _build_recommendation(self, course_id: str, rec_data: Dict[str, Any]) -> CourseRecommendation:
+        """
+        Build a validated recommendation for a known course ID.
+        
+        Args:
+            course_id: Course ID already checked against the catalog
+            rec_data: Recommendation fields from the LLM output
+            
+        Returns:
+            Validated recommendation using the catalog title
+            
+        Raises:
+            ValueError: If the recommendation fails validate_recommendation
+        """
+        justification = rec_data.get('justification', '')
+        return validate_recommendation({
+            'course_id': course_id,
+            'title': self.course_validator.get_course_title(course_id) or rec_data.get('title', course_id),
+            'justification': justification if len(justification) >= 50 else ''.join((_JUSTIFICATION_PREFIX, justification, _JUSTIFICATION_SUFFIX)),
+            'match_score': rec_data.get('match_score', 0.5),
+            'prerequisites_met': rec_data.get('prerequisites_met', True),
+            'difficulty_appropriate': rec_data.get('difficulty_appropriate', True)
+        })
+    
+    def preview_recommendation(self, rec_data: Dict[str, Any]) -> Optional[CourseRecommendation]:
+        """
+        Validate one recommendation on its own, e.g. while a response streams.
+        
+        The complete response is still checked by validate_response.
+        
+        Args:
+            rec_data: Recommendation fields from the LLM output
+            
+        Returns:
+            Validated recommendation, or None if it would be filtered out
+        """
+        course_id = rec_data.get('course_id', '')
+        if not self.course_validator.validate_course_id(course_id)[0]:
+            return None
+        try:
+            return self._build_recommendation(course_id, rec_data)
+        except ValueError:
+            return None
+    
+    def validate_response(self, response: Union[Dict[str, Any], str], query: str,
+                          confidence_threshold: Optional[float] = None) -> ValidatedRecommendationResponse:
         """
         ✅ Day 5 Requirement: Complete validation with confidence scoring
         
@@ -254,10 +580,13 @@ class OutputValidator:
         Args:
             response: LLM response (dict or string)
             query: Original query
+            confidence_threshold: Threshold for this call; defaults to the validator's own
             
         Returns:
             Validated response object
         """
+        if confidence_threshold is None:
+            confidence_threshold = self.confidence_threshold
         warnings = []
         validation_passed = True
         
@@ -268,51 +597,60 @@ class OutputValidator:
         # Validate course IDs and filter hallucinations
         validated_recommendations = []
         
+        # Recommendations in one response often repeat course IDs and
+        # justification text; check each distinct value only once
+        valid_ids_seen: Set[str] = set()
+        hallucination_cache: Dict[str, List[str]] = {}
+        
         for rec_data in response.get('recommendations', []):
             try:
                 # Validate course ID
                 course_id = rec_data.get('course_id', '')
-                is_valid, error_msg = self.course_validator.validate_course_id(course_id)
-                
-                if not is_valid:
-                    warnings.append(f"Invalid course ID filtered: {course_id}")
-                    validation_passed = False
-                    continue
+                if course_id not in valid_ids_seen:
+                    is_valid, error_msg = self.course_validator.validate_course_id(course_id)
+                    
+                    if not is_valid:
+                        warnings.append(f"Invalid course ID filtered: {course_id}")
+                        validation_passed = False
+                        continue
+                    valid_ids_seen.add(course_id)
                 
                 # Check for hallucinated content in justification
                 justification = rec_data.get('justification', '')
-                hallucination_issues = self.course_validator.detect_hallucinated_content(justification)
+                hallucination_issues = hallucination_cache.get(justification)
+                if hallucination_issues is None:
+                    hallucination_issues = self.course_validator.detect_hallucinated_content(justification)
+                    hallucination_cache[justification] = hallucination_issues
                 if hallucination_issues:
                     warnings.extend(hallucination_issues)
                 
                 # Create validated recommendation
-                course_details = self.course_validator.get_course_details(course_id)
-                recommendation = CourseRecommendation(
-                    course_id=course_id,
-                    title=course_details['title'] if course_details else rec_data.get('title', course_id),
-                    justification=justification if len(justification) >= 50 else f"Recommended course for your interests: {justification}. This course provides valuable knowledge and skills.",
-                    match_score=rec_data.get('match_score', 0.5),
-                    prerequisites_met=rec_data.get('prerequisites_met', True),
-                    difficulty_appropriate=rec_data.get('difficulty_appropriate', True)
-                )
-                validated_recommendations.append(recommendation)
+                validated_recommendations.append(self._build_recommendation(course_id, rec_data))
                 
-            except ValidationError as e:
+            except ValueError as e:
                 warnings.append(f"Recommendation validation failed: {str(e)}")
                 validation_passed = False
         
         # Calculate overall scores
         overall_confidence = response.get('overall_confidence')
         if overall_confidence is None and validated_recommendations:
-            overall_confidence = sum(rec.match_score for rec in validated_recommendations) / len(validated_recommendations)
+            overall_confidence = mean_match_score(validated_recommendations)
         elif overall_confidence is None:
             overall_confidence = 0.0
         
         match_score = response.get('match_score', overall_confidence)
         
+        # Recommendations were validated one by one above; only the
+        # response-level constraints remain before building the model unvalidated
+        try:
+            overall_confidence, match_score = check_response_scores(validated_recommendations, overall_confidence, match_score)
+        except ValueError as e:
+            logger.error(f"Validation failed, creating fallback response: {e}")
+            return self._create_fallback_response(query, str(e))
+        
         # Determine if fallback should be triggered
         fallback_triggered = (
-            overall_confidence < self.confidence_threshold or
+            overall_confidence < confidence_threshold or
             len(validated_recommendations) == 0 or
             not validation_passed
         )
@@ -320,32 +658,24 @@ class OutputValidator:
         # Ensure justification meets minimum length
         justification = response.get('justification', 'No specific justification provided')
         if len(justification) < 100:
-            justification = f"{justification}. Based on the analysis of your query and available courses, these recommendations aim to provide relevant learning opportunities that align with your stated interests and academic goals."
+            justification = justification + _OVERALL_JUSTIFICATION_SUFFIX
         
-        # Create validated response
-        try:
-            validated_response = ValidatedRecommendationResponse(
-                query=query,
-                recommendations=validated_recommendations,
-                overall_confidence=overall_confidence,
-                justification=justification,
-                match_score=match_score,
-                fallback_triggered=fallback_triggered,
-                validation_passed=validation_passed and len(validated_recommendations) > 0,
-                warnings=warnings,
-                metadata={
-                    'original_recommendation_count': len(response.get('recommendations', [])),
-                    'filtered_recommendation_count': len(validated_recommendations),
-                    'validation_level': 'strict'
-                }
-            )
-            
-            return validated_response
-            
-        except ValidationError as e:
-            # Create minimal fallback response
-            logger.error(f"Validation failed, creating fallback response: {e}")
-            return self._create_fallback_response(query, str(e))
+        # Create validated response; every field has been checked already
+        return ValidatedRecommendationResponse.model_construct(
+            query=query,
+            recommendations=validated_recommendations,
+            overall_confidence=overall_confidence,
+            justification=justification,
+            match_score=match_score,
+            fallback_triggered=fallback_triggered,
+            validation_passed=validation_passed and len(validated_recommendations) > 0,
+            warnings=warnings,
+            metadata={
+                'original_recommendation_count': len(response.get('recommendations', [])),
+                'filtered_recommendation_count': len(validated_recommendations),
+                'validation_level': 'strict'
+            }
+        )
     
     def _create_fallback_response(self, query: str, error_reason: str) -> ValidatedRecommendationResponse:
         """
@@ -367,7 +697,9 @@ For general guidance, I recommend:
 
 Please try rephrasing your query with more specific interests or academic goals."""
         
-        return ValidatedRecommendationResponse(
+        # Built from trusted literals, so skip validation (an empty
+        # recommendations list would not pass it anyway)
+        return ValidatedRecommendationResponse.model_construct(
             query=query,
             recommendations=[],
             overall_confidence=0.0,
@@ -387,36 +719,8 @@ class Day5GuardedRAGPipeline:
     Enhanced RAG pipeline with comprehensive validation and guardrails.
     """
     
-    def __init__(self, api_key: Optional[str] = None, confidence_threshold: float = 0.6):
-        """
-        Initialize the guarded RAG pipeline.
-        
-        Args:
-            api_key: OpenAI API key
-            confidence_threshold: Minimum confidence threshold
-        """
-        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
-        if not self.api_key:
-            raise ValueError("OpenAI API key must be provided or set in OPENAI_API_KEY environment variable")
-        
-        self.client = OpenAI(api_key=self.api_key)
-        self.confidence_threshold = confidence_threshold
-        
-        # Initialize components
-        self.courses = load_courses("data/courses.json")
-        self.course_validator = CourseValidator(self.courses)
-        self.output_validator = OutputValidator(self.course_validator, confidence_threshold)
-        self.base_pipeline = Day4RAGPipeline(api_key=api_key)
-        
-        logger.info(f"Initialized Day5GuardedRAGPipeline with {len(self.courses)} courses")
-    
-    def _create_structured_prompt(self, query: str, context: str, confidence: ConfidenceLevel) -> str:
-        """
-        Create a structured prompt that encourages JSON output with required fields.
-        """
-        valid_course_ids = list(self.course_validator.valid_course_ids)
-        
-        prompt = f"""You are an expert course advisor. Provide course recommendations in the following JSON format:
+    # Structured prompt templates; the preamble only depends on the catalog
+    _PROMPT_PREAMBLE_TMPL = """You are an expert course advisor. Provide course recommendations in the following JSON format:
 
 {{
   "recommendations": [
@@ -435,24 +739,174 @@ class Day5GuardedRAGPipeline:
 }}
 
 IMPORTANT CONSTRAINTS:
-- ONLY use course IDs from this valid list: {valid_course_ids[:10]}... (and others in the context)
+- ONLY use course IDs from this valid list: {valid_course_ids}... (and others in the context)
 - Each justification must be at least 50 characters and specific to the course
 - Match scores must be between 0.0 and 1.0
 - Be honest about confidence levels
 - If unsure, use lower match scores
 
-STUDENT QUERY: "{query}"
+"""
+    
+    _PROMPT_QUERY_TMPL = """STUDENT QUERY: "{query}"
 
 AVAILABLE COURSES:
 {context}
 
-CONFIDENCE LEVEL: {confidence.value}
+CONFIDENCE LEVEL: {confidence}
 
 Provide your response as valid JSON only:"""
+    
+    def __init__(self, api_key: Optional[str] = None, confidence_threshold: float = 0.6,
+                 response_cache_size: int = 128, client: Optional["OpenAI"] = None,
+                 base_pipeline: Optional["Day4RAGPipeline"] = None):
+        """
+        Initialize the guarded RAG pipeline.
+        
+        Args:
+            api_key: OpenAI API key
+            confidence_threshold: Minimum confidence threshold
+            response_cache_size: Maximum number of cached validated responses
+            client: OpenAI client to use; shared with the base pipeline
+            base_pipeline: Day 4 pipeline to reuse, e.g. day4_rag_pipeline.get_pipeline();
+                one is created if not given
+        """
+        if base_pipeline is not None:
+            api_key = api_key or base_pipeline.api_key
+            client = client or base_pipeline.client
+        
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        if not self.api_key:
+            raise ValueError("OpenAI API key must be provided or set in OPENAI_API_KEY environment variable")
+        
+        from openai import OpenAI
+        from day4_rag_pipeline import Day4RAGPipeline
         
-        return prompt
+        # One client, and so one connection pool, for both pipelines
+        self.client = client or OpenAI(api_key=self.api_key)
+        self.confidence_threshold = confidence_threshold
+        
+        # Initialize components
+        self.courses = load_courses("data/courses.json")
+        self.course_validator = CourseValidator(self.courses)
+        self.output_validator = OutputValidator(self.course_validator, confidence_threshold)
+        self._prompt_preamble = self._PROMPT_PREAMBLE_TMPL.format(
+            valid_course_ids=self.course_validator.valid_course_ids_sample
+        )
+        if base_pipeline is None:
+            # Close the connection pool of the pipeline we own at exit
+            base_pipeline = Day4RAGPipeline(api_key=self.api_key, client=self.client)
+            atexit.register(base_pipeline.close)
+        self.base_pipeline = base_pipeline
+        
+        # Validated responses keyed by query and retrieved context, LRU order
+        self.response_cache_size = response_cache_size
+        self._response_cache: "OrderedDict[str, ValidatedRecommendationResponse]" = OrderedDict()
+        self._response_cache_lock = threading.Lock()
+        
+        logger.info(f"Initialized Day5GuardedRAGPipeline with {len(self.courses)} courses")
+    
+    def _create_structured_prompt(self, query: str, context: str, confidence: "ConfidenceLevel") -> str:
+        """
+        Create a structured prompt that encourages JSON output with required fields.
+        
+        The format instructions and constraints are rendered once at init;
+        only the query section is formatted per call.
+        """
+        return self._prompt_preamble + self._PROMPT_QUERY_TMPL.format_map({
+            "query": query,
+            "context": context,
+            "confidence": confidence.value
+        })
     
-    def process_query_with_validation(self, query: str, top_k: int = 5) -> ValidatedRecommendationResponse:
+    def _response_cache_key(self, query: str, context: str, confidence_threshold: float) -> str:
+        """
+        Build the validated response cache key.
+        
+        Args:
+            query: Student query
+            context: Course context the prompt was built from
+            confidence_threshold: Threshold the response is validated against
+            
+        Returns:
+            BLAKE2b hex digest of the query, context and confidence threshold
+        """
+        payload = f"{query}|{context}|{confidence_threshold}".encode()
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+    
+    def _get_cached_response(self, key: str) -> Optional[ValidatedRecommendationResponse]:
+        """Look up a cached validated response, marking it most recently used."""
+        with self._response_cache_lock:
+            response = self._response_cache.get(key)
+            if response is not None:
+                self._response_cache.move_to_end(key)
+        return response
+    
+    def _store_cached_response(self, key: str, response: ValidatedRecommendationResponse) -> None:
+        """Cache a validated response, evicting the least recently used entries when full."""
+        with self._response_cache_lock:
+            self._response_cache[key] = response
+            self._response_cache.move_to_end(key)
+            while len(self._response_cache) > self.response_cache_size:
+                self._response_cache.popitem(last=False)
+    
+    def _structured_llm_request(self, structured_prompt: str) -> Dict[str, Any]:
+        """
+        Build the chat completion arguments for a structured prompt.
+        
+        Args:
+            structured_prompt: Prompt from _create_structured_prompt
+            
+        Returns:
+            Keyword arguments for chat.completions.create
+        """
+        return {
+            "model": GUARDED_LLM_MODEL,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are a course advisor. Always respond with valid JSON containing course recommendations with required fields: course_id, title, justification, and match_score."
+                },
+                {
+                    "role": "user",
+                    "content": structured_prompt
+                }
+            ],
+            "temperature": 0.3,  # Lower temperature for more consistent JSON
+            "max_tokens": 1500,
+            "response_format": LLM_RESPONSE_FORMAT
+        }
+    
+    def _validate_llm_output(self, query: str, response_text: str, cache_key: str,
+                             confidence_threshold: float) -> ValidatedRecommendationResponse:
+        """
+        Parse and validate the LLM output, caching the validated response.
+        
+        Args:
+            query: Student query
+            response_text: Raw LLM response content
+            cache_key: Validated response cache key
+            confidence_threshold: Minimum confidence for accepting recommendations
+            
+        Returns:
+            Validated recommendation response
+        """
+        # Step 4: Parse JSON response; the schema guarantees JSON unless
+        # the output was cut off at max_tokens
+        try:
+            response_data = _loads(response_text)
+        except json.JSONDecodeError:  # orjson's decode error subclasses this
+            logger.warning("Failed to parse JSON response, using text parsing")
+            response_data = self.output_validator.parse_llm_response(response_text)
+        
+        # Step 5: Validate response
+        validated_response = self.output_validator.validate_response(response_data, query, confidence_threshold)
+        
+        logger.info(f"✅ Validation complete: {len(validated_response.recommendations)} valid recommendations")
+        self._store_cached_response(cache_key, validated_response)
+        return validated_response
+    
+    def process_query_with_validation(self, query: str, top_k: int = 5,
+                                      confidence_threshold: Optional[float] = None) -> ValidatedRecommendationResponse:
         """
         ✅ Day 5 Requirement: Complete pipeline with validation
         
@@ -461,16 +915,27 @@ Provide your response as valid JSON only:"""
         Args:
             query: Student query
             top_k: Number of courses to consider
+            confidence_threshold: Threshold for this query; defaults to the pipeline's own
             
         Returns:
             Validated recommendation response
         """
         logger.info(f"Processing query with validation: '{query}'")
+        if confidence_threshold is None:
+            confidence_threshold = self.confidence_threshold
         
         try:
             # Step 1: Get base RAG response
             base_response = self.base_pipeline.process_query(query, top_k=top_k)
             
+            # The same query over the same context was already answered and
+            # validated; skip the LLM call and validation
+            cache_key = self._response_cache_key(query, base_response.context_used, confidence_threshold)
+            cached = self._get_cached_response(cache_key)
+            if cached is not None:
+                logger.info("✅ Returning cached validated response")
+                return cached
+            
             # Step 2: Create structured prompt for LLM
             structured_prompt = self._create_structured_prompt(
                 query, 
@@ -479,40 +944,143 @@ Provide your response as valid JSON only:"""
             )
             
             # Step 3: Get structured LLM response
-            llm_response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a course advisor. Always respond with valid JSON containing course recommendations with required fields: course_id, title, justification, and match_score."
-                    },
-                    {
-                        "role": "user",
-                        "content": structured_prompt
-                    }
-                ],
-                temperature=0.3,  # Lower temperature for more consistent JSON
-                max_tokens=1500
+            llm_response = self.client.chat.completions.create(**self._structured_llm_request(structured_prompt))
+            response_text = llm_response.choices[0].message.content.strip()
+            
+            return self._validate_llm_output(query, response_text, cache_key, confidence_threshold)
+            
+        except Exception as e:
+            logger.error(f"Error in guarded pipeline: {e}")
+            return self.output_validator._create_fallback_response(query, str(e))
+    
+    async def aprocess_query_with_validation(self, query: str, top_k: int = 5,
+                                             confidence_threshold: Optional[float] = None) -> ValidatedRecommendationResponse:
+        """
+        Async variant of process_query_with_validation.
+        
+        Both LLM calls go through the base pipeline's AsyncOpenAI client and
+        share its connection pool, concurrency limit and rate limiter.
+        
+        Args:
+            query: Student query
+            top_k: Number of courses to consider
+            confidence_threshold: Threshold for this query; defaults to the pipeline's own
+            
+        Returns:
+            Validated recommendation response
+        """
+        logger.info(f"Processing query with validation: '{query}'")
+        if confidence_threshold is None:
+            confidence_threshold = self.confidence_threshold
+        base = self.base_pipeline
+        
+        try:
+            # Step 1: Get base RAG response
+            base_response = await base.aprocess_query(query, top_k=top_k)
+            
+            cache_key = self._response_cache_key(query, base_response.context_used, confidence_threshold)
+            cached = self._get_cached_response(cache_key)
+            if cached is not None:
+                logger.info("✅ Returning cached validated response")
+                return cached
+            
+            # Step 2: Create structured prompt for LLM
+            structured_prompt = self._create_structured_prompt(
+                query, 
+                base_response.context_used, 
+                base_response.confidence
             )
             
+            # Step 3: Get structured LLM response
+            async with base._get_llm_semaphore():
+                await base._rate_limiter.acquire()
+                llm_response = await base.aclient.chat.completions.create(**self._structured_llm_request(structured_prompt))
             response_text = llm_response.choices[0].message.content.strip()
             
-            # Step 4: Parse JSON response
-            try:
-                response_data = json.loads(response_text)
-            except json.JSONDecodeError:
-                logger.warning("Failed to parse JSON response, using text parsing")
-                response_data = self.output_validator.parse_llm_response(response_text)
+            return self._validate_llm_output(query, response_text, cache_key, confidence_threshold)
             
-            # Step 5: Validate response
-            validated_response = self.output_validator.validate_response(response_data, query)
+        except Exception as e:
+            logger.error(f"Error in guarded pipeline: {e}")
+            return self.output_validator._create_fallback_response(query, str(e))
+    
+    async def astream_query_with_validation(self, query: str, top_k: int = 5,
+                                            confidence_threshold: Optional[float] = None
+                                            ) -> AsyncIterator[Union[CourseRecommendation, ValidatedRecommendationResponse]]:
+        """
+        Stream validated recommendations as the LLM generates them.
+        
+        Each recommendation object is parsed and checked as soon as it is
+        complete, so validation overlaps the rest of the generation.
+        
+        Args:
+            query: Student query
+            top_k: Number of courses to consider
+            confidence_threshold: Threshold for this query; defaults to the pipeline's own
+            
+        Yields:
+            Recommendations that pass validation, then the complete
+            ValidatedRecommendationResponse as the last item
+        """
+        logger.info(f"Streaming query with validation: '{query}'")
+        if confidence_threshold is None:
+            confidence_threshold = self.confidence_threshold
+        base = self.base_pipeline
+        
+        try:
+            base_response = await base.aprocess_query(query, top_k=top_k)
+            
+            cache_key = self._response_cache_key(query, base_response.context_used, confidence_threshold)
+            cached = self._get_cached_response(cache_key)
+            if cached is not None:
+                for recommendation in cached.recommendations:
+                    yield recommendation
+                yield cached
+                return
+            
+            structured_prompt = self._create_structured_prompt(
+                query, 
+                base_response.context_used, 
+                base_response.confidence
+            )
+            
+            parser = RecommendationStreamParser()
+            async with base._get_llm_semaphore():
+                await base._rate_limiter.acquire()
+                stream = await base.aclient.chat.completions.create(
+                    **self._structured_llm_request(structured_prompt), stream=True
+                )
+                async for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if not delta:
+                        continue
+                    for rec_data in parser.feed(delta):
+                        recommendation = self.output_validator.preview_recommendation(rec_data)
+                        if recommendation is not None:
+                            yield recommendation
             
-            logger.info(f"✅ Validation complete: {len(validated_response.recommendations)} valid recommendations")
-            return validated_response
+            validated_response = self._validate_llm_output(query, parser.text, cache_key, confidence_threshold)
             
         except Exception as e:
             logger.error(f"Error in guarded pipeline: {e}")
-            return self.output_validator._create_fallback_response(query, str(e))
+            validated_response = self.output_validator._create_fallback_response(query, str(e))
+        
+        yield validated_response
+    
+    async def aprocess_queries_with_validation(self, queries: List[str], top_k: int = 5) -> List[ValidatedRecommendationResponse]:
+        """
+        Process several queries concurrently with validation.
+        
+        Args:
+            queries: Student queries
+            top_k: Number of courses to consider per query
+            
+        Returns:
+            Validated responses in the same order as queries
+        """
+        return await asyncio.gather(*[
+            self.aprocess_query_with_validation(query, top_k=top_k)
+            for query in queries
+        ])
 
 
 def demonstrate_day5_validation():
@@ -561,8 +1129,8 @@ def demonstrate_day5_validation():
                 print(f"      • {warning}")
         
         if response.recommendations:
-            print(f"   🎯 Top Recommendation: {response.recommendations[0].course_id} - {response.recommendations[0].title}")
-            print(f"      Match Score: {response.recommendations[0].match_score:.3f}")
+            print(f"   🎯 Top Recommendation: {response.recommendations[0]['course_id']} - {response.recommendations[0]['title']}")
+            print(f"      Match Score: {response.recommendations[0]['match_score']:.3f}")
     
     print(f"\\n✅ Day 5 validation demonstration complete!")
 
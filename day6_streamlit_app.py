@@ -20,16 +20,20 @@ Date: Day 6 Implementation
 """
 
 import streamlit as st
+import asyncio
 import json
 import logging
+import threading
+from collections import Counter, deque
+from itertools import islice
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import plotly.express as px
 import plotly.graph_objects as go
-import pandas as pd
 from pathlib import Path
 
 # Import our existing components
+from day4_rag_pipeline import get_pipeline
 from day5_guardrails import Day5GuardedRAGPipeline, ValidatedRecommendationResponse
 from src.data_manager import load_courses
 
@@ -46,7 +50,7 @@ st.set_page_config(
 )
 
 # Custom CSS for better styling
-st.markdown("""
+_CSS = """
 <style>
     .main-header {
         font-size: 3rem;
@@ -86,7 +90,95 @@ st.markdown("""
         border-left: 4px solid #bee5eb;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+
+@st.cache_resource(show_spinner="🤖 Loading AI Course Recommendation System...")
+def _get_pipeline(threshold: float) -> Day5GuardedRAGPipeline:
+    """
+    Build the guarded RAG pipeline once per process, shared by all sessions.
+    
+    It wraps the process-wide Day 4 pipeline, whose connection pool is closed
+    at exit on the event loop that runs the queries.
+    """
+    return Day5GuardedRAGPipeline(confidence_threshold=threshold, base_pipeline=get_pipeline())
+
+
+COURSES_FILE = "data/courses.json"
+FEEDBACK_FILE = Path("data/user_feedback.jsonl")
+
+
+@st.cache_data(persist="disk", show_spinner=False)
+def _get_courses(file_path: str, mtime: float) -> List[Dict[str, Any]]:
+    """
+    Load the course catalog, cached on disk across reruns and restarts.
+    
+    The file's modification time is part of the cache key, so editing the
+    catalog invalidates the cached copy.
+    """
+    return load_courses(file_path)
+
+
+@st.cache_resource(show_spinner=False)
+def _get_courses_by_id(file_path: str, mtime: float) -> Dict[str, Dict[str, Any]]:
+    """
+    Index the course catalog by course code, shared read-only by all sessions.
+    
+    Kept as a resource rather than data so reruns get the same dict instead
+    of an unpickled copy.
+    """
+    return {course['code']: course for course in _get_courses(file_path, mtime)}
+
+
+@st.cache_resource
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Start the process-wide event loop that runs pipeline queries.
+    
+    The pipeline's async client, connection pool, concurrency limit and rate
+    limiter all belong to one event loop, so every session submits its
+    queries to this loop instead of starting its own with asyncio.run.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="pipeline-event-loop", daemon=True).start()
+    return loop
+
+
+class _UncachedResponse(Exception):
+    """Carries a fallback response out of _run_query so it is not memoized"""
+    
+    def __init__(self, response: ValidatedRecommendationResponse):
+        super().__init__(response.metadata.get('fallback_reason'))
+        self.response = response
+
+
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def _run_query(normalized_query: str, top_k: int, threshold: float, _query: str,
+               _pipeline: Day5GuardedRAGPipeline) -> ValidatedRecommendationResponse:
+    """
+    Run a validated query, memoized on the normalized query text, top_k and threshold.
+    
+    The underscore-prefixed arguments are not hashed: the original query text
+    is what the pipeline sees, and the pipeline itself is the shared resource.
+    The threshold is passed per call because all sessions share the pipeline.
+    """
+    response = asyncio.run_coroutine_threadsafe(
+        _pipeline.aprocess_query_with_validation(_query, top_k=top_k, confidence_threshold=threshold),
+        _get_event_loop()
+    ).result()
+    if 'fallback_reason' in response.metadata:
+        # Errors such as API outages should be retried, not served for an hour
+        raise _UncachedResponse(response)
+    return response
+
+
+def run_query(pipeline: Day5GuardedRAGPipeline, query: str, top_k: int,
+              threshold: float) -> ValidatedRecommendationResponse:
+    """Run a validated query through the memoized pipeline call"""
+    try:
+        return _run_query(" ".join(query.lower().split()), top_k, threshold, query, pipeline)
+    except _UncachedResponse as e:
+        return e.response
 
 
 class StreamlitCourseRecommender:
@@ -94,6 +186,9 @@ class StreamlitCourseRecommender:
     
     def __init__(self):
         """Initialize the Streamlit app"""
+        self.pipeline: Optional[Day5GuardedRAGPipeline] = None
+        self.courses: List[Dict[str, Any]] = []
+        self.courses_by_id: Dict[str, Dict[str, Any]] = {}
         self.initialize_session_state()
         self.load_pipeline()
         
@@ -101,33 +196,48 @@ class StreamlitCourseRecommender:
         """Initialize Streamlit session state variables"""
         if 'recommendations' not in st.session_state:
             st.session_state.recommendations = None
+        # Histories are bounded; only the most recent entries are shown
         if 'query_history' not in st.session_state:
-            st.session_state.query_history = []
+            st.session_state.query_history = deque(maxlen=50)
+        if 'query_count' not in st.session_state:
+            st.session_state.query_count = 0
         if 'feedback_data' not in st.session_state:
             st.session_state.feedback_data = []
-        if 'pipeline_loaded' not in st.session_state:
-            st.session_state.pipeline_loaded = False
+        if 'feedback_flushed_idx' not in st.session_state:
+            st.session_state.feedback_flushed_idx = 0
         if 'refined_queries' not in st.session_state:
-            st.session_state.refined_queries = []
+            st.session_state.refined_queries = deque(maxlen=20)
     
     def load_pipeline(self):
-        """Load the RAG pipeline with caching"""
-        if not st.session_state.pipeline_loaded:
-            with st.spinner("🤖 Loading AI Course Recommendation System..."):
-                try:
-                    self.pipeline = Day5GuardedRAGPipeline(confidence_threshold=0.6)
-                    self.courses = load_courses()
-                    st.session_state.pipeline_loaded = True
-                    logger.info("Pipeline loaded successfully")
-                except Exception as e:
-                    st.error(f"Error loading pipeline: {e}")
-                    logger.error(f"Pipeline loading error: {e}")
-                    return False
-        else:
-            self.pipeline = Day5GuardedRAGPipeline(confidence_threshold=0.6)
-            self.courses = load_courses()
+        """
+        Load the RAG pipeline and course catalog.
+        
+        Both are cached per process, so only the first run of the first
+        session builds them; later reruns reuse the same objects.
+        """
+        if self.pipeline is not None:
+            return True
+        
+        try:
+            self.pipeline = _get_pipeline(0.6)
+            mtime = Path(COURSES_FILE).stat().st_mtime
+            self.courses = _get_courses(COURSES_FILE, mtime)
+            self.courses_by_id = _get_courses_by_id(COURSES_FILE, mtime)
+        except Exception as e:
+            st.error(f"Error loading pipeline: {e}")
+            logger.error(f"Pipeline loading error: {e}")
+            return False
         return True
     
+    def render_styles(self):
+        """
+        Inject the app stylesheet.
+        
+        Streamlit drops elements that a rerun does not emit again, so this
+        runs every time; the stylesheet itself is a module constant.
+        """
+        st.markdown(_CSS, unsafe_allow_html=True)
+    
     def render_header(self):
         """Render the main application header"""
         st.markdown('<h1 class="main-header">🎓 AI Course Recommender</h1>', unsafe_allow_html=True)
@@ -151,7 +261,7 @@ class StreamlitCourseRecommender:
             """)
             
             st.header("📊 System Status")
-            if st.session_state.pipeline_loaded:
+            if self.pipeline is not None:
                 st.success("✅ AI System Ready")
                 st.info(f"📚 {len(self.courses)} courses available")
             else:
@@ -159,7 +269,7 @@ class StreamlitCourseRecommender:
             
             if st.session_state.query_history:
                 st.header("📝 Query History")
-                for i, query in enumerate(reversed(st.session_state.query_history[-5:]), 1):
+                for i, query in enumerate(islice(reversed(st.session_state.query_history), 5), 1):
                     st.text(f"{i}. {query[:50]}...")
             
             st.header("⚙️ Settings")
@@ -279,31 +389,34 @@ class StreamlitCourseRecommender:
                     # Course card
                     st.markdown(f"""
                     <div class="course-card">
-                        <h3>🎯 {rec.course_id}: {rec.title}</h3>
-                        <p><strong>Match Score:</strong> <span class="{self.get_confidence_color(rec.match_score)}">{rec.match_score:.1%}</span></p>
-                        <p><strong>Why this course:</strong> {rec.justification}</p>
+                        <h3>🎯 {rec['course_id']}: {rec['title']}</h3>
+                        <p><strong>Match Score:</strong> <span class="{self.get_confidence_color(rec['match_score'])}">{rec['match_score']:.1%}</span></p>
+                        <p><strong>Why this course:</strong> {rec['justification']}</p>
                     </div>
                     """, unsafe_allow_html=True)
                     
                     # Course details from data
-                    course_data = next((c for c in self.courses if c['code'] == rec.course_id), None)
+                    course_data = self.courses_by_id.get(rec['course_id'])
                     if course_data:
-                        with st.expander(f"📋 Course Details: {rec.course_id}"):
+                        with st.expander(f"📋 Course Details: {rec['course_id']}"):
+                            # One markdown element per column rather than one per field
                             col_a, col_b = st.columns(2)
-                            with col_a:
-                                st.write(f"**Credits:** {course_data.get('credits', 'N/A')}")
-                                st.write(f"**Difficulty:** {course_data.get('difficulty', 'N/A')}/5")
-                                st.write(f"**Category:** {course_data.get('category', 'N/A')}")
-                            with col_b:
-                                st.write(f"**Semester:** {course_data.get('semester', 'N/A')}")
-                                st.write(f"**Prerequisites:** {course_data.get('prerequisites', 'N/A')}")
-                                st.write(f"**Instructor:** {course_data.get('instructor', 'N/A')}")
+                            col_a.markdown("\n\n".join((
+                                f"**Credits:** {course_data.get('credits', 'N/A')}",
+                                f"**Difficulty:** {course_data.get('difficulty', 'N/A')}/5",
+                                f"**Category:** {course_data.get('category', 'N/A')}"
+                            )))
+                            col_b.markdown("\n\n".join((
+                                f"**Semester:** {course_data.get('semester', 'N/A')}",
+                                f"**Prerequisites:** {course_data.get('prerequisites', 'N/A')}",
+                                f"**Instructor:** {course_data.get('instructor', 'N/A')}"
+                            )))
                             
                             st.write(f"**Description:** {course_data.get('description', 'No description available')}")
                 
                 with col2:
                     # Feedback buttons
-                    self.render_feedback_buttons(rec.course_id, i)
+                    self.render_feedback_buttons(rec['course_id'], i)
         
         # Warnings and debug info
         if response.warnings:
@@ -320,8 +433,15 @@ class StreamlitCourseRecommender:
                     "query_embedding_used": "Yes"
                 })
     
+    @st.fragment
     def render_feedback_buttons(self, course_id: str, index: int):
-        """Render feedback buttons for a course recommendation"""
+        """
+        Render feedback buttons for a course recommendation.
+        
+        Runs as a fragment, so a click reruns only these buttons rather than
+        the whole app. Feedback is saved as soon as it is recorded, since the
+        end of run() is not reached on a fragment rerun.
+        """
         st.markdown(f"""
         <div class="feedback-section">
             <p style="font-size: 0.9rem; margin-bottom: 0.5rem;"><strong>Helpful?</strong></p>
@@ -333,11 +453,13 @@ class StreamlitCourseRecommender:
         with col_a:
             if st.button("👍", key=f"thumbs_up_{course_id}_{index}", help="This recommendation is helpful"):
                 self.record_feedback(course_id, "positive", "Thumbs up")
+                self.save_feedback_to_file()
                 st.success("Thanks for your feedback!")
         
         with col_b:
             if st.button("👎", key=f"thumbs_down_{course_id}_{index}", help="This recommendation is not helpful"):
                 self.record_feedback(course_id, "negative", "Thumbs down")
+                self.save_feedback_to_file()
                 st.info("Thanks! We'll improve our recommendations.")
     
     def render_refinement_section(self):
@@ -376,12 +498,10 @@ class StreamlitCourseRecommender:
             
             with col1:
                 if st.session_state.feedback_data:
-                    feedback_df = pd.DataFrame(st.session_state.feedback_data)
-                    positive_count = len(feedback_df[feedback_df['sentiment'] == 'positive'])
-                    negative_count = len(feedback_df[feedback_df['sentiment'] == 'negative'])
+                    sentiments = Counter(entry['sentiment'] for entry in st.session_state.feedback_data)
                     
                     fig = px.pie(
-                        values=[positive_count, negative_count],
+                        values=[sentiments['positive'], sentiments['negative']],
                         names=['Positive', 'Negative'],
                         title="Feedback Distribution"
                     )
@@ -389,7 +509,7 @@ class StreamlitCourseRecommender:
             
             with col2:
                 if st.session_state.query_history:
-                    query_counts = len(st.session_state.query_history)
+                    query_counts = st.session_state.query_count
                     st.metric("Total Queries", query_counts)
                     
                     if st.session_state.recommendations:
@@ -417,17 +537,26 @@ class StreamlitCourseRecommender:
         logger.info(f"Recorded feedback: {feedback}")
     
     def save_feedback_to_file(self):
-        """Save feedback data to file"""
-        if st.session_state.feedback_data:
-            feedback_file = Path("data/user_feedback.json")
-            feedback_file.parent.mkdir(exist_ok=True)
-            
-            try:
-                with open(feedback_file, "w") as f:
-                    json.dump(st.session_state.feedback_data, f, indent=2)
-                logger.info(f"Saved {len(st.session_state.feedback_data)} feedback entries")
-            except Exception as e:
-                logger.error(f"Error saving feedback: {e}")
+        """
+        Append feedback not yet saved to the JSON Lines feedback file.
+        
+        Only entries past the session's flushed cursor are written, so each
+        save costs I/O for the new entries alone and never overwrites
+        feedback saved by other sessions.
+        """
+        flushed = st.session_state.feedback_flushed_idx
+        new_entries = st.session_state.feedback_data[flushed:]
+        if not new_entries:
+            return
+        
+        FEEDBACK_FILE.parent.mkdir(exist_ok=True)
+        try:
+            with open(FEEDBACK_FILE, "a") as f:
+                f.writelines(json.dumps(entry) + "\n" for entry in new_entries)
+            st.session_state.feedback_flushed_idx = flushed + len(new_entries)
+            logger.info(f"Saved {len(new_entries)} feedback entries")
+        except Exception as e:
+            logger.error(f"Error saving feedback: {e}")
     
     def run(self):
         """Main application runner"""
@@ -436,6 +565,7 @@ class StreamlitCourseRecommender:
             st.stop()
         
         # Render UI components
+        self.render_styles()
         self.render_header()
         confidence_threshold, show_debug = self.render_sidebar()
         
@@ -446,13 +576,11 @@ class StreamlitCourseRecommender:
         if query and st.button("🚀 Get Recommendations", type="primary"):
             with st.spinner("🤖 Generating personalized recommendations..."):
                 try:
-                    # Update pipeline confidence threshold
-                    self.pipeline.confidence_threshold = confidence_threshold
-                    
-                    # Process query
-                    response = self.pipeline.process_query_with_validation(query, top_k=num_recs)
+                    # Process query; repeats are served from the memoized result
+                    response = run_query(self.pipeline, query, num_recs, confidence_threshold)
                     st.session_state.recommendations = response
                     st.session_state.query_history.append(query)
+                    st.session_state.query_count += 1
                     
                     logger.info(f"Generated {len(response.recommendations)} recommendations for query: {query[:50]}...")
                     
@@ -473,7 +601,7 @@ class StreamlitCourseRecommender:
                 
                 with st.spinner("🔄 Refining recommendations..."):
                     try:
-                        response = self.pipeline.process_query_with_validation(combined_query, top_k=num_recs)
+                        response = run_query(self.pipeline, combined_query, num_recs, confidence_threshold)
                         st.session_state.recommendations = response
                         st.session_state.refined_queries.append(refinement)
                         st.rerun()
@@ -482,10 +610,6 @@ class StreamlitCourseRecommender:
         
         # Analytics dashboard
         self.render_analytics_dashboard()
-        
-        # Save feedback periodically
-        if st.session_state.feedback_data:
-            self.save_feedback_to_file()
 
 
 def main():
@@ -345,7 +345,7 @@ class Day7TestScenarios:
         
         # Check content-specific criteria
         response_text = " ".join([
-            rec.justification + " " + rec.title 
+            rec['justification'] + " " + rec['title'] 
             for rec in response.recommendations
         ]).lower()
         
@@ -365,7 +365,7 @@ class Day7TestScenarios:
             if check_name in criteria:
                 if check_name == "should_avoid_heavy_math":
                     # Check if any math courses were recommended
-                    math_courses = [rec for rec in response.recommendations if "MATH" in rec.course_id]
+                    math_courses = [rec for rec in response.recommendations if "MATH" in rec['course_id']]
                     met = len(math_courses) == 0
                 else:
                     # Check if any keywords appear in response
@@ -411,8 +411,8 @@ class Day7TestScenarios:
                 # Show top recommendation
                 if result["response"].recommendations:
                     top_rec = result["response"].recommendations[0]
-                    print(f"   🎯 Top Recommendation: {top_rec.course_id} - {top_rec.title}")
-                    print(f"      💡 Reasoning: {top_rec.justification[:100]}...")
+                    print(f"   🎯 Top Recommendation: {top_rec['course_id']} - {top_rec['title']}")
+                    print(f"      💡 Reasoning: {top_rec['justification'][:100]}...")
             else:
                 print(f"   ❌ Error: {result['error']}")
         
@@ -457,10 +457,10 @@ class Day7TestScenarios:
                     simplified["analysis"] = result["analysis"]
                     simplified["recommendations"] = [
                         {
-                            "course_id": rec.course_id,
-                            "title": rec.title,
-                            "match_score": rec.match_score,
-                            "justification": rec.justification
+                            "course_id": rec['course_id'],
+                            "title": rec['title'],
+                            "match_score": rec['match_score'],
+                            "justification": rec['justification']
                         }
                         for rec in result["response"].recommendations
                     ]
@@ -43,6 +43,9 @@ setup(
             "flake8>=5.0",
             "mypy>=1.0",
         ],
+        "fast": [
+            "orjson>=3.9.0",
+        ],
     },
     entry_points={
         "console_scripts": [
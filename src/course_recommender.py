@@ -8,8 +8,9 @@ OpenAI's GPT API and RAG (Retrieval-Augmented Generation) techniques.
 import os
 import json
 import logging
-from typing import List, Dict, Any, Optional
-from openai import OpenAI
+from typing import List, Dict, Any, Iterator, Optional
+import numpy as np
+from openai import OpenAI, AsyncOpenAI
 from .rag_system import RAGSystem
 from .prompt_templates import PromptTemplates
 from .data_manager import DataManager
@@ -18,6 +19,11 @@ from .data_manager import DataManager
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Candidates retrieved per requested recommendation, and how many of those
+# make it past the prefilter into the prompt
+RETRIEVED_CANDIDATES_PER_RECOMMENDATION = 4
+PROMPT_CANDIDATES_PER_RECOMMENDATION = 2
+
 
 class CourseRecommender:
     """
@@ -36,6 +42,7 @@ class CourseRecommender:
             raise ValueError("OpenAI API key must be provided or set in OPENAI_API_KEY environment variable")
         
         self.client = OpenAI(api_key=self.api_key)
+        self._async_client: Optional[AsyncOpenAI] = None
         self.rag_system = RAGSystem()
         self.prompt_templates = PromptTemplates()
         self.data_manager = DataManager()
@@ -67,22 +74,8 @@ class CourseRecommender:
             List of recommended courses with explanations
         """
         try:
-            # Extract interests and requirements from user profile
-            interests = user_profile.get("interests", "")
-            required_categories = user_profile.get("required_categories", [])
-            remaining_credits = user_profile.get("remaining_credits", 0)
-            difficulty_preference = user_profile.get("difficulty_preference", 3)
-            
             # Use RAG to find relevant courses
-            relevant_courses = self.rag_system.search_courses(
-                query=interests,
-                categories=required_categories,
-                max_results=num_recommendations * 2  # Get more to filter from
-            )
-            
-            if not relevant_courses:
-                # Fallback to sample courses if no search results
-                relevant_courses = self._get_sample_courses()
+            relevant_courses = self.get_candidate_courses(user_profile, num_recommendations)
             
             # Generate AI-powered recommendations
             recommendations = self._generate_ai_recommendations(
@@ -98,6 +91,96 @@ class CourseRecommender:
             # Return sample recommendations as fallback
             return self._get_sample_recommendations(user_profile)
     
+    def get_candidate_courses(self, user_profile: Dict[str, Any], num_recommendations: int = 5) -> List[Dict[str, Any]]:
+        """
+        Retrieve candidate courses for a user profile using the RAG system.
+        
+        Args:
+            user_profile: Dictionary containing user information
+            num_recommendations: Number of recommendations that will be generated
+            
+        Returns:
+            List of candidate course dictionaries
+        """
+        relevant_courses = self.rag_system.search_courses(
+            query=user_profile.get("interests", ""),
+            categories=user_profile.get("required_categories", []),
+            max_results=num_recommendations * RETRIEVED_CANDIDATES_PER_RECOMMENDATION  # Get more to filter from
+        )
+        
+        if not relevant_courses:
+            # Fallback to sample courses if no search results
+            relevant_courses = self._get_sample_courses()
+        
+        return relevant_courses
+    
+    def get_recommendations_stream(
+        self, 
+        user_profile: Dict[str, Any], 
+        candidate_courses: List[Dict[str, Any]], 
+        num_recommendations: int = 5
+    ) -> Iterator[str]:
+        """
+        Stream the AI recommendation text as the model generates it.
+        
+        Pass the completed text to parse_streamed_recommendations once the
+        stream is exhausted.
+        
+        Args:
+            user_profile: User profile information
+            candidate_courses: List of candidate courses from get_candidate_courses
+            num_recommendations: Number of recommendations to generate
+            
+        Yields:
+            Text chunks of the model response
+        """
+        try:
+            stream = self.client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=self._build_recommendation_messages(user_profile, candidate_courses, num_recommendations),
+                temperature=0.7,
+                max_tokens=2000,
+                stream=True
+            )
+            
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                    
+        except Exception as e:
+            logger.error(f"Error streaming AI recommendations: {e}")
+    
+    def parse_streamed_recommendations(
+        self, 
+        response_text: str, 
+        user_profile: Dict[str, Any], 
+        candidate_courses: List[Dict[str, Any]], 
+        num_recommendations: int = 5
+    ) -> List[Dict[str, Any]]:
+        """
+        Turn a completed streamed response into structured recommendations.
+        
+        Args:
+            response_text: Full text accumulated from get_recommendations_stream
+            user_profile: User profile information
+            candidate_courses: Candidate courses the response was generated from
+            num_recommendations: Number of recommendations requested
+            
+        Returns:
+            List of recommended courses, falling back to rule-based ranking
+        """
+        recommendations = []
+        if response_text:
+            try:
+                recommendations = self._parse_ai_response(response_text, candidate_courses)
+            except Exception as e:
+                logger.error(f"Error parsing streamed AI response: {e}")
+        
+        if not recommendations:
+            recommendations = self._get_rule_based_recommendations(user_profile, candidate_courses, num_recommendations)
+        
+        return recommendations
+    
     def _generate_ai_recommendations(
         self, 
         user_profile: Dict[str, Any], 
@@ -116,20 +199,10 @@ class CourseRecommender:
             List of recommended courses with AI-generated explanations
         """
         try:
-            # Prepare the prompt
-            prompt = self.prompt_templates.get_recommendation_prompt(
-                user_profile=user_profile,
-                candidate_courses=candidate_courses,
-                num_recommendations=num_recommendations
-            )
-            
             # Call OpenAI API
             response = self.client.chat.completions.create(
                 model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": self.prompt_templates.get_system_prompt()},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=self._build_recommendation_messages(user_profile, candidate_courses, num_recommendations),
                 temperature=0.7,
                 max_tokens=2000
             )
@@ -145,6 +218,103 @@ class CourseRecommender:
             # Fallback to rule-based recommendations
             return self._get_rule_based_recommendations(user_profile, candidate_courses, num_recommendations)
     
+    async def _agenerate_ai_recommendations(
+        self, 
+        user_profile: Dict[str, Any], 
+        candidate_courses: List[Dict[str, Any]], 
+        num_recommendations: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Async variant of _generate_ai_recommendations using AsyncOpenAI.
+        
+        Lets callers overlap several chat completions with asyncio.gather.
+        
+        Args:
+            user_profile: User profile information
+            candidate_courses: List of candidate courses from RAG search
+            num_recommendations: Number of recommendations to generate
+            
+        Returns:
+            List of recommended courses with AI-generated explanations
+        """
+        try:
+            response = await self._get_async_client().chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=self._build_recommendation_messages(user_profile, candidate_courses, num_recommendations),
+                temperature=0.7,
+                max_tokens=2000
+            )
+            
+            recommendations_text = response.choices[0].message.content
+            return self._parse_ai_response(recommendations_text, candidate_courses)
+            
+        except Exception as e:
+            logger.error(f"Error in async AI recommendation generation: {e}")
+            return self._get_rule_based_recommendations(user_profile, candidate_courses, num_recommendations)
+    
+    def _get_async_client(self) -> AsyncOpenAI:
+        """Create the AsyncOpenAI client on first use; sync-only callers never pay for it."""
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(api_key=self.api_key)
+        return self._async_client
+    
+    def _build_recommendation_messages(
+        self, 
+        user_profile: Dict[str, Any], 
+        candidate_courses: List[Dict[str, Any]], 
+        num_recommendations: int
+    ) -> List[Dict[str, str]]:
+        """Build the chat messages shared by the sync and async generation paths."""
+        prompt = self.prompt_templates.get_recommendation_prompt(
+            user_profile=user_profile,
+            candidate_courses=self._prefilter_candidates(
+                user_profile, candidate_courses, num_recommendations * PROMPT_CANDIDATES_PER_RECOMMENDATION
+            ),
+            num_recommendations=num_recommendations
+        )
+        return [
+            {"role": "system", "content": self.prompt_templates.get_system_prompt()},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _prefilter_candidates(
+        self, 
+        user_profile: Dict[str, Any], 
+        candidate_courses: List[Dict[str, Any]], 
+        max_candidates: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Keep only the most promising candidates before they are put in the prompt.
+        
+        Scores every candidate at once on category match and distance from the
+        preferred difficulty, then keeps the top max_candidates in their
+        original retrieval order.
+        
+        Args:
+            user_profile: User profile information
+            candidate_courses: List of candidate courses from RAG search
+            max_candidates: Maximum number of candidates to keep
+            
+        Returns:
+            Filtered list of candidate courses
+        """
+        if len(candidate_courses) <= max_candidates:
+            return candidate_courses
+        
+        required_categories = set(user_profile.get("required_categories", []))
+        category_match = np.fromiter(
+            (course.get('category') in required_categories for course in candidate_courses),
+            dtype=np.float32, count=len(candidate_courses)
+        )
+        difficulties = np.fromiter(
+            (course.get('difficulty', 3) for course in candidate_courses),
+            dtype=np.float32, count=len(candidate_courses)
+        )
+        scores = category_match * 2 - np.abs(difficulties - user_profile.get("difficulty_preference", 3))
+        
+        keep = np.sort(np.argpartition(-scores, max_candidates - 1)[:max_candidates])
+        return [candidate_courses[i] for i in keep]
+    
     def _parse_ai_response(self, response_text: str, candidate_courses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Parse the AI response and match with candidate courses.
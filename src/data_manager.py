@@ -10,9 +10,38 @@ import logging
 from typing import List, Dict, Any, Optional
 import pandas as pd
 
+try:
+    import orjson
+except ImportError:  # orjson is an optional speedup; fall back to the stdlib
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
+def _read_json(file_path: str) -> Any:
+    """Read a JSON file, using orjson when it is installed."""
+    if orjson is not None:
+        with open(file_path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_json(file_path: str, data: Any, ensure_ascii: bool = False) -> None:
+    """
+    Write data as indented JSON, using orjson when it is installed.
+    
+    orjson always writes raw UTF-8, so output that must escape non-ASCII
+    characters is written with the stdlib.
+    """
+    if orjson is not None and not ensure_ascii:
+        with open(file_path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        return
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=ensure_ascii)
+
+
 class DataManager:
     """
     Manages course data and graduation requirements.
@@ -55,8 +84,7 @@ class DataManager:
             List of course dictionaries
         """
         try:
-            with open(self.courses_file, 'r', encoding='utf-8') as f:
-                courses = json.load(f)
+            courses = _read_json(self.courses_file)
             logger.info(f"Loaded {len(courses)} courses from {self.courses_file}")
             return courses
         except Exception as e:
@@ -74,8 +102,7 @@ class DataManager:
             True if successful, False otherwise
         """
         try:
-            with open(self.courses_file, 'w', encoding='utf-8') as f:
-                json.dump(courses, f, indent=2, ensure_ascii=False)
+            _write_json(self.courses_file, courses)
             logger.info(f"Saved {len(courses)} courses to {self.courses_file}")
             return True
         except Exception as e:
@@ -90,8 +117,7 @@ class DataManager:
             Dictionary of graduation requirements
         """
         try:
-            with open(self.requirements_file, 'r', encoding='utf-8') as f:
-                requirements = json.load(f)
+            requirements = _read_json(self.requirements_file)
             logger.info(f"Loaded requirements from {self.requirements_file}")
             return requirements
         except Exception as e:
@@ -109,8 +135,7 @@ class DataManager:
             True if successful, False otherwise
         """
         try:
-            with open(self.requirements_file, 'w', encoding='utf-8') as f:
-                json.dump(requirements, f, indent=2, ensure_ascii=False)
+            _write_json(self.requirements_file, requirements)
             logger.info(f"Saved requirements to {self.requirements_file}")
             return True
         except Exception as e:
@@ -452,8 +477,7 @@ def load_courses(file_path: str = "data/courses.json") -> List[Dict[str, Any]]:
         List of course dictionaries
     """
     try:
-        with open(file_path, 'r') as f:
-            courses = json.load(f)
+        courses = _read_json(file_path)
         logger.info(f"Loaded {len(courses)} courses from {file_path}")
         return courses
     except FileNotFoundError:
@@ -480,8 +504,7 @@ def save_courses(courses: List[Dict[str, Any]], file_path: str = "data/courses.j
     """
     try:
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, 'w') as f:
-            json.dump(courses, f, indent=2)
+        _write_json(file_path, courses, ensure_ascii=True)
         logger.info(f"Saved {len(courses)} courses to {file_path}")
         return True
     except Exception as e:
@@ -0,0 +1,141 @@
+"""
+Fast Similarity Kernels
+
+CPU cosine-similarity scoring for retrieval over a pre-normalized embedding
+matrix, in float32 or int8 with a per-row scale. Uses Numba-compiled parallel
+kernels when Numba is installed and falls back to NumPy otherwise.
+"""
+
+import logging
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # Numba is an optional speedup; fall back to NumPy
+    njit = None
+    prange = range
+
+logger = logging.getLogger(__name__)
+
+NUMBA_AVAILABLE = njit is not None
+
+
+def _cosine_scores_py(C: np.ndarray, q: np.ndarray, out: np.ndarray) -> None:
+    """Dot product of every row of C with q, written into out."""
+    N, d = C.shape
+    for i in prange(N):
+        dot = 0.0
+        for j in range(d):
+            dot += C[i, j] * q[j]
+        out[i] = dot
+
+
+def _cosine_scores_int8_py(C_q: np.ndarray, q_q: np.ndarray, inv_scales: np.ndarray,
+                           out: np.ndarray) -> None:
+    """Integer dot product of every row of C_q with q_q, rescaled into out."""
+    N, d = C_q.shape
+    for i in prange(N):
+        dot = 0
+        for j in range(d):
+            dot += np.int32(C_q[i, j]) * np.int32(q_q[j])
+        out[i] = dot * inv_scales[i]
+
+
+if NUMBA_AVAILABLE:
+    _cosine_scores_kernel = njit(parallel=True, fastmath=True, cache=True)(_cosine_scores_py)
+    _cosine_scores_int8_kernel = njit(parallel=True, fastmath=True, cache=True)(_cosine_scores_int8_py)
+else:
+    _cosine_scores_kernel = None
+    _cosine_scores_int8_kernel = None
+
+
+def quantize_int8(X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize rows to int8 with a per-row scale.
+
+    Each row is scaled so its largest magnitude maps to 127, which keeps far
+    more precision than a fixed scale for unit vectors whose entries are small.
+
+    Args:
+        X: (N, d) or (d,) float matrix
+
+    Returns:
+        Tuple of (int8 array shaped like X, float32 inverse scale per row)
+    """
+    X = np.asarray(X, dtype=np.float32)
+    peak = np.abs(X).max(axis=-1, keepdims=True)
+    scales = 127.0 / np.maximum(peak, 1e-12)
+    X_q = np.round(X * scales).astype(np.int8)
+    return X_q, (1.0 / scales[..., 0]).astype(np.float32)
+
+
+def cosine_scores(C: np.ndarray, q: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Cosine similarity of a normalized query against a normalized matrix.
+
+    Args:
+        C: (N, d) float32 matrix with unit-length rows
+        q: (d,) float32 unit-length query vector
+        out: Optional (N,) float32 buffer to write scores into
+
+    Returns:
+        (N,) array of similarity scores
+    """
+    if out is None:
+        out = np.empty(C.shape[0], dtype=np.float32)
+
+    if _cosine_scores_kernel is not None:
+        _cosine_scores_kernel(C, q, out)
+    else:
+        np.dot(C, q, out=out)
+
+    return out
+
+
+def cosine_scores_int8(C_q: np.ndarray, inv_scales: np.ndarray, q_q: np.ndarray,
+                       q_inv_scale: float, out: np.ndarray = None) -> np.ndarray:
+    """
+    Approximate cosine similarity from int8-quantized rows and query.
+
+    Args:
+        C_q: (N, d) int8 matrix from quantize_int8 of unit-length rows
+        inv_scales: (N,) inverse row scales from quantize_int8
+        q_q: (d,) int8 query from quantize_int8 of a unit-length vector
+        q_inv_scale: Inverse scale of the query
+        out: Optional (N,) float32 buffer to write scores into
+
+    Returns:
+        (N,) array of similarity scores
+    """
+    if out is None:
+        out = np.empty(C_q.shape[0], dtype=np.float32)
+
+    if _cosine_scores_int8_kernel is not None:
+        _cosine_scores_int8_kernel(C_q, q_q, inv_scales, out)
+    else:
+        np.multiply(C_q @ q_q.astype(np.float32), inv_scales, out=out)
+
+    out *= q_inv_scale
+    return out
+
+
+def warmup(d: int) -> None:
+    """
+    Compile the Numba kernels ahead of the first query.
+
+    Args:
+        d: Embedding dimension the kernel will be called with
+    """
+    if _cosine_scores_kernel is None:
+        return
+
+    C = np.zeros((2, d), dtype=np.float32)
+    q = np.zeros(d, dtype=np.float32)
+    cosine_scores(C, q)
+
+    C_q, inv_scales = quantize_int8(C)
+    q_q, q_inv_scale = quantize_int8(q)
+    cosine_scores_int8(C_q, inv_scales, q_q, float(q_inv_scale))
+    logger.info("Compiled Numba cosine similarity kernels")
@@ -9,9 +9,13 @@ import logging
 from typing import List, Dict, Any, Optional
 import chromadb
 from chromadb.config import Settings
+from chromadb.utils.embedding_functions import OpenAIEmbeddingFunction
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of documents sent to ChromaDB per upsert() call
+ADD_BATCH_SIZE = 1000
+
 
 class RAGSystem:
     """
@@ -19,22 +23,45 @@ class RAGSystem:
     Uses ChromaDB for vector storage and similarity search.
     """
     
-    def __init__(self, persist_directory: Optional[str] = None):
+    def __init__(
+        self, 
+        persist_directory: Optional[str] = None, 
+        embedding_model: Optional[str] = None, 
+        embedding_dimensions: int = 256
+    ):
         """
         Initialize the RAG system.
         
         Args:
             persist_directory: Directory to persist ChromaDB data
+            embedding_model: OpenAI embedding model to use instead of ChromaDB's
+                default local model (falls back to CHROMA_EMBEDDING_MODEL)
+            embedding_dimensions: Output dimensions requested from the OpenAI model
         """
         self.persist_directory = persist_directory or os.getenv("CHROMA_PERSIST_DIRECTORY", "./chroma_db")
+        self.embedding_model = embedding_model or os.getenv("CHROMA_EMBEDDING_MODEL")
+        self.embedding_dimensions = embedding_dimensions
         
         try:
             # Initialize ChromaDB client
             self.client = chromadb.PersistentClient(path=self.persist_directory)
-            self.collection = self.client.get_or_create_collection(
-                name="courses",
-                metadata={"description": "Course information for recommendations"}
-            )
+            if self.embedding_model:
+                # Shortened OpenAI embeddings keep the HNSW index small; each
+                # model/dimension pair gets its own collection
+                self.collection = self.client.get_or_create_collection(
+                    name=f"courses_{self.embedding_model}_{self.embedding_dimensions}",
+                    metadata={"description": "Course information for recommendations"},
+                    embedding_function=OpenAIEmbeddingFunction(
+                        api_key=os.getenv("OPENAI_API_KEY"),
+                        model_name=self.embedding_model,
+                        dimensions=self.embedding_dimensions
+                    )
+                )
+            else:
+                self.collection = self.client.get_or_create_collection(
+                    name="courses",
+                    metadata={"description": "Course information for recommendations"}
+                )
             logger.info(f"Initialized RAG system with persist directory: {self.persist_directory}")
         except Exception as e:
             logger.warning(f"Could not initialize ChromaDB: {e}. Using fallback implementation.")
@@ -42,57 +69,73 @@ class RAGSystem:
             self.collection = None
             self._courses_data = []  # Fallback storage
     
-    def add_courses(self, courses: List[Dict[str, Any]]) -> None:
+    def add_courses(self, courses: List[Dict[str, Any]], replace: bool = False) -> bool:
         """
         Add courses to the vector database.
         
+        Courses are upserted by code, so a course whose text changed replaces
+        its stored document and embedding instead of being ignored.
+        
         Args:
             courses: List of course dictionaries
+            replace: Also remove stored courses that are not in courses
+            
+        Returns:
+            True if the courses were written to the vector database
         """
         if not courses:
-            return
+            return False
             
         try:
             if self.collection is not None:
-                # Prepare data for ChromaDB
-                documents = []
-                metadatas = []
-                ids = []
-                
-                for course in courses:
-                    # Create searchable text from course information
-                    doc_text = f"{course.get('title', '')} {course.get('description', '')} {course.get('category', '')}"
-                    documents.append(doc_text)
-                    
-                    # Store metadata
-                    metadata = {
+                # Prepare data for ChromaDB in a single pass per field
+                ids = [course.get('code', f"course_{i}") for i, course in enumerate(courses)]
+                documents = [
+                    " ".join((course.get('title', ''), course.get('description', ''), course.get('category', '')))
+                    for course in courses
+                ]
+                metadatas = [
+                    {
                         "code": course.get('code', ''),
                         "title": course.get('title', ''),
                         "category": course.get('category', ''),
                         "credits": str(course.get('credits', 0)),
                         "difficulty": str(course.get('difficulty', 0))
                     }
-                    metadatas.append(metadata)
-                    ids.append(course.get('code', f"course_{len(ids)}"))
+                    for course in courses
+                ]
+                
+                # Upsert into the collection in as few round trips as possible
+                for start in range(0, len(ids), ADD_BATCH_SIZE):
+                    end = start + ADD_BATCH_SIZE
+                    self.collection.upsert(
+                        documents=documents[start:end],
+                        metadatas=metadatas[start:end],
+                        ids=ids[start:end]
+                    )
+                
+                if replace:
+                    stale_ids = set(self.collection.get(include=[])["ids"]).difference(ids)
+                    if stale_ids:
+                        self.collection.delete(ids=list(stale_ids))
+                        logger.info(f"Removed {len(stale_ids)} courses no longer in the catalog")
                 
-                # Add to collection
-                self.collection.add(
-                    documents=documents,
-                    metadatas=metadatas,
-                    ids=ids
-                )
                 logger.info(f"Added {len(courses)} courses to vector database")
+                return True
             else:
                 # Fallback: store in memory
+                if replace:
+                    self._courses_data = []
                 self._courses_data.extend(courses)
                 logger.info(f"Added {len(courses)} courses to fallback storage")
                 
         except Exception as e:
             logger.error(f"Error adding courses to RAG system: {e}")
             # Fallback to in-memory storage
-            if not hasattr(self, '_courses_data'):
+            if replace or not hasattr(self, '_courses_data'):
                 self._courses_data = []
             self._courses_data.extend(courses)
+        return False
     
     def search_courses(
         self, 
@@ -302,6 +345,31 @@ class RAGSystem:
             }
         ]
     
+    def get_content_hash(self) -> Optional[str]:
+        """Get the content hash recorded for the persisted courses, if any."""
+        try:
+            if self.collection is not None:
+                return (self.collection.metadata or {}).get("content_hash")
+        except Exception as e:
+            logger.warning(f"Could not read collection metadata: {e}")
+        return None
+    
+    def set_content_hash(self, content_hash: str) -> None:
+        """
+        Record a content hash for the persisted courses.
+        
+        Args:
+            content_hash: Hash of the course documents currently stored
+        """
+        if self.collection is None:
+            return
+        try:
+            metadata = dict(self.collection.metadata or {})
+            metadata["content_hash"] = content_hash
+            self.collection.modify(metadata=metadata)
+        except Exception as e:
+            logger.warning(f"Could not record content hash: {e}")
+    
     def get_course_count(self) -> int:
         """Get the number of courses in the system."""
         try:
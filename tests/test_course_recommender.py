@@ -0,0 +1,86 @@
+"""
+Unit Tests for Course Recommender Module
+
+Tests for src/course_recommender.py functionality including:
+- Candidate retrieval and prefiltering before the recommendation prompt
+"""
+
+import re
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+import sys
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+try:
+    from src.course_recommender import CourseRecommender
+    from src.prompt_templates import PromptTemplates
+except ImportError:
+    # Mock if modules not available
+    CourseRecommender = None
+    PromptTemplates = None
+
+
+@unittest.skipIf(CourseRecommender is None, "Course recommender not available")
+class TestCandidatePrefilter(unittest.TestCase):
+    """Test cases for narrowing retrieved candidates before prompting"""
+    
+    def setUp(self):
+        """Set up a recommender whose RAG search returns as many courses as requested"""
+        self.user_profile = {
+            "interests": "machine learning",
+            "required_categories": ["Major Electives"],
+            "difficulty_preference": 3
+        }
+        
+        # Alternate categories so the prefilter has a clear preference
+        self.catalog = [
+            {
+                "code": f"CS{100 + i}",
+                "title": f"Course {i}",
+                "description": "Course description",
+                "credits": 3,
+                "difficulty": 3,
+                "category": "Major Electives" if i % 2 else "General Education"
+            }
+            for i in range(40)
+        ]
+        
+        # Skip __init__: it needs an API key and seeds the vector database
+        self.recommender = CourseRecommender.__new__(CourseRecommender)
+        self.recommender.prompt_templates = PromptTemplates()
+        self.recommender.rag_system = MagicMock()
+        self.recommender.rag_system.search_courses.side_effect = (
+            lambda query, categories, max_results: self.catalog[:max_results]
+        )
+    
+    def prompt_course_codes(self, candidates, num_recommendations):
+        """Course codes listed in the recommendation prompt."""
+        messages = self.recommender._build_recommendation_messages(self.user_profile, candidates, num_recommendations)
+        return re.findall(r"^Course: (\S+)", messages[-1]["content"], re.MULTILINE)
+    
+    def test_prompt_gets_fewer_candidates_than_retrieved(self):
+        """Test that the prompt lists fewer courses than were retrieved"""
+        candidates = self.recommender.get_candidate_courses(self.user_profile, num_recommendations=3)
+        codes = self.prompt_course_codes(candidates, num_recommendations=3)
+        
+        self.assertEqual(len(candidates), 12)
+        self.assertEqual(len(codes), 6)
+        
+        # The category matches are kept, in retrieval order
+        kept = [course for course in candidates if course["category"] == "Major Electives"]
+        self.assertEqual(codes, [course["code"] for course in kept])
+    
+    def test_short_candidate_list_passes_through(self):
+        """Test that a list already within the limit reaches the prompt unchanged"""
+        candidates = self.catalog[:3]
+        
+        self.assertEqual(self.prompt_course_codes(candidates, num_recommendations=3),
+                         [course["code"] for course in candidates])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -26,6 +26,13 @@ except ImportError:
     EmbeddingBasedCourseSearch = None
 
 
+def fake_embeddings_response(model, input, dimensions, encoding_format):
+    """Stand-in for embeddings.create returning one random embedding per input."""
+    response = MagicMock()
+    response.data = [MagicMock(embedding=np.random.rand(dimensions).tolist()) for _ in input]
+    return response
+
+
 class TestEmbeddingSearch(unittest.TestCase):
     """Test cases for embedding-based course search"""
     
@@ -179,7 +186,7 @@ class TestEmbeddingSearch(unittest.TestCase):
             search_system.search_similar_courses(None)
     
     @unittest.skipIf(EmbeddingBasedCourseSearch is None, "Embedding search not available")
-    @patch('openai.OpenAI')
+    @patch('day3_embedding_search.OpenAI')
     def test_api_error_handling(self, mock_openai):
         """Test handling of OpenAI API errors"""
         mock_client = MagicMock()
@@ -188,7 +195,7 @@ class TestEmbeddingSearch(unittest.TestCase):
         # Mock API error
         mock_client.embeddings.create.side_effect = Exception("API Error")
         
-        search_system = EmbeddingBasedCourseSearch(api_key="test_key")
+        search_system = EmbeddingBasedCourseSearch(api_key="test_key", cache_dir=None)
         
         # Should handle API errors gracefully
         with self.assertRaises(Exception):
@@ -217,7 +224,7 @@ class TestEmbeddingSearch(unittest.TestCase):
             self.skipTest(f"Course formatting test not possible: {e}")
     
     @unittest.skipIf(EmbeddingBasedCourseSearch is None, "Embedding search not available")
-    @patch('openai.OpenAI')
+    @patch('day3_embedding_search.OpenAI')
     def test_large_course_dataset(self, mock_openai):
         """Test performance with larger course dataset"""
         # Create larger dataset
@@ -238,17 +245,11 @@ class TestEmbeddingSearch(unittest.TestCase):
         mock_openai.return_value = mock_client
         
         # Mock embedding responses
-        mock_responses = []
-        for _ in range(len(large_dataset) + 1):  # +1 for query
-            mock_response = MagicMock()
-            mock_response.data = [MagicMock(embedding=np.random.rand(1536).tolist())]
-            mock_responses.append(mock_response)
-        
-        mock_client.embeddings.create.side_effect = mock_responses
+        mock_client.embeddings.create.side_effect = fake_embeddings_response
         
         try:
             import time
-            search_system = EmbeddingBasedCourseSearch(api_key="test_key")
+            search_system = EmbeddingBasedCourseSearch(api_key="test_key", cache_dir=None)
             
             start_time = time.time()
             search_system.embed_courses(large_dataset)
@@ -262,8 +263,8 @@ class TestEmbeddingSearch(unittest.TestCase):
             self.skipTest(f"Large dataset test failed: {e}")
     
     @unittest.skipIf(EmbeddingBasedCourseSearch is None, "Embedding search not available")
-    @patch('faiss.IndexFlatIP')
-    @patch('openai.OpenAI')
+    @patch('faiss.index_factory')
+    @patch('day3_embedding_search.OpenAI')
     def test_faiss_index_operations(self, mock_openai, mock_faiss_index):
         """Test FAISS index operations"""
         # Mock FAISS index
@@ -274,17 +275,13 @@ class TestEmbeddingSearch(unittest.TestCase):
         mock_client = MagicMock()
         mock_openai.return_value = mock_client
         
-        # Mock embedding responses
-        mock_responses = []
-        for embedding in self.mock_embeddings:
-            mock_response = MagicMock()
-            mock_response.data = [MagicMock(embedding=embedding)]
-            mock_responses.append(mock_response)
-        
-        mock_client.embeddings.create.side_effect = mock_responses
+        # Mock embedding response (one batched request)
+        mock_response = MagicMock()
+        mock_response.data = [MagicMock(embedding=embedding) for embedding in self.mock_embeddings]
+        mock_client.embeddings.create.return_value = mock_response
         
         try:
-            search_system = EmbeddingBasedCourseSearch(api_key="test_key")
+            search_system = EmbeddingBasedCourseSearch(api_key="test_key", dimensions=1536, cache_dir=None)
             search_system.embed_courses(self.sample_courses)
             
             # Verify FAISS index operations
@@ -293,6 +290,165 @@ class TestEmbeddingSearch(unittest.TestCase):
             
         except Exception as e:
             self.skipTest(f"FAISS index test failed: {e}")
+    
+    @unittest.skipIf(EmbeddingBasedCourseSearch is None, "Embedding search not available")
+    @patch('day3_embedding_search.OpenAI')
+    def test_embed_courses_batches_requests(self, mock_openai):
+        """Test that course embeddings are requested in batches"""
+        mock_client = MagicMock()
+        mock_openai.return_value = mock_client
+        
+        mock_client.embeddings.create.side_effect = fake_embeddings_response
+        
+        search_system = EmbeddingBasedCourseSearch(api_key="test_key", cache_dir=None)
+        search_system.embed_courses(self.sample_courses)
+        
+        # All three courses fit in a single request
+        self.assertEqual(mock_client.embeddings.create.call_count, 1)
+        call_kwargs = mock_client.embeddings.create.call_args.kwargs
+        self.assertEqual(len(call_kwargs["input"]), len(self.sample_courses))
+        self.assertEqual(call_kwargs["dimensions"], 512)
+        self.assertEqual(search_system.course_embeddings.shape, (3, 512))
+        self.assertEqual(search_system.course_embeddings.dtype, np.float32)
+    
+    @unittest.skipIf(EmbeddingBasedCourseSearch is None, "Embedding search not available")
+    @patch('day3_embedding_search.OpenAI')
+    def test_embed_courses_uses_cache(self, mock_openai):
+        """Test that unchanged courses are not re-embedded"""
+        mock_client = MagicMock()
+        mock_openai.return_value = mock_client
+        
+        mock_client.embeddings.create.side_effect = fake_embeddings_response
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            search_system = EmbeddingBasedCourseSearch(api_key="test_key", cache_dir=temp_dir)
+            search_system.embed_courses(self.sample_courses[:2])
+            first_embeddings = search_system.course_embeddings.copy()
+            
+            search_system.embed_courses(self.sample_courses)
+            
+            # Only the new course is sent on the second run
+            self.assertEqual(mock_client.embeddings.create.call_count, 2)
+            sent_texts = mock_client.embeddings.create.call_args.kwargs["input"]
+            self.assertEqual(len(sent_texts), 1)
+            self.assertIn("Machine Learning", sent_texts[0])
+            np.testing.assert_array_equal(search_system.course_embeddings[:2], first_embeddings)
+    
+    @unittest.skipIf(EmbeddingBasedCourseSearch is None, "Embedding search not available")
+    @patch('day3_embedding_search.OpenAI')
+    def test_query_embedding_cache(self, mock_openai):
+        """Test that repeated queries reuse the cached embedding"""
+        mock_client = MagicMock()
+        mock_openai.return_value = mock_client
+        
+        mock_response = MagicMock()
+        mock_response.data = [MagicMock(embedding=self.mock_embeddings[0])]
+        mock_client.embeddings.create.return_value = mock_response
+        
+        search_system = EmbeddingBasedCourseSearch(api_key="test_key", dimensions=1536, cache_dir=None)
+        first = search_system.embed_student_query("I like psychology and AI")
+        second = search_system.embed_student_query("I like psychology and AI")
+        
+        self.assertEqual(mock_client.embeddings.create.call_count, 1)
+        np.testing.assert_array_equal(first, second)
+        self.assertAlmostEqual(float(np.linalg.norm(first)), 1.0, places=5)
+    
+    @unittest.skipIf(EmbeddingBasedCourseSearch is None, "Embedding search not available")
+    @patch('day3_embedding_search.OpenAI')
+    def test_prefetch_queries_warms_cache(self, mock_openai):
+        """Test that prefetched queries are served from the cache"""
+        mock_client = MagicMock()
+        mock_openai.return_value = mock_client
+        
+        mock_response = MagicMock()
+        mock_response.data = [MagicMock(embedding=self.mock_embeddings[0]),
+                              MagicMock(embedding=self.mock_embeddings[1])]
+        mock_client.embeddings.create.return_value = mock_response
+        
+        search_system = EmbeddingBasedCourseSearch(api_key="test_key", dimensions=1536, cache_dir=None)
+        search_system.prefetch_queries(["psychology", "AI"]).join(timeout=5)
+        
+        search_system.embed_student_query("psychology")
+        search_system.embed_student_query("AI")
+        
+        # Both queries were embedded by the single prefetch request
+        self.assertEqual(mock_client.embeddings.create.call_count, 1)
+    
+    @unittest.skipIf(EmbeddingBasedCourseSearch is None, "Embedding search not available")
+    @patch('day3_embedding_search.OpenAI')
+    def test_find_similar_courses_batch(self, mock_openai):
+        """Test batched search embeds all queries in one request"""
+        mock_client = MagicMock()
+        mock_openai.return_value = mock_client
+        
+        search_system = EmbeddingBasedCourseSearch(api_key="test_key", dimensions=1536, cache_dir=None)
+        search_system.courses = self.sample_courses
+        search_system.courses_arr = np.array(self.sample_courses, dtype=object)
+        search_system.course_embeddings = np.array(self.mock_embeddings, dtype=np.float32)
+        search_system._build_faiss_index()
+        
+        # Each query embeds to one of the course vectors
+        mock_response = MagicMock()
+        mock_response.data = [MagicMock(embedding=self.mock_embeddings[2]),
+                              MagicMock(embedding=self.mock_embeddings[0])]
+        mock_client.embeddings.create.return_value = mock_response
+        
+        results = search_system.find_similar_courses_batch(["machine learning", "intro programming"], top_k=5)
+        
+        self.assertEqual(mock_client.embeddings.create.call_count, 1)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0][0]["code"], "CS301")
+        self.assertEqual(results[1][0]["code"], "CS101")
+        
+        # Only three courses are indexed, so padding entries are dropped
+        self.assertEqual([course["rank"] for course in results[0]], [1, 2, 3])
+        self.assertNotIn("similarity_score", self.sample_courses[0])
+    
+    @unittest.skipIf(EmbeddingBasedCourseSearch is None, "Embedding search not available")
+    @patch('day3_embedding_search.OpenAI')
+    def test_search_indices(self, mock_openai):
+        """Test index search returns positions and scores without result dicts"""
+        search_system = EmbeddingBasedCourseSearch(api_key="test_key", dimensions=1536, cache_dir=None)
+        search_system.courses = self.sample_courses
+        search_system.course_embeddings = np.array(self.mock_embeddings, dtype=np.float32)
+        search_system._build_faiss_index()
+        
+        query = np.array(self.mock_embeddings[1], dtype=np.float32)
+        query /= np.linalg.norm(query)
+        indices, scores = search_system.search_indices(query, top_k=5)
+        
+        # Only three courses are indexed, so padding entries are dropped
+        self.assertEqual(len(indices), 3)
+        self.assertEqual(indices[0], 1)
+        self.assertAlmostEqual(float(scores[0]), 1.0, places=3)
+        self.assertTrue(np.all(np.diff(scores) <= 0))
+    
+    @unittest.skipIf(EmbeddingBasedCourseSearch is None, "Embedding search not available")
+    @patch('day3_embedding_search.OpenAI')
+    def test_save_and_load_embeddings_roundtrip(self, mock_openai):
+        """Test that saved embeddings and index load back unchanged"""
+        search_system = EmbeddingBasedCourseSearch(api_key="test_key", dimensions=1536)
+        search_system.courses = self.sample_courses
+        search_system.course_embeddings = np.array(self.mock_embeddings, dtype=np.float32)
+        search_system._build_faiss_index()
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filepath = os.path.join(temp_dir, "embeddings.json")
+            search_system.save_embeddings(filepath)
+            
+            self.assertTrue(os.path.exists(filepath + ".npy"))
+            self.assertTrue(os.path.exists(filepath + ".faiss"))
+            
+            loaded = EmbeddingBasedCourseSearch(api_key="test_key")
+            loaded.load_embeddings(filepath)
+            
+            self.assertEqual(loaded.courses, self.sample_courses)
+            self.assertEqual(loaded.embedding_dimension, 1536)
+            np.testing.assert_array_equal(loaded.course_embeddings, search_system.course_embeddings)
+            self.assertEqual(loaded.faiss_index.ntotal, len(self.sample_courses))
+            
+            # Release the memory-mapped file before the directory is removed
+            del loaded
 
 
 if __name__ == "__main__":
@@ -0,0 +1,78 @@
+"""
+Unit Tests for Fast Similarity Module
+
+Tests for src/fast_sim.py functionality including:
+- Cosine scores against a normalized matrix
+- Agreement between the compiled kernel and the NumPy fallback
+- int8 quantization with per-row scales
+"""
+
+import unittest
+import numpy as np
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+try:
+    from src import fast_sim
+except ImportError:
+    fast_sim = None
+
+
+class TestFastSim(unittest.TestCase):
+    """Test cases for cosine similarity kernels"""
+
+    def setUp(self):
+        """Set up a normalized matrix and query"""
+        rng = np.random.default_rng(0)
+        self.C = rng.standard_normal((50, 16)).astype(np.float32)
+        self.C /= np.linalg.norm(self.C, axis=1, keepdims=True)
+        self.q = self.C[7].copy()
+
+    def test_cosine_scores_match_numpy(self):
+        """Test scores match a plain matrix-vector product"""
+        if fast_sim is None:
+            self.skipTest("fast_sim not available")
+
+        scores = fast_sim.cosine_scores(self.C, self.q)
+
+        self.assertEqual(scores.shape, (50,))
+        np.testing.assert_allclose(scores, self.C @ self.q, atol=1e-5)
+        self.assertEqual(int(np.argmax(scores)), 7)
+
+    def test_numpy_fallback(self):
+        """Test the fallback path when Numba is not installed"""
+        if fast_sim is None:
+            self.skipTest("fast_sim not available")
+
+        out = np.empty(50, dtype=np.float32)
+        with patch.object(fast_sim, '_cosine_scores_kernel', None):
+            scores = fast_sim.cosine_scores(self.C, self.q, out=out)
+            fast_sim.warmup(16)
+
+        self.assertIs(scores, out)
+        np.testing.assert_allclose(scores, self.C @ self.q, atol=1e-5)
+
+    def test_int8_scores_close_to_float(self):
+        """Test int8 scores with per-row scales stay close to float32"""
+        if fast_sim is None:
+            self.skipTest("fast_sim not available")
+
+        C_q, inv_scales = fast_sim.quantize_int8(self.C)
+        q_q, q_inv_scale = fast_sim.quantize_int8(self.q)
+
+        self.assertEqual(C_q.dtype, np.int8)
+        self.assertEqual(inv_scales.shape, (50,))
+
+        scores = fast_sim.cosine_scores_int8(C_q, inv_scales, q_q, float(q_inv_scale))
+
+        np.testing.assert_allclose(scores, self.C @ self.q, atol=1e-2)
+        self.assertEqual(int(np.argmax(scores)), 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,16 +2,18 @@
 Unit Tests for Guardrails and Validation Module
 
 Tests for day5_guardrails.py functionality including:
-- Pydantic model validation
+- Recommendation and Pydantic response validation
 - Course ID filtering and hallucination detection
 - Confidence scoring and fallback mechanisms
 - Output validation and structured responses
 """
 
 import unittest
+import asyncio
 import json
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock, AsyncMock
 import sys
 
 # Add project root to path
@@ -21,6 +23,7 @@ sys.path.append(str(project_root))
 try:
     from day5_guardrails import (
         CourseRecommendation,
+        validate_recommendation,
         RecommendationResponse,
         ValidatedRecommendationResponse,
         CourseValidator,
@@ -31,6 +34,7 @@ try:
 except ImportError:
     # Mock if modules not available
     CourseRecommendation = None
+    validate_recommendation = None
     RecommendationResponse = None
     ValidatedRecommendationResponse = None
     CourseValidator = None
@@ -38,6 +42,12 @@ except ImportError:
     Day5GuardedRAGPipeline = None
     ValidationError = Exception
 
+# The streaming and caching tests only need the module itself
+try:
+    import day5_guardrails
+except ImportError:
+    day5_guardrails = None
+
 
 class TestGuardrailsValidation(unittest.TestCase):
     """Test cases for guardrails and validation functionality"""
@@ -75,7 +85,7 @@ class TestGuardrailsValidation(unittest.TestCase):
     
     @unittest.skipIf(CourseRecommendation is None, "Guardrails module not available")
     def test_course_recommendation_validation(self):
-        """Test CourseRecommendation Pydantic model validation"""
+        """Test CourseRecommendation validation"""
         # Valid recommendation
         valid_rec = {
             "course_id": "CS101",
@@ -84,9 +94,10 @@ class TestGuardrailsValidation(unittest.TestCase):
             "match_score": 0.85
         }
         
-        recommendation = CourseRecommendation(**valid_rec)
-        self.assertEqual(recommendation.course_id, "CS101")
-        self.assertEqual(recommendation.match_score, 0.85)
+        recommendation = validate_recommendation(valid_rec)
+        self.assertEqual(recommendation["course_id"], "CS101")
+        self.assertEqual(recommendation["match_score"], 0.85)
+        self.assertTrue(recommendation["prerequisites_met"])
         
         # Invalid recommendation - missing required field
         invalid_rec = {
@@ -95,19 +106,18 @@ class TestGuardrailsValidation(unittest.TestCase):
             # Missing justification and match_score
         }
         
-        with self.assertRaises(ValidationError):
-            CourseRecommendation(**invalid_rec)
+        with self.assertRaises(ValueError):
+            validate_recommendation(invalid_rec)
+        
+        # Invalid recommendation - malformed course ID
+        with self.assertRaises(ValueError):
+            validate_recommendation({**valid_rec, "course_id": "cs-101"})
         
         # Invalid recommendation - score out of range
-        invalid_score_rec = {
-            "course_id": "CS101",
-            "title": "Introduction to Computer Science",
-            "justification": "Good course",
-            "match_score": 1.5  # Invalid - should be <= 1.0
-        }
+        invalid_score_rec = {**valid_rec, "match_score": 1.5}  # Invalid - should be <= 1.0
         
-        with self.assertRaises(ValidationError):
-            CourseRecommendation(**invalid_score_rec)
+        with self.assertRaises(ValueError):
+            validate_recommendation(invalid_score_rec)
     
     @unittest.skipIf(CourseValidator is None, "CourseValidator not available")
     def test_course_validator_functionality(self):
@@ -214,7 +224,7 @@ class TestGuardrailsValidation(unittest.TestCase):
         
         # Should filter out invalid course
         self.assertEqual(len(validated.recommendations), 1)
-        self.assertEqual(validated.recommendations[0].course_id, "CS101")
+        self.assertEqual(validated.recommendations[0]["course_id"], "CS101")
         self.assertGreater(len(validated.warnings), 0)
     
     @unittest.skipIf(Day5GuardedRAGPipeline is None, "GuardedRAGPipeline not available")
@@ -336,5 +346,286 @@ class TestGuardrailsValidation(unittest.TestCase):
         self.assertFalse(validated.fallback_triggered)
 
 
+SAMPLE_COURSES = [
+    {"code": "CS101", "title": "Introduction to Computer Science", "category": "Core Requirements"},
+    {"code": "CS201", "title": "Data Structures and Algorithms", "category": "Core Requirements"},
+    {"code": "CS301", "title": "Machine Learning", "category": "Major Electives"}
+]
+
+# LLM output whose strings contain braces, brackets and escaped quotes, with
+# nested arrays inside a recommendation and an object after the array
+STREAMED_RESPONSE = {
+    "recommendations": [
+        {
+            "course_id": "CS101",
+            "title": "Intro {to} CS",
+            "justification": 'You write "hello world" programs, close a "}" by hand, match {braces} and '
+                             '[brackets] and learn the \\ escape rules, a solid first step for a new programmer.',
+            "match_score": 0.9,
+            "tags": [["intro", "python"], []]
+        },
+        {
+            "course_id": "CS999",
+            "title": "Fake Course",
+            "justification": "This course does not exist in the catalog and should be dropped before display.",
+            "match_score": 0.8
+        },
+        {
+            "course_id": "CS301",
+            "title": "Machine Learning",
+            "justification": "Builds on your statistics background with regression, neural networks and "
+                             "model evaluation projects that match your interest in AI.",
+            "match_score": 0.8
+        }
+    ],
+    "overall_confidence": 0.85,
+    "match_score": 0.85,
+    "justification": "These courses start from programming fundamentals and move on to machine learning, "
+                     "following the interests described in the query.",
+    "metadata": {"notes": {"source": [1, 2]}}
+}
+
+
+def split_text(text, positions):
+    """Split text into chunks at the given character positions."""
+    bounds = [0, *sorted(positions), len(text)]
+    return [text[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def awkward_chunks(text):
+    """Split streamed JSON inside strings, escapes, nested arrays and at the end of the array."""
+    return split_text(text, [
+        text.index('"recommendations"') + 5,
+        text.index('{to}') + 1,
+        text.index('\\"hello') + 1,
+        text.index('}\\" by hand'),
+        text.index('{braces}') + 1,
+        text.index('[brackets]') + 1,
+        text.index('[["intro"') + 1,
+        text.index('], []]') + 2,
+        text.index('], "overall_confidence"'),
+        text.index('"source"')
+    ])
+
+
+def stream_of(parts):
+    """Fake chat completion stream yielding one delta per part."""
+    async def stream():
+        for part in parts:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=part))])
+    return stream()
+
+
+def make_guarded_pipeline(**kwargs):
+    """Build a Day5GuardedRAGPipeline over SAMPLE_COURSES with a stubbed client and base pipeline."""
+    with patch('day4_rag_pipeline.Day4RAGPipeline'), \
+            patch.object(day5_guardrails, 'load_courses', return_value=SAMPLE_COURSES):
+        return day5_guardrails.Day5GuardedRAGPipeline(api_key="test-key", client=MagicMock(), **kwargs)
+
+
+@unittest.skipIf(day5_guardrails is None, "Guardrails module not available")
+class TestRecommendationStreaming(unittest.TestCase):
+    """Test cases for incremental parsing and validation of streamed responses"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.text = json.dumps(STREAMED_RESPONSE)
+        self.expected = STREAMED_RESPONSE["recommendations"]
+    
+    def feed_all(self, parser, parts):
+        """Feed parts to the parser and collect what each one completes."""
+        return [parser.feed(part) for part in parts]
+    
+    def test_parser_single_characters(self):
+        """Test that objects are decoded when fed one character at a time"""
+        parser = day5_guardrails.RecommendationStreamParser()
+        completed = self.feed_all(parser, self.text)
+        
+        self.assertEqual([obj for objs in completed for obj in objs], self.expected)
+        self.assertEqual(parser.text, self.text)
+        
+        # Each object is returned by the chunk holding its closing brace
+        closing = [i for i, objs in enumerate(completed) if objs]
+        self.assertEqual(len(closing), len(self.expected))
+        for index in closing:
+            self.assertEqual(self.text[index], '}')
+    
+    def test_parser_awkward_splits(self):
+        """Test chunks split inside strings, escapes and nested arrays"""
+        parts = awkward_chunks(self.text)
+        self.assertEqual("".join(parts), self.text)
+        
+        parser = day5_guardrails.RecommendationStreamParser()
+        completed = self.feed_all(parser, parts)
+        
+        self.assertEqual([obj for objs in completed for obj in objs], self.expected)
+        # Nothing after the end of the array is parsed as a recommendation
+        end_of_array = next(i for i, part in enumerate(parts) if part.startswith(']'))
+        self.assertEqual([obj for objs in completed[end_of_array:] for obj in objs], [])
+        self.assertEqual(parser.text, self.text)
+    
+    def test_parser_waits_for_recommendations_key(self):
+        """Test that nothing is returned before the recommendations array starts"""
+        parser = day5_guardrails.RecommendationStreamParser()
+        self.assertEqual(parser.feed('{"overall_confidence": 0.8, "recommend'), [])
+        self.assertEqual(parser.feed('ations": '), [])
+        completed = parser.feed('[{"course_id": "CS101", "note": "}"}, ')
+        self.assertEqual(completed, [{"course_id": "CS101", "note": "}"}])
+        self.assertEqual(parser.feed(']}'), [])
+    
+    def test_astream_query_with_validation(self):
+        """Test that validated recommendations stream before the final response"""
+        try:
+            from day4_rag_pipeline import ConfidenceLevel
+            pipeline = make_guarded_pipeline()
+        except ImportError as e:
+            self.skipTest(f"Guarded pipeline dependencies not available: {e}")
+        
+        base = pipeline.base_pipeline
+        base.aprocess_query = AsyncMock(return_value=MagicMock(
+            context_used="course context", confidence=ConfidenceLevel.HIGH
+        ))
+        base._get_llm_semaphore.return_value = asyncio.Semaphore(1)
+        base._rate_limiter.acquire = AsyncMock()
+        base.aclient.chat.completions.create = AsyncMock(return_value=stream_of(awkward_chunks(self.text)))
+        
+        async def collect():
+            return [item async for item in pipeline.astream_query_with_validation("I like AI", top_k=3)]
+        
+        items = asyncio.run(collect())
+        *streamed, final = items
+        
+        # The hallucinated course is dropped as soon as its object completes
+        self.assertEqual([rec["course_id"] for rec in streamed], ["CS101", "CS301"])
+        self.assertEqual(streamed[0]["title"], "Introduction to Computer Science")
+        self.assertEqual(streamed[0]["justification"], self.expected[0]["justification"])
+        
+        self.assertIsInstance(final, day5_guardrails.ValidatedRecommendationResponse)
+        self.assertEqual(final.query, "I like AI")
+        self.assertEqual(final.recommendations, streamed)
+        self.assertEqual(final.overall_confidence, 0.85)
+        self.assertFalse(final.validation_passed)
+        self.assertTrue(any("CS999" in warning for warning in final.warnings))
+        self.assertEqual(final.metadata["original_recommendation_count"], 3)
+        self.assertTrue(base.aclient.chat.completions.create.call_args.kwargs["stream"])
+    
+    def test_astream_query_with_validation_error(self):
+        """Test that a failed stream yields only the fallback response"""
+        try:
+            pipeline = make_guarded_pipeline()
+        except ImportError as e:
+            self.skipTest(f"Guarded pipeline dependencies not available: {e}")
+        
+        base = pipeline.base_pipeline
+        base.aprocess_query = AsyncMock(side_effect=RuntimeError("search unavailable"))
+        
+        async def collect():
+            return [item async for item in pipeline.astream_query_with_validation("I like AI")]
+        
+        items = asyncio.run(collect())
+        
+        self.assertEqual(len(items), 1)
+        self.assertTrue(items[0].fallback_triggered)
+        self.assertEqual(items[0].metadata["fallback_reason"], "search unavailable")
+        self.assertEqual(pipeline._response_cache, {})
+
+
+@unittest.skipIf(day5_guardrails is None, "Guardrails module not available")
+class TestGuardedResponseCache(unittest.TestCase):
+    """Test cases for the Day 5 validated response cache"""
+    
+    def setUp(self):
+        """Set up a guarded pipeline with a stubbed client and base pipeline"""
+        try:
+            from day4_rag_pipeline import ConfidenceLevel
+            self.pipeline = make_guarded_pipeline(response_cache_size=2)
+        except ImportError as e:
+            self.skipTest(f"Guarded pipeline dependencies not available: {e}")
+        
+        self.base_response = MagicMock(context_used="course context", confidence=ConfidenceLevel.HIGH)
+        self.pipeline.base_pipeline.process_query.return_value = self.base_response
+        
+        llm_response = MagicMock()
+        llm_response.choices = [MagicMock()]
+        llm_response.choices[0].message.content = json.dumps(STREAMED_RESPONSE)
+        self.create = self.pipeline.client.chat.completions.create
+        self.create.return_value = llm_response
+    
+    def cached_response(self, query):
+        """Validated response to store under a test key."""
+        return day5_guardrails.OutputValidator(self.pipeline.course_validator)._create_fallback_response(query, "test")
+    
+    def test_response_cache_key(self):
+        """Test that the key covers the query, context and threshold"""
+        key = self.pipeline._response_cache_key("I like AI", "context", 0.6)
+        
+        self.assertEqual(key, self.pipeline._response_cache_key("I like AI", "context", 0.6))
+        self.assertNotEqual(key, self.pipeline._response_cache_key("I like art", "context", 0.6))
+        self.assertNotEqual(key, self.pipeline._response_cache_key("I like AI", "other context", 0.6))
+        self.assertNotEqual(key, self.pipeline._response_cache_key("I like AI", "context", 0.8))
+    
+    def test_repeated_query_skips_llm(self):
+        """Test that a second identical query is answered from the cache"""
+        first = self.pipeline.process_query_with_validation("I like AI")
+        second = self.pipeline.process_query_with_validation("I like AI")
+        
+        self.assertIs(second, first)
+        self.assertEqual(self.create.call_count, 1)
+        self.assertEqual(len(self.pipeline._response_cache), 1)
+        
+        # A different retrieved context is a different prompt
+        self.base_response.context_used = "updated course context"
+        self.pipeline.process_query_with_validation("I like AI")
+        self.assertEqual(self.create.call_count, 2)
+    
+    def test_failed_query_not_cached(self):
+        """Test that fallback responses from errors are not cached"""
+        self.create.side_effect = RuntimeError("API unavailable")
+        
+        first = self.pipeline.process_query_with_validation("I like AI")
+        second = self.pipeline.process_query_with_validation("I like AI")
+        
+        self.assertTrue(first.fallback_triggered)
+        self.assertIsNot(second, first)
+        self.assertEqual(self.create.call_count, 2)
+        self.assertEqual(len(self.pipeline._response_cache), 0)
+    
+    def test_cache_evicts_oldest_first(self):
+        """Test that the size bound evicts the least recently used entry"""
+        pipeline = self.pipeline
+        first, second, third = (self.cached_response(query) for query in ("first", "second", "third"))
+        
+        pipeline._store_cached_response("first", first)
+        pipeline._store_cached_response("second", second)
+        pipeline._store_cached_response("third", third)
+        
+        self.assertIsNone(pipeline._get_cached_response("first"))
+        self.assertIs(pipeline._get_cached_response("second"), second)
+        self.assertIs(pipeline._get_cached_response("third"), third)
+        
+        # Reading an entry makes it the most recently used
+        pipeline._get_cached_response("second")
+        pipeline._store_cached_response("first", first)
+        
+        self.assertEqual(list(pipeline._response_cache), ["second", "first"])
+
+
+@unittest.skipIf(day5_guardrails is None, "Guardrails module not available")
+class TestSharedBasePipeline(unittest.TestCase):
+    """Test cases for wrapping an existing Day 4 pipeline"""
+    
+    def test_reuses_base_pipeline(self):
+        """Test that a given base pipeline and its client are reused, not rebuilt"""
+        base = MagicMock(api_key="base-key")
+        with patch('day4_rag_pipeline.Day4RAGPipeline') as pipeline_cls, \
+                patch.object(day5_guardrails, 'load_courses', return_value=SAMPLE_COURSES):
+            pipeline = day5_guardrails.Day5GuardedRAGPipeline(base_pipeline=base)
+        
+        pipeline_cls.assert_not_called()
+        self.assertIs(pipeline.base_pipeline, base)
+        self.assertIs(pipeline.client, base.client)
+        self.assertEqual(pipeline.api_key, "base-key")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -9,8 +9,12 @@ Tests for the entire system integration including:
 """
 
 import unittest
+import functools
+import os
+import shutil
 import tempfile
 import time
+import numpy as np
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 import sys
@@ -32,6 +36,13 @@ except ImportError:
     load_courses = None
 
 
+def fake_embeddings_response(model, input, dimensions, encoding_format):
+    """Stand-in for embeddings.create returning one random embedding per input."""
+    response = MagicMock()
+    response.data = [MagicMock(embedding=np.random.rand(dimensions).tolist()) for _ in input]
+    return response
+
+
 class TestPipelineIntegration(unittest.TestCase):
     """Integration tests for the complete recommendation pipeline"""
     
@@ -141,10 +152,10 @@ class TestPipelineIntegration(unittest.TestCase):
             # Verify recommendations
             if result.recommendations:
                 rec = result.recommendations[0]
-                self.assertTrue(hasattr(rec, 'course_id'))
-                self.assertTrue(hasattr(rec, 'title'))
-                self.assertTrue(hasattr(rec, 'justification'))
-                self.assertTrue(hasattr(rec, 'match_score'))
+                self.assertIn('course_id', rec)
+                self.assertIn('title', rec)
+                self.assertIn('justification', rec)
+                self.assertIn('match_score', rec)
             
         except Exception as e:
             self.skipTest(f"End-to-end test failed: {e}")
@@ -360,16 +371,26 @@ class TestPipelineIntegration(unittest.TestCase):
     
     @unittest.skipIf(Day5GuardedRAGPipeline is None, "Pipeline not available")
     @patch('day5_guardrails.load_courses')
-    def test_initialization_robustness(self, mock_load_courses):
+    @patch('day3_embedding_search.OpenAI')
+    @patch.dict(os.environ, {"OPENAI_API_KEY": "test_key"})
+    def test_initialization_robustness(self, mock_openai, mock_load_courses):
         """Test robust initialization under various conditions"""
         mock_load_courses.return_value = self.sample_courses
+        mock_openai.return_value.embeddings.create.side_effect = fake_embeddings_response
+        
+        # Keep the stub embeddings out of the on-disk embedding caches
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, ignore_errors=True)
+        uncached_search = functools.partial(EmbeddingBasedCourseSearch, cache_dir=None)
         
         # Test initialization with different confidence thresholds
         thresholds = [0.1, 0.5, 0.8, 0.95]
         
         for threshold in thresholds:
             try:
-                with patch('openai.OpenAI'):
+                with patch('openai.OpenAI'), \
+                        patch('day4_rag_pipeline.COURSE_EMBEDDING_CACHE_DIR', temp_dir), \
+                        patch('day4_rag_pipeline.EmbeddingBasedCourseSearch', uncached_search):
                     pipeline = Day5GuardedRAGPipeline(confidence_threshold=threshold)
                     self.assertIsNotNone(pipeline)
                     self.assertEqual(pipeline.confidence_threshold, threshold)
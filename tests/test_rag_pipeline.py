@@ -0,0 +1,418 @@
+"""
+Unit Tests for Day 4 RAG Pipeline
+
+Tests for day4_rag_pipeline.py functionality including:
+- Async request rate limiting
+- Response caching with TTL expiry and LRU eviction
+- Token-budgeted context building
+- Skipping the LLM call on the FALLBACK path
+"""
+
+import unittest
+import asyncio
+import threading
+import numpy as np
+from pathlib import Path
+from unittest.mock import patch, MagicMock, AsyncMock
+import sys
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+try:
+    import day4_rag_pipeline
+    from day4_rag_pipeline import Day4RAGPipeline, RateLimiter, LLM_ERROR_PREFIX
+except ImportError:
+    # Mock if modules not available
+    day4_rag_pipeline = None
+    Day4RAGPipeline = None
+    RateLimiter = None
+    LLM_ERROR_PREFIX = None
+
+
+SAMPLE_COURSES = [
+    {
+        "code": "CS101",
+        "title": "Introduction to Computer Science",
+        "description": "Fundamental concepts of programming, problem solving and program design in Python.",
+        "credits": 3,
+        "difficulty": 2,
+        "category": "Core Requirements",
+        "prerequisites": []
+    },
+    {
+        "code": "CS201",
+        "title": "Data Structures and Algorithms",
+        "description": "Lists, trees, graphs and hash tables, with the analysis of the algorithms that use them.",
+        "credits": 4,
+        "difficulty": 4,
+        "category": "Core Requirements",
+        "prerequisites": ["CS101"]
+    },
+    {
+        "code": "CS301",
+        "title": "Machine Learning",
+        "description": "Supervised and unsupervised learning, neural networks and model evaluation.",
+        "credits": 3,
+        "difficulty": 4,
+        "category": "Major Electives",
+        "prerequisites": ["CS201"]
+    }
+]
+
+# Query embeddings matching the first course exactly, and matching none
+MATCHING_QUERY_VEC = np.array([1.0, 0.0, 0.0, 0.0], dtype=np.float32)
+UNRELATED_QUERY_VEC = np.array([0.0, 0.0, 0.0, 1.0], dtype=np.float32)
+
+
+def make_pipeline(**kwargs):
+    """
+    Build a Day4RAGPipeline over SAMPLE_COURSES without network access.
+    
+    Course i is embedded as the i-th unit vector, and the OpenAI client is a
+    MagicMock whose chat completions return "Recommended courses".
+    """
+    with patch('day4_rag_pipeline.EmbeddingBasedCourseSearch') as search_cls, \
+            patch('day4_rag_pipeline.load_courses', return_value=SAMPLE_COURSES), \
+            patch.object(Day4RAGPipeline, '_load_or_embed_courses'):
+        search = search_cls.return_value
+        search.course_embeddings = np.eye(len(SAMPLE_COURSES), 4, dtype=np.float32)
+        search.courses = SAMPLE_COURSES
+        search.embed_student_query.return_value = MATCHING_QUERY_VEC
+        
+        client = MagicMock()
+        client.chat.completions.create.return_value.choices = [MagicMock()]
+        client.chat.completions.create.return_value.choices[0].message.content = "Recommended courses"
+        
+        pipeline = Day4RAGPipeline(api_key="test-key", client=client, **kwargs)
+    return pipeline
+
+
+class FakeClock:
+    """Stand-in for time.monotonic whose sleeps advance it instantly"""
+    
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.sleeps = []
+    
+    def monotonic(self):
+        return self.now
+    
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@unittest.skipIf(RateLimiter is None, "Day 4 pipeline not available")
+class TestRateLimiter(unittest.TestCase):
+    """Test cases for the sliding-window rate limiter"""
+    
+    def setUp(self):
+        """Replace the limiter's clock and sleep with a fake clock"""
+        self.clock = FakeClock()
+        
+        # Only the pipeline module's time is replaced; the event loop keeps the real clock
+        time_patcher = patch('day4_rag_pipeline.time')
+        time_patcher.start().monotonic.side_effect = self.clock.monotonic
+        self.addCleanup(time_patcher.stop)
+        
+        sleep_patcher = patch('asyncio.sleep', side_effect=self.clock.sleep)
+        sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+    
+    def acquire(self, limiter, count):
+        """Acquire count slots, returning the fake time each was granted at"""
+        async def run():
+            granted = []
+            for _ in range(count):
+                await limiter.acquire()
+                granted.append(self.clock.now)
+            return granted
+        return asyncio.run(run())
+    
+    def test_requests_within_limit_do_not_wait(self):
+        """Test that requests up to the limit start immediately"""
+        limiter = RateLimiter(3)
+        
+        self.assertEqual(self.acquire(limiter, 3), [1000.0] * 3)
+        self.assertEqual(self.clock.sleeps, [])
+    
+    def test_request_over_limit_waits_for_window(self):
+        """Test that a request over the limit waits until the oldest slot expires"""
+        limiter = RateLimiter(2)
+        self.acquire(limiter, 1)
+        self.clock.now += 20.0
+        self.acquire(limiter, 1)
+        
+        granted = self.acquire(limiter, 2)
+        
+        # The oldest request was at t=1000 and the next at t=1020
+        self.assertEqual(granted, [1060.0, 1080.0])
+        self.assertEqual(self.clock.sleeps, [40.0, 20.0])
+        self.assertEqual(len(limiter._timestamps), 2)
+    
+    def test_expired_slots_are_released(self):
+        """Test that requests older than a minute no longer count"""
+        limiter = RateLimiter(2)
+        self.acquire(limiter, 2)
+        self.clock.now += 60.0
+        
+        self.assertEqual(self.acquire(limiter, 2), [1060.0, 1060.0])
+        self.assertEqual(self.clock.sleeps, [])
+        self.assertEqual(list(limiter._timestamps), [1060.0, 1060.0])
+
+
+@unittest.skipIf(Day4RAGPipeline is None, "Day 4 pipeline not available")
+class TestResponseCache(unittest.TestCase):
+    """Test cases for the Day 4 response cache"""
+    
+    def setUp(self):
+        """Set up a pipeline with a small response cache"""
+        self.pipeline = make_pipeline(response_cache_size=2, response_cache_ttl=60.0)
+        self.addCleanup(self.pipeline.close)
+        self.create = self.pipeline.client.chat.completions.create
+    
+    def cached_response(self, text):
+        """RAG response to store under a test key."""
+        return day4_rag_pipeline.RAGResponse(
+            response=text,
+            confidence=day4_rag_pipeline.ConfidenceLevel.HIGH,
+            retrieved_courses=[],
+            similarity_scores=[],
+            context_used="",
+            reasoning=""
+        )
+    
+    def test_repeated_query_skips_llm(self):
+        """Test that a second identical query is answered from the cache"""
+        first = self.pipeline.process_query("I like programming", top_k=3)
+        second = self.pipeline.process_query("I like programming", top_k=3)
+        
+        self.assertEqual(first.response, "Recommended courses")
+        self.assertIs(second, first)
+        self.assertEqual(self.create.call_count, 1)
+        
+        # A different top_k is a different request
+        self.pipeline.process_query("I like programming", top_k=2)
+        self.assertEqual(self.create.call_count, 2)
+    
+    def test_cached_response_expires_after_ttl(self):
+        """Test that an entry older than the TTL is dropped on lookup"""
+        with patch('day4_rag_pipeline.time') as mock_time:
+            mock_time.monotonic.return_value = 1000.0
+            self.pipeline.process_query("I like programming", top_k=3)
+            
+            mock_time.monotonic.return_value = 1060.0
+            self.pipeline.process_query("I like programming", top_k=3)
+            self.assertEqual(self.create.call_count, 1)
+            
+            mock_time.monotonic.return_value = 1060.5
+            self.assertIsNone(self.pipeline._get_cached_response(
+                self.pipeline._response_cache_key("I like programming", 3)
+            ))
+            self.assertEqual(len(self.pipeline._response_cache), 0)
+            
+            self.pipeline.process_query("I like programming", top_k=3)
+            self.assertEqual(self.create.call_count, 2)
+    
+    def test_cache_evicts_least_recently_used(self):
+        """Test that the size bound evicts the least recently used entry"""
+        pipeline = self.pipeline
+        first, second, third = (self.cached_response(text) for text in ("first", "second", "third"))
+        
+        pipeline._store_cached_response("first", first)
+        pipeline._store_cached_response("second", second)
+        
+        # Reading an entry makes it the most recently used
+        self.assertIs(pipeline._get_cached_response("first"), first)
+        pipeline._store_cached_response("third", third)
+        
+        self.assertIsNone(pipeline._get_cached_response("second"))
+        self.assertIs(pipeline._get_cached_response("first"), first)
+        self.assertIs(pipeline._get_cached_response("third"), third)
+        self.assertEqual(list(pipeline._response_cache), ["first", "third"])
+    
+    def test_error_responses_not_cached(self):
+        """Test that a failed LLM call is retried on the next identical query"""
+        self.create.side_effect = RuntimeError("API unavailable")
+        
+        first = self.pipeline.process_query("I like programming", top_k=3)
+        self.assertTrue(first.response.startswith(LLM_ERROR_PREFIX))
+        self.assertEqual(len(self.pipeline._response_cache), 0)
+        
+        self.create.side_effect = None
+        second = self.pipeline.process_query("I like programming", top_k=3)
+        
+        self.assertEqual(second.response, "Recommended courses")
+        self.assertEqual(self.create.call_count, 2)
+        self.assertEqual(len(self.pipeline._response_cache), 1)
+
+
+@unittest.skipIf(Day4RAGPipeline is None, "Day 4 pipeline not available")
+class TestContextBudget(unittest.TestCase):
+    """Test cases for building the course context within a token budget"""
+    
+    def setUp(self):
+        """Set up a pipeline and retrieved courses with long descriptions"""
+        self.pipeline = make_pipeline()
+        self.addCleanup(self.pipeline.close)
+        
+        self.retrieved = [
+            ({**course, "description": f"{course['description']} " * 20}, 0.9 - 0.1 * i)
+            for i, course in enumerate(SAMPLE_COURSES)
+        ]
+    
+    def build_context(self, max_context_tokens):
+        """Build the context for the retrieved courses under a token budget."""
+        self.pipeline.max_context_tokens = max_context_tokens
+        return self.pipeline._build_context(self.retrieved)
+    
+    def block_tokens(self, rank, **kwargs):
+        """Tokens used by one course block and its newline."""
+        course, similarity = self.retrieved[rank - 1]
+        block = self.pipeline._summarize_course(course, similarity, rank, **kwargs)
+        return self.pipeline._count_tokens(block) + 1
+    
+    def test_context_stays_within_budget(self):
+        """Test that the context never exceeds the token budget"""
+        for max_context_tokens in range(10, 400, 5):
+            context = self.build_context(max_context_tokens)
+            self.assertLessEqual(self.pipeline._count_tokens(context), max_context_tokens,
+                                 f"budget {max_context_tokens}")
+            self.assertTrue(context.startswith("RELEVANT COURSES FOUND:"))
+    
+    def test_generous_budget_keeps_full_detail(self):
+        """Test that every course keeps its details when the budget allows"""
+        context = self.build_context(1500)
+        
+        self.assertEqual(context.count("Description:"), len(SAMPLE_COURSES))
+        # Long descriptions are cut at a word boundary
+        for line in context.splitlines():
+            if "Description:" in line:
+                description = line.split("Description: ", 1)[1]
+                self.assertTrue(description.endswith("..."))
+                self.assertLessEqual(len(description), 243)
+    
+    def test_tight_budget_compacts_then_drops_courses(self):
+        """Test that courses past the budget shrink to one line, then are left out"""
+        header_tokens = self.pipeline._count_tokens("RELEVANT COURSES FOUND:")
+        budget = header_tokens + self.block_tokens(1) + self.block_tokens(2, max_desc_chars=0)
+        
+        lines = self.build_context(budget).splitlines()
+        
+        self.assertIn("CS101", lines[1])
+        self.assertTrue(any("Description:" in line for line in lines[2:5]))
+        self.assertEqual(lines[-1], "2. Data Structures and Algorithms (CS201) | Relevance Score: 0.800")
+        self.assertNotIn("CS301", "\n".join(lines))
+    
+    def test_no_courses(self):
+        """Test the context when nothing was retrieved"""
+        self.assertEqual(self.pipeline._build_context([]), "No relevant courses found.")
+
+
+@unittest.skipIf(Day4RAGPipeline is None, "Day 4 pipeline not available")
+class TestFallbackSkipsLLM(unittest.TestCase):
+    """Test cases for answering FALLBACK queries without an LLM call"""
+    
+    def setUp(self):
+        """Set up a pipeline whose query embedding matches no course"""
+        self.pipeline = make_pipeline()
+        self.addCleanup(self.pipeline.close)
+        self.pipeline.embedding_search.embed_student_query.return_value = UNRELATED_QUERY_VEC
+        
+        self.create = self.pipeline.client.chat.completions.create
+        self.pipeline.aclient = MagicMock()
+        self.acreate = self.pipeline.aclient.chat.completions.create = AsyncMock(
+            return_value=self.create.return_value
+        )
+    
+    def assert_fallback(self, response):
+        """Check a response carries the canned fallback guidance."""
+        self.assertEqual(response.confidence, day4_rag_pipeline.ConfidenceLevel.FALLBACK)
+        self.assertTrue(response.fallback_triggered)
+        self.assertEqual(response.response, self.pipeline._generate_fallback_response("underwater basket weaving", ""))
+        self.assertEqual(len(response.retrieved_courses), 3)
+    
+    def test_fallback_skips_llm(self):
+        """Test that a FALLBACK query returns canned guidance without calling the LLM"""
+        response = self.pipeline.process_query("underwater basket weaving", top_k=3)
+        
+        self.assert_fallback(response)
+        self.create.assert_not_called()
+        # Rebuilding the guidance is free, so it is not cached
+        self.assertEqual(len(self.pipeline._response_cache), 0)
+    
+    def test_force_llm_calls_llm(self):
+        """Test that force_llm sends a FALLBACK query to the LLM"""
+        response = self.pipeline.process_query("underwater basket weaving", top_k=3, force_llm=True)
+        
+        self.assertEqual(response.response, "Recommended courses")
+        self.assertTrue(response.fallback_triggered)
+        self.assertEqual(self.create.call_count, 1)
+        self.assertIn("limited relevant results", self.create.call_args.kwargs["messages"][-1]["content"])
+    
+    def test_async_fallback_skips_llm(self):
+        """Test that the async paths skip the LLM unless force_llm is set"""
+        async def run():
+            response = await self.pipeline.aprocess_query("underwater basket weaving", top_k=3)
+            streamed = [item async for item in self.pipeline.astream_query("underwater basket weaving", top_k=3)]
+            return response, streamed
+        
+        response, streamed = asyncio.run(run())
+        
+        self.assert_fallback(response)
+        self.assertEqual(streamed[0], response.response)
+        self.assert_fallback(streamed[-1])
+        self.acreate.assert_not_called()
+        
+        forced = asyncio.run(self.pipeline.aprocess_query("underwater basket weaving", top_k=3, force_llm=True))
+        self.assertEqual(forced.response, "Recommended courses")
+        self.assertEqual(self.acreate.call_count, 1)
+
+
+@unittest.skipIf(Day4RAGPipeline is None, "Day 4 pipeline not available")
+class TestClose(unittest.TestCase):
+    """Test cases for closing the async connection pool"""
+    
+    def setUp(self):
+        """Set up a pipeline whose pool records the loop it is closed on"""
+        self.pipeline = make_pipeline()
+        self.closed_on = []
+        
+        async def aclose():
+            self.closed_on.append(asyncio.get_running_loop())
+        
+        self.pipeline._http_client = MagicMock(is_closed=False)
+        self.pipeline._http_client.aclose = aclose
+    
+    def test_close_on_background_loop(self):
+        """Test that the pool is closed on the running loop that used it"""
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        self.addCleanup(loop.close)
+        self.addCleanup(thread.join)
+        self.addCleanup(loop.call_soon_threadsafe, loop.stop)
+        
+        async def use_pool():
+            self.pipeline._get_llm_semaphore()
+        asyncio.run_coroutine_threadsafe(use_pool(), loop).result()
+        
+        self.pipeline.close()
+        self.assertEqual(self.closed_on, [loop])
+    
+    def test_close_without_running_loop(self):
+        """Test that the pool is closed on a new loop once its loop has finished"""
+        async def use_pool():
+            self.pipeline._get_llm_semaphore()
+            return asyncio.get_running_loop()
+        used_loop = asyncio.run(use_pool())
+        
+        self.pipeline.close()
+        self.assertEqual(len(self.closed_on), 1)
+        self.assertIsNot(self.closed_on[0], used_loop)
+
+
+if __name__ == "__main__":
+    unittest.main()
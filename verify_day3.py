@@ -97,7 +97,7 @@ def test_day3_requirements():
     print("✅ Example 'I like psychology and AI' working perfectly")
     
     print(f"\n🔧 Technical Implementation:")
-    print(f"   • OpenAI API: text-embedding-3-small (1536 dimensions)")
+    print(f"   • OpenAI API: text-embedding-3-small (512 dimensions)")
     print(f"   • Vector Database: FAISS IndexFlatIP (cosine similarity)")
     print(f"   • Course Corpus: {len(courses)} courses embedded")
     print(f"   • Search Method: Normalized embeddings + inner product")
@@ -22,7 +22,7 @@ from day5_guardrails import (
     Day5GuardedRAGPipeline, 
     CourseValidator, 
     OutputValidator, 
-    CourseRecommendation,
+    validate_recommendation,
     ValidatedRecommendationResponse,
     ValidationLevel
 )
@@ -39,41 +39,41 @@ def test_pydantic_validation():
     
     # Test valid course recommendation
     try:
-        valid_rec = CourseRecommendation(
-            course_id="CS101",
-            title="Introduction to Computer Science",
-            justification="This course provides fundamental programming concepts essential for beginners",
-            match_score=0.85
-        )
+        valid_rec = validate_recommendation({
+            'course_id': "CS101",
+            'title': "Introduction to Computer Science",
+            'justification': "This course provides fundamental programming concepts essential for beginners",
+            'match_score': 0.85
+        })
         print("   ✅ Valid CourseRecommendation created successfully")
-    except ValidationError as e:
+    except ValueError as e:
         print(f"   ❌ Valid CourseRecommendation failed: {e}")
         return False
     
     # Test invalid course recommendation (bad course ID format)
     try:
-        invalid_rec = CourseRecommendation(
-            course_id="INVALID123",
-            title="Invalid Course",
-            justification="Short",  # Too short
-            match_score=1.5  # Out of range
-        )
+        invalid_rec = validate_recommendation({
+            'course_id': "INVALID123",
+            'title': "Invalid Course",
+            'justification': "Short",  # Too short
+            'match_score': 1.5  # Out of range
+        })
         print("   ❌ Invalid CourseRecommendation should have failed validation")
         return False
-    except ValidationError:
+    except ValueError:
         print("   ✅ Invalid CourseRecommendation correctly rejected")
     
     # Test justification validation
     try:
-        generic_rec = CourseRecommendation(
-            course_id="CS101",
-            title="Test Course",
-            justification="good course",  # Too generic and short
-            match_score=0.7
-        )
+        generic_rec = validate_recommendation({
+            'course_id': "CS101",
+            'title': "Test Course",
+            'justification': "good course",  # Too generic and short
+            'match_score': 0.7
+        })
         print("   ❌ Generic justification should have been rejected")
         return False
-    except ValidationError:
+    except ValueError:
         print("   ✅ Generic justification correctly rejected")
     
     return True
@@ -280,11 +280,11 @@ def test_guarded_pipeline():
         
         # Check for valid course IDs only
         invalid_courses = [rec for rec in response.recommendations 
-                          if rec.course_id not in pipeline.course_validator.valid_course_ids]
+                          if rec['course_id'] not in pipeline.course_validator.valid_course_ids]
         if not invalid_courses:
             print("   ✅ All recommended courses are valid")
         else:
-            print(f"   ❌ Found invalid course recommendations: {[c.course_id for c in invalid_courses]}")
+            print(f"   ❌ Found invalid course recommendations: {[c['course_id'] for c in invalid_courses]}")
             return False
         
         return True
@@ -301,28 +301,28 @@ def test_required_fields():
     # Test that justification and match_score are required
     try:
         # Missing justification
-        CourseRecommendation(
-            course_id="CS101",
-            title="Test Course",
+        validate_recommendation({
+            'course_id': "CS101",
+            'title': "Test Course",
             # justification missing
-            match_score=0.8
-        )
+            'match_score': 0.8
+        })
         print("   ❌ Should require justification field")
         return False
-    except ValidationError:
+    except ValueError:
         print("   ✅ Justification field required")
     
     try:
         # Missing match_score
-        CourseRecommendation(
-            course_id="CS101",
-            title="Test Course",
-            justification="This is a good course for beginners learning programming fundamentals"
+        validate_recommendation({
+            'course_id': "CS101",
+            'title': "Test Course",
+            'justification': "This is a good course for beginners learning programming fundamentals"
             # match_score missing
-        )
+        })
         print("   ❌ Should require match_score field")
         return False
-    except ValidationError:
+    except ValueError:
         print("   ✅ Match_score field required")
     
     # Test ValidatedRecommendationResponse required fields
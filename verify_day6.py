@@ -92,7 +92,7 @@ def test_streamlit_app_components():
             
             if response.recommendations:
                 top_rec = response.recommendations[0]
-                print(f"      🎯 Top recommendation: {top_rec.course_id} (score: {top_rec.match_score:.3f})")
+                print(f"      🎯 Top recommendation: {top_rec['course_id']} (score: {top_rec['match_score']:.3f})")
             
         except Exception as e:
             print(f"      ❌ Query processing failed: {e}")
@@ -116,11 +116,11 @@ def test_streamlit_app_components():
         print(f"   📊 Recorded feedback: {test_feedback['sentiment']} for {test_feedback['course_id']}")
         
         # Test feedback file saving
-        feedback_file = Path("data/user_feedback.json")
+        feedback_file = Path("data/user_feedback.jsonl")
         feedback_file.parent.mkdir(exist_ok=True)
         
-        with open(feedback_file, "w") as f:
-            json.dump(feedback_data, f, indent=2)
+        with open(feedback_file, "a") as f:
+            f.writelines(json.dumps(entry) + "\n" for entry in feedback_data)
         
         print(f"   💾 Feedback saved to {feedback_file}")
         
@@ -297,9 +297,9 @@ def demonstrate_day6_workflow():
         # Step 3: Display recommendations with explanations
         print("\\n3️⃣ Course Recommendations with Explanations...")
         for i, rec in enumerate(response.recommendations[:3], 1):
-            print(f"   {i}. {rec.course_id}: {rec.title}")
-            print(f"      📈 Match Score: {rec.match_score:.3f}")
-            print(f"      💡 Why: {rec.justification[:100]}...")
+            print(f"   {i}. {rec['course_id']}: {rec['title']}")
+            print(f"      📈 Match Score: {rec['match_score']:.3f}")
+            print(f"      💡 Why: {rec['justification'][:100]}...")
         
         # Step 4: Query refinement
         print("\\n4️⃣ Query Refinement...")